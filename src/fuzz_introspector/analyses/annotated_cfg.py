@@ -21,7 +21,6 @@ from typing import (Any, Dict, List)
 
 from fuzz_introspector import analysis
 from fuzz_introspector import utils
-from fuzz_introspector import cfg_load
 from fuzz_introspector import json_report
 from fuzz_introspector import html_helpers
 from fuzz_introspector.datatypes import project_profile, fuzzer_profile
@@ -68,8 +67,7 @@ class FuzzAnnotatedCFG(analysis.AnalysisInterface):
             # We must haev a high number here initially, to trigger the first
             # catch.
             callsite_stack = dict()
-            for callsite in cfg_load.extract_all_callsites(
-                    profile.fuzzer_callsite_calltree):
+            for callsite in profile.get_callsites():
 
                 # Set the stack
                 callsite_stack[callsite.depth] = callsite
@@ -24,6 +24,8 @@ from typing import (
     Dict,
     List,
     Optional,
+    Set,
+    TextIO,
 )
 
 from fuzz_introspector import analysis
@@ -37,6 +39,14 @@ from bs4 import BeautifulSoup as bs
 
 logger = logging.getLogger(name=__name__)
 
+# Marks where the calltree nodes are written in the calltree page.
+CALLTREE_NODES_PLACEHOLDER = "<!--fi-calltree-nodes-->"
+
+# Number of calltree nodes in each data file of the virtual calltree view,
+# and the number of integers describing a node in these files.
+CALLTREE_CHUNK_SIZE = 4096
+CALLTREE_NODE_FIELDS = 7
+
 
 class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
     name: str = "FuzzCalltreeAnalysis"
@@ -45,6 +55,9 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
         logger.info("Creating FuzzCalltreeAnalysis")
         self.json_string_result = "[]"
         self.dump_files = True
+        # Write the calltree as data files rendered by calltree.js instead
+        # of HTML, which keeps the page light for very large calltrees.
+        self.virtual_calltree = bool(os.environ.get('FI_VIRTUAL_CALLTREE', ''))
 
     @classmethod
     def get_name(cls):
@@ -70,121 +83,191 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
 
         return ""
 
-    def _get_span_row(self, ct_idx_str, indentation, node, demangled_name,
-                      func_href, callsite_link):
-        span_row = f"""<span class="coverage-line-inner" data-calltree-idx="{ct_idx_str}"
-        data-paddingleft="{indentation}" style="padding-left: {indentation}">
-            <span class="node-depth-wrapper">{node.depth}</span>
-            <code class="language-clike">
-                {html.escape(demangled_name)}
-            </code>
-            <span class="coverage-line-filename">
-                {func_href}
-                <a href="{callsite_link}">
-                    [call site]
-                </a>
-                <span class="calltree-idx">{ct_idx_str}</span>
-            </span>
-        </span>"""
-        return span_row
-
-    def create_calltree(self, profile: fuzzer_profile.FuzzerProfile) -> str:
-        logger.info("In calltree")
-        # Generate HTML for the calltree
-        calltree_html_string = "<h1>Fuzzer calltree</h1>"
-        calltree_html_string += "<div id=\"calltree-wrapper\">"
-
-        calltree_html_section_string = "<div class='call-tree-section-wrapper'>"
-        nodes = cfg_load.extract_all_callsites(
-            profile.fuzzer_callsite_calltree)
-
+    def _get_calltree_row(self, level: int, color: str, ct_idx_str: str,
+                          indentation: str, depth: int, demangled_name: str,
+                          func_link: Optional[str], callsite_link: str) -> str:
+        """Returns the indented HTML of the row of a calltree node, where the
+        div of the row is at indentation `level`. The div is left open."""
+        pad = " " * level
+        name = html.escape(demangled_name, quote=False).strip()
+        row = (
+            f'{pad}<div class="{color}-background coverage-line">\n'
+            f'{pad} <span class="coverage-line-inner" data-calltree-idx="{ct_idx_str}" '
+            f'data-paddingleft="{indentation}" style="padding-left: {indentation}">\n'
+            f'{pad}  <span class="node-depth-wrapper">\n'
+            f'{pad}   {depth}\n'
+            f'{pad}  </span>\n'
+            f'{pad}  <code class="language-clike">\n')
+        if name:
+            row += f'{pad}   {name}\n'
+        row += (f'{pad}  </code>\n'
+                f'{pad}  <span class="coverage-line-filename">\n')
+        if func_link is not None:
+            row += (f'{pad}   <a href="{html.escape(func_link)}">\n'
+                    f'{pad}    [function]\n'
+                    f'{pad}   </a>\n')
+        row += (f'{pad}   <a href="{html.escape(callsite_link)}">\n'
+                f'{pad}    [call site]\n'
+                f'{pad}   </a>\n'
+                f'{pad}   <span class="calltree-idx">\n'
+                f'{pad}    {ct_idx_str}\n'
+                f'{pad}   </span>\n'
+                f'{pad}  </span>\n'
+                f'{pad} </span>\n')
+        return row
+
+    def _get_node_name(self, profile: fuzzer_profile.FuzzerProfile,
+                       node: cfg_load.CalltreeCallsite) -> str:
+        """Returns the demangled name of the function called at `node`."""
+        if (profile.target_lang == "jvm"):
+            return utils.demangle_jvm_func(node.dst_function_source_file,
+                                           node.dst_function_name)
+        return utils.demangle_cpp_func(node.dst_function_name)
+
+    def _get_node_func_link(self,
+                            node: cfg_load.CalltreeCallsite) -> Optional[str]:
+        """Returns the [function] link of `node`, if it has a source file."""
+        # Only display [function] link if we have, otherwhise show no [function] text.
+        if node.dst_function_source_file.replace(" ", "") != "":
+            return node.cov_link
+        return None
+
+    def write_calltree_nodes(self, out: TextIO,
+                             profile: fuzzer_profile.FuzzerProfile,
+                             level: int) -> None:
+        """Writes the indented HTML of the nodes of the calltree to `out`
+        node by node, with the outermost divs at indentation `level`."""
+        nodes = profile.get_callsites()
+        logger.info("Writing %d calltree nodes", len(nodes))
+
+        # Indentation levels of the divs that are open.
+        open_divs: List[int] = []
         for i in range(len(nodes)):
-            # All divs created in this loop must also be closed in this loop.
             node = nodes[i]
-
-            if (profile.target_lang == "jvm"):
-                demangled_name = utils.demangle_jvm_func(
-                    node.dst_function_source_file, node.dst_function_name)
-            else:
-                demangled_name = utils.demangle_cpp_func(
-                    node.dst_function_name)
-
-            # Prepare strings needed in the HTML
-            color_to_be = node.cov_color
-            callsite_link = node.cov_callsite_link
-            link = node.cov_link
-            ct_idx_str = self.create_str_node_ctx_idx(str(node.cov_ct_idx))
-
-            # Only display [function] link if we have, otherwhise show no [function] text.
-            if node.dst_function_source_file.replace(" ", "") != "":
-                func_href = f"""<a href="{link}">[function]</a>"""
-            else:
-                func_href = ""
+            demangled_name = self._get_node_name(profile, node)
+            func_link = self._get_node_func_link(node)
 
             # indentation in html:
             indentation = "%dpx" % (int(node.depth) * 16 + 100)
 
             if i > 0:
                 previous_node = nodes[i - 1]
-                if previous_node.depth == node.depth:
-                    calltree_html_section_string += "</div>"
-                elif previous_node.depth > node.depth:
-                    # We need to close one coverage-line and one
-                    # calltree-line-wrapper for each depth, as well as the
-                    # row itself.
+                if previous_node.depth >= node.depth:
+                    # We need to close the previous row, as well as one
+                    # coverage-line and one calltree-line-wrapper for each
+                    # depth we return from.
                     node_difference = int(previous_node.depth - node.depth)
                     divs_to_close = node_difference * 2 + 1
-                    closing_divs = "</div>" * divs_to_close
-
-                    calltree_html_section_string += closing_divs
+                    for _ in range(min(divs_to_close, len(open_divs))):
+                        out.write(" " * open_divs.pop() + "</div>\n")
 
             # Add div for line itself.
-            calltree_html_section_string += (
-                f"<div class=\"{color_to_be}-background coverage-line\">")
-            calltree_html_section_string += self._get_span_row(
-                ct_idx_str, indentation, node, demangled_name, func_href,
-                callsite_link)
-
-            # If we are not at end
-            if i < len(nodes) - 1:
-                next_node = nodes[i + 1]
-
-                # If depth is increasing then we should open a new div for folding
-                # the calltree.
-                if next_node.depth > node.depth:
-                    calltree_html_section_string += f"""<div
-        class="calltree-line-wrapper open level-{int(node.depth)}"
-         data-paddingleft="{indentation}" >"""
-
-            # If we are at end, then we should close the remainding divs:
-            # - the depth
-            # - the current new node.
-            if i == len(nodes) - 1:
-                logger.info("At end")
-                # In terms of divs, we need to close one coverage-line and one
-                # calltree-line-wrapper for each depth. Minus one line-wrapper
-                # for the level we did not take.
-                if node.depth == 1:
-                    calltree_html_section_string += "</div></div>"
-                elif node.depth > 1:
-                    calltree_html_section_string += (
-                        "</div>" * int(node.depth - 1) * 2 + "</div></div>")
-
-        # Close the opening two divs
-        calltree_html_section_string += "</div>"  # opening node
-        calltree_html_section_string += "</div>"  # call-tree-section-wrapper
-
-        # Side overview wrapper holds the vertical bitmap image. The actual
-        # visualisation happens in javascript rather than here.
-        calltree_html_section_string += "<div id=\"side-overview-wrapper\"></div>"
-
-        logger.info("calltree_html_section_string: <divs>: %d -- </divs>: %d" %
-                    (calltree_html_section_string.count("<div"),
-                     calltree_html_section_string.count("</div>")))
-
-        calltree_html_string += calltree_html_section_string + "</div>"  # calltree-wrapper
-        logger.info("Calltree created")
+            row_level = open_divs[-1] + 1 if open_divs else level
+            out.write(
+                self._get_calltree_row(
+                    row_level, node.cov_color,
+                    self.create_str_node_ctx_idx(str(node.cov_ct_idx)),
+                    indentation, node.depth, demangled_name, func_link,
+                    node.cov_callsite_link))
+            open_divs.append(row_level)
+
+            # If depth is increasing then we should open a new div for folding
+            # the calltree.
+            if i < len(nodes) - 1 and nodes[i + 1].depth > node.depth:
+                out.write(
+                    f'{" " * (row_level + 1)}<div class="calltree-line-wrapper '
+                    f'open level-{int(node.depth)}" data-paddingleft="{indentation}">\n'
+                )
+                open_divs.append(row_level + 1)
+
+        # Close the remaining divs of the rows and wrappers.
+        while open_divs:
+            out.write(" " * open_divs.pop() + "</div>\n")
+
+    def get_subtree_ends(self,
+                         nodes: List[cfg_load.CalltreeCallsite]) -> List[int]:
+        """Returns for each node the index following its last descendant,
+        where the descendants of a node are the nodes after it that are
+        deeper than it, up to the next node that is not."""
+        ends = [len(nodes)] * len(nodes)
+        ancestors: List[int] = []
+        for i in range(len(nodes)):
+            while ancestors and nodes[ancestors[-1]].depth >= nodes[i].depth:
+                ends[ancestors.pop()] = i
+            ancestors.append(i)
+        return ends
+
+    def write_calltree_data(self, profile: fuzzer_profile.FuzzerProfile,
+                            calltree_name: str) -> None:
+        """Writes the calltree nodes as the data files of the virtual calltree
+        view of `calltree_name`.
+
+        The nodes are written in chunks of CALLTREE_CHUNK_SIZE nodes to
+        `<calltree_name>_chunk_<N>.js`, which calltree.js loads when their
+        rows are shown. A chunk holds a table of its strings and
+        CALLTREE_NODE_FIELDS integers per node: the depth, the index following
+        the subtree of the node, the ids of the function name, color,
+        function link (-1 if none) and call site link, and the calltree
+        index. `<calltree_name>_index.js` describes the chunks, the nodes
+        that are folded by "Collapse all" and the names of foldable nodes.
+        """
+        nodes = profile.get_callsites()
+        logger.info("Writing %d calltree nodes as data", len(nodes))
+        ends = self.get_subtree_ends(nodes)
+
+        # Nodes with callees that are not inside the subtree of a node of
+        # depth 1 or more, which are folded by "Collapse all".
+        top_level: List[List[int]] = []
+        top_level_end = 0
+        collapsible: Set[str] = set()
+        chunk_count = -(-len(nodes) // CALLTREE_CHUNK_SIZE)
+        for chunk_idx in range(chunk_count):
+            strings: Dict[str, int] = dict()
+            node_data: List[int] = []
+            for i in range(
+                    chunk_idx * CALLTREE_CHUNK_SIZE,
+                    min(len(nodes), (chunk_idx + 1) * CALLTREE_CHUNK_SIZE)):
+                node = nodes[i]
+                name = self._get_node_name(profile, node).strip()
+                func_link = self._get_node_func_link(node)
+                if ends[i] > i + 1:
+                    collapsible.add(name)
+                    if node.depth > 0 and i >= top_level_end:
+                        top_level.append([i, ends[i]])
+                        top_level_end = ends[i]
+                node_data += [
+                    int(node.depth), ends[i],
+                    strings.setdefault(name, len(strings)),
+                    strings.setdefault(node.cov_color, len(strings)),
+                    -1 if func_link is None else strings.setdefault(
+                        func_link, len(strings)),
+                    strings.setdefault(node.cov_callsite_link,
+                                       len(strings)), node.cov_ct_idx
+                ]
+            with open(f"{calltree_name}_chunk_{chunk_idx}.js", "w") as f:
+                f.write(f"calltreeChunkLoaded({json.dumps(calltree_name)}, "
+                        f"{chunk_idx}, ")
+                chunk_data = {"strings": list(strings), "nodes": node_data}
+                json.dump(chunk_data, f, separators=(",", ":"))
+                f.write(");\n")
+
+        with open(f"{calltree_name}_index.js", "w") as f:
+            f.write("var calltree_index = ")
+            json.dump(
+                {
+                    "nodeCount": len(nodes),
+                    "nodeFields": CALLTREE_NODE_FIELDS,
+                    "chunkSize": CALLTREE_CHUNK_SIZE,
+                    "chunkCount": chunk_count,
+                    "topLevel": top_level,
+                    "collapsible": sorted(collapsible)
+                },
+                f,
+                separators=(",", ":"))
+            f.write(";\n")
 
+    def create_calltree(self, profile: fuzzer_profile.FuzzerProfile) -> str:
+        logger.info("In calltree")
         # Write the HTML to a file called calltree_view_XX.html where XX is a counter.
         calltree_file_idx = 0
         calltree_html_file = f"calltree_view_{calltree_file_idx}.html"
@@ -193,10 +276,10 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
             calltree_html_file = f"calltree_view_{calltree_file_idx}.html"
 
         self.html_create_dedicated_calltree_file(
-            calltree_html_string,
             calltree_html_file,
             profile,
         )
+        logger.info("Calltree created")
         return calltree_html_file
 
     def collect_calltree_nodes(
@@ -234,13 +317,20 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
         return blocker_node_map
 
     def html_create_dedicated_calltree_file(
-            self, calltree_html_string: str, filename: str,
+            self, filename: str,
             profile: fuzzer_profile.FuzzerProfile) -> None:
         """
         Write a wrapped HTML file with the tags needed from fuzz-introspector
         We use this only for wrapping calltrees at the moment, however, down
         the line it makes sense to have an easy wrapper for other HTML pages too.
+
+        The page around the calltree is beautified as a whole, while the
+        calltree nodes are written already indented one by one, so the page
+        is never held in memory.
         """
+        if not self.dump_files:
+            return
+
         complete_html_string = ""
         blocker_infos = {}
         # HTML start
@@ -279,7 +369,24 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
             complete_html_string += fuzz_blocker_table
             complete_html_string += "</div>"
 
-        complete_html_string += calltree_html_string
+        # Generate HTML for the calltree
+        complete_html_string += "<h1>Fuzzer calltree</h1>"
+        complete_html_string += "<div id=\"calltree-wrapper\">"
+        complete_html_string += "<div class='call-tree-section-wrapper'>"
+        # The rows of the virtual calltree are created in javascript.
+        calltree_name = os.path.splitext(filename)[0]
+        if self.virtual_calltree:
+            complete_html_string += (
+                f"<div id=\"calltree-virtual\" data-calltree-name=\"{calltree_name}\">"
+                "</div>")
+        else:
+            complete_html_string += CALLTREE_NODES_PLACEHOLDER
+        complete_html_string += "</div>"  # call-tree-section-wrapper
+
+        # Side overview wrapper holds the vertical bitmap image. The actual
+        # visualisation happens in javascript rather than here.
+        complete_html_string += "<div id=\"side-overview-wrapper\"></div>"
+        complete_html_string += "</div>"  # calltree-wrapper
 
         # HTML end
         # close html header and content-section calltree-content-section
@@ -290,17 +397,31 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
             html_end += f'var fuzz_blocker_infos = \'{json.dumps(blocker_infos)}\';'
             html_end += "</script>"
 
+        if self.virtual_calltree:
+            html_end += f"<script src=\"{calltree_name}_index.js\"></script>"
         html_end += "<script src=\"calltree.js\"></script>"
         complete_html_string += html_end
 
         complete_html_string += "</body></html>"
 
-        # Beautify and write HTML
+        # Beautify the HTML and write the calltree nodes in place of the
+        # placeholder, at its indentation.
         soup = bs(complete_html_string, "html.parser")
         pretty_html = soup.prettify()
-        if self.dump_files:
+        if self.virtual_calltree:
             with open(filename, "w+") as cf:
                 cf.write(pretty_html)
+            self.write_calltree_data(profile, calltree_name)
+            return
+
+        html_head, html_tail = pretty_html.split(
+            CALLTREE_NODES_PLACEHOLDER + "\n", 1)
+        html_head_end = len(html_head.rstrip(" "))
+        with open(filename, "w+") as cf:
+            cf.write(html_head[:html_head_end])
+            self.write_calltree_nodes(cf, profile,
+                                      len(html_head) - html_head_end)
+            cf.write(html_tail)
 
     def create_str_node_ctx_idx(self, cov_ct_idx: str) -> str:
         prefixed_zeros = "0" * (len("00000") - len(cov_ct_idx))
@@ -315,8 +436,7 @@ class FuzzCalltreeAnalysis(analysis.AnalysisInterface):
         blocker_list: List[cfg_load.CalltreeCallsite] = list()
 
         # Extract all callsites in calltree and exit early if none
-        all_callsites = cfg_load.extract_all_callsites(
-            profile.fuzzer_callsite_calltree)
+        all_callsites = profile.get_callsites()
         if len(all_callsites) == 0:
             return blocker_list
 
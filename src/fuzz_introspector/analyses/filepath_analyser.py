@@ -44,10 +44,9 @@ class FilePathAnalysis(analysis.AnalysisInterface):
     def all_files_targeted(
             self,
             proj_profile: project_profile.MergedProjectProfile) -> Set[str]:
-        s1 = set()
+        s1: Set[str] = set()
         for prof in proj_profile.profiles:
-            for func in prof.all_class_functions:
-                s1.add(prof.all_class_functions[func].function_source_file)
+            s1.update(prof.get_file_functions())
         return s1
 
     def analysis_func(self,
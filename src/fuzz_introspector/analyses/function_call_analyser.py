@@ -165,9 +165,7 @@ class ThirdPartyAPICoverageAnalyser(analysis.AnalysisInterface):
         callsite_list = []
         function_list = []
         for profile in profiles:
-            callsite_list.extend(
-                cfg_load.extract_all_callsites(
-                    profile.fuzzer_callsite_calltree))
+            callsite_list.extend(profile.get_callsites())
             for key in profile.all_class_functions.keys():
                 function_list.append(profile.all_class_functions[key])
         (func_profile_list, called_func_dict,
@@ -16,9 +16,12 @@
 import copy
 import json
 import logging
+import os
 
 from typing import (
+    Dict,
     List,
+    Optional,
     Tuple,
 )
 
@@ -35,6 +38,135 @@ from fuzz_introspector.exceptions import DataLoaderError
 logger = logging.getLogger(name=__name__)
 
 
+def _clone_function_profile(
+        fd: function_profile.FunctionProfile
+) -> function_profile.FunctionProfile:
+    """Returns a copy of a function profile that can be updated by the
+    optimal target analysis without affecting the original."""
+    new_fd = copy.copy(fd)
+    new_fd.reached_by_fuzzers = list(fd.reached_by_fuzzers)
+    return new_fd
+
+
+def _clone_merged_profile(
+    merged_profile: project_profile.MergedProjectProfile
+) -> project_profile.MergedProjectProfile:
+    """Returns a copy of a merged profile where the functions can be updated
+    by the optimal target analysis without affecting the original. The
+    remaining data, which the analysis does not modify, is shared."""
+    new_profile = copy.copy(merged_profile)
+    new_profile.all_functions = {
+        func_name: _clone_function_profile(fd)
+        for func_name, fd in merged_profile.all_functions.items()
+    }
+    new_profile.dst_to_fd_cache = dict()
+    new_profile._set_fd_cache()
+    return new_profile
+
+
+class ReachabilityState:
+    """
+    Computes the state of a merged profile as if fuzzers are written for a
+    set of target functions, i.e. the hitcount and hitcount-related data of
+    each function in the merged profile.
+
+    The state is kept in a copy of the merged profile, see `merged_profile`.
+    Functions are indexed by their position in the profile, and each function
+    holds the indices of the functions reaching it, so adding a target only
+    updates the functions that reach a function hit for the first time.
+    """
+
+    def __init__(self,
+                 merged_profile: project_profile.MergedProjectProfile) -> None:
+        self.merged_profile = _clone_merged_profile(merged_profile)
+        self.functions = list(self.merged_profile.all_functions.values())
+        self.func_indices = {
+            func_name: idx
+            for idx, func_name in enumerate(self.merged_profile.all_functions)
+        }
+        self.is_jvm = merged_profile.profiles[0].target_lang == "jvm"
+
+        # For each function, the number of times it is reached by any given
+        # function in the profile.
+        self.reached_by: List[Dict[int,
+                                   int]] = [dict() for _ in self.functions]
+        for idx, fd in enumerate(self.functions):
+            for reached_idx in self._get_reached_indices(fd):
+                reached_by = self.reached_by[reached_idx]
+                reached_by[idx] = reached_by.get(idx, 0) + 1
+
+        # The complexity data of the profile is computed for all functions
+        # when the first target is added, and updated incrementally after.
+        self.has_complexity_data = False
+
+    def _get_reached_indices(
+            self, fd: function_profile.FunctionProfile) -> List[int]:
+        reached_indices = []
+        for func_name in fd.functions_reached:
+            if func_name not in self.func_indices:
+                if self.is_jvm:
+                    logger.debug(f"{func_name} not provided within classpath")
+                else:
+                    logger.debug(f"Mismatched function name: {func_name}")
+                continue
+            reached_indices.append(self.func_indices[func_name])
+        return reached_indices
+
+    def _set_complexity_data(self) -> None:
+        """Computes the hitcount-related data of all functions."""
+        for fd in self.functions:
+            cc = 0
+            uncovered_cc = 0
+            for reached_idx in self._get_reached_indices(fd):
+                f_reached = self.functions[reached_idx]
+                cc += f_reached.cyclomatic_complexity
+                if f_reached.hitcount == 0:
+                    uncovered_cc += f_reached.cyclomatic_complexity
+
+            # set complexity fields in the function
+            fd.new_unreached_complexity = uncovered_cc
+            if fd.hitcount == 0:
+                fd.new_unreached_complexity += fd.cyclomatic_complexity
+            fd.total_cyclomatic_complexity = cc + fd.cyclomatic_complexity
+        self.has_complexity_data = True
+
+    def add_function(self,
+                     func_to_add: function_profile.FunctionProfile) -> None:
+        """Marks `func_to_add` and the functions it reaches as hit, and
+        updates the complexity data affected by this."""
+        newly_hit = []
+
+        f = self.functions[self.func_indices[func_to_add.function_name]]
+        if f.cyclomatic_complexity == func_to_add.cyclomatic_complexity:
+            if f.hitcount == 0:
+                newly_hit.append(f)
+            f.hitcount = 1
+
+        fuzzer_name = utils.demangle_cpp_func(func_to_add.function_name)
+        for reached_idx in self._get_reached_indices(func_to_add):
+            f_reached = self.functions[reached_idx]
+            if f_reached.hitcount == 0:
+                newly_hit.append(f_reached)
+            f_reached.hitcount += 1
+            f_reached.reached_by_fuzzers.append(fuzzer_name)
+
+        if not self.has_complexity_data:
+            self._set_complexity_data()
+        else:
+            # Only functions reaching a newly hit function are affected.
+            for f_hit in newly_hit:
+                cc = f_hit.cyclomatic_complexity
+                f_hit.new_unreached_complexity -= cc
+                for idx, count in self.reached_by[self.func_indices[
+                        f_hit.function_name]].items():
+                    self.functions[idx].new_unreached_complexity -= cc * count
+
+        if f.hitcount == 0:
+            logger.info(
+                "Error. Hitcount did not get set for some reason. Exiting")
+            raise DataLoaderError("Hitcount did not get set for some reason")
+
+
 def add_func_to_reached_and_clone(
     merged_profile_old: project_profile.MergedProjectProfile,
     func_to_add: function_profile.FunctionProfile
@@ -46,62 +178,12 @@ def add_func_to_reached_and_clone(
     The use of this is to calculate what the state will be of a merged profile
     by targetting a new set of functions.
     We can use this function in a computation of "optimum fuzzer target analysis", which
-    computes what the combination of ideal function targets.
+    computes what the combination of ideal function targets. Use
+    `ReachabilityState` directly to add several functions.
     """
-    logger.info("Creating a deepcopy")
-    merged_profile = copy.deepcopy(merged_profile_old)
-
-    # Update hitcount of the function in the new merged profile
-    logger.info("Updating hitcount")
-    f = merged_profile.all_functions[func_to_add.function_name]
-    if f.cyclomatic_complexity == func_to_add.cyclomatic_complexity:
-        f.hitcount = 1
-
-    # Update hitcount of all functions reached by the function
-    for func_name in func_to_add.functions_reached:
-        if func_name not in merged_profile.all_functions:
-            if merged_profile_old.profiles[0].target_lang == "jvm":
-                logger.debug(f"{func_name} not provided within classpath")
-            else:
-                logger.debug(f"Mismatched function name: {func_name}")
-            continue
-        f = merged_profile.all_functions[func_name]
-        f.hitcount += 1
-
-        f.reached_by_fuzzers.append(
-            utils.demangle_cpp_func(func_to_add.function_name))
-
-    # Recompute all analysis that is based on hitcounts in all functions as hitcount has
-    # changed for elements in the dictionary.
-    logger.info("Updating hitcount-related data")
-    for f_profile in merged_profile.all_functions.values():
-        cc = 0
-        uncovered_cc = 0
-        for reached_func_name in f_profile.functions_reached:
-            if reached_func_name not in merged_profile.all_functions:
-                if merged_profile_old.profiles[0].target_lang == "jvm":
-                    logger.debug(
-                        f"{reached_func_name} not provided within classpath")
-                else:
-                    logger.debug(
-                        f"Mismatched function name: {reached_func_name}")
-                continue
-            f_reached = merged_profile.all_functions[reached_func_name]
-            cc += f_reached.cyclomatic_complexity
-            if f_reached.hitcount == 0:
-                uncovered_cc += f_reached.cyclomatic_complexity
-
-        # set complexity fields in the function
-        f_profile.new_unreached_complexity = uncovered_cc
-        if f_profile.hitcount == 0:
-            f_profile.new_unreached_complexity += f_profile.cyclomatic_complexity
-        f_profile.total_cyclomatic_complexity = cc + f_profile.cyclomatic_complexity
-
-    if merged_profile.all_functions[func_to_add.function_name].hitcount == 0:
-        logger.info("Error. Hitcount did not get set for some reason. Exiting")
-        raise DataLoaderError("Hitcount did not get set for some reason")
-
-    return merged_profile
+    reachability_state = ReachabilityState(merged_profile_old)
+    reachability_state.add_function(func_to_add)
+    return reachability_state.merged_profile
 
 
 class OptimalTargets(analysis.AnalysisInterface):
@@ -111,6 +193,12 @@ class OptimalTargets(analysis.AnalysisInterface):
         self.json_string_result = "[]"
         self.dump_files = True
 
+        # Number of optimal targets to find. If not set, the number is based
+        # on the size of the project.
+        drivers_to_create = os.environ.get('FI_OPTIMAL_TARGETS_COUNT', '')
+        self.drivers_to_create: Optional[int] = (
+            int(drivers_to_create) if drivers_to_create.isdigit() else None)
+
     @classmethod
     def get_name(cls):
         return cls.name
@@ -222,7 +310,9 @@ class OptimalTargets(analysis.AnalysisInterface):
         return target_fds
 
     def iteratively_get_optimal_targets(
-        self, merged_profile: project_profile.MergedProjectProfile
+        self,
+        merged_profile: project_profile.MergedProjectProfile,
+        drivers_to_create: Optional[int] = None
     ) -> Tuple[project_profile.MergedProjectProfile,
                List[function_profile.FunctionProfile]]:
         '''
@@ -232,25 +322,31 @@ class OptimalTargets(analysis.AnalysisInterface):
         in each fuzzer will be from the same source file.
         In a sense, this is more of a PoC wy to do some analysis on the data we have.
         It is likely that we could do something much better.
+
+        `drivers_to_create` is the number of targets to find, and defaults to
+        `self.drivers_to_create` or a number based on the project size.
         '''
         logger.info("  - in iteratively_get_optimal_targets")
-        new_merged_profile = copy.deepcopy(merged_profile)
+        reachability_state = ReachabilityState(merged_profile)
         optimal_functions_targeted: List[function_profile.FunctionProfile] = []
 
         # Extract all candidates
         target_fds = self.analysis_get_optimal_targets(merged_profile)
 
         # Determine number of fuzzers to create
-        drivers_to_create = 10
-        count_ranges = [
-            (10000, 1),
-            (5000, 3),
-            (2000, 7),
-        ]
-        for top, count in count_ranges:
-            if len(merged_profile.all_functions) > top:
-                drivers_to_create = count
-                break
+        if drivers_to_create is None:
+            drivers_to_create = self.drivers_to_create
+        if drivers_to_create is None:
+            drivers_to_create = 10
+            count_ranges = [
+                (10000, 1),
+                (5000, 3),
+                (2000, 7),
+            ]
+            for top, count in count_ranges:
+                if len(merged_profile.all_functions) > top:
+                    drivers_to_create = count
+                    break
         logger.info(f"Getting {drivers_to_create} optimal targets")
         while len(optimal_functions_targeted) < drivers_to_create:
             logger.info("  - sorting by unreached complexity. ")
@@ -262,23 +358,25 @@ class OptimalTargets(analysis.AnalysisInterface):
                         optimal_target_fd.new_unreached_complexity):
                     optimal_target_fd = potential_target
 
-            # Add function to optimal targets
-            optimal_functions_targeted.append(optimal_target_fd)
+            # Add function to optimal targets. The profiles in the reachability
+            # state are updated when adding targets, so keep a copy of the
+            # target as it is when selected.
+            optimal_functions_targeted.append(
+                _clone_function_profile(optimal_target_fd))
 
-            new_merged_profile = add_func_to_reached_and_clone(
-                new_merged_profile, optimal_target_fd)
+            reachability_state.add_function(optimal_target_fd)
 
             # Update the optimal targets. We only need to do this
             # if more drivers need to be created.
             if len(optimal_functions_targeted) < drivers_to_create:
                 target_fds = self.analysis_get_optimal_targets(
-                    new_merged_profile)
+                    reachability_state.merged_profile)
 
         logger.info("Found the following optimal functions: { %s }" %
                     (str([f.function_name
                           for f in optimal_functions_targeted])))
 
-        return new_merged_profile, optimal_functions_targeted
+        return reachability_state.merged_profile, optimal_functions_targeted
 
     def get_optimal_target_section(
             self,
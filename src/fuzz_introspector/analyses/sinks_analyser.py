@@ -151,9 +151,7 @@ class SinkCoverageAnalyser(analysis.AnalysisInterface):
 
             # Retrieve all call sites
             if profile.fuzzer_callsite_calltree is not None:
-                callsite_list.extend(
-                    cfg_load.extract_all_callsites(
-                        profile.fuzzer_callsite_calltree))
+                callsite_list.extend(profile.get_callsites())
 
             # Retrieve all functions
             for (key, function) in profile.all_class_functions.items():
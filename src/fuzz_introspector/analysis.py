@@ -15,13 +15,16 @@
 
 import abc
 import logging
-import multiprocessing
 import os
+import re
 import shutil
 
 from typing import (
     Dict,
+    Iterable,
     List,
+    Optional,
+    Tuple,
     Type,
     Set,
 )
@@ -38,6 +41,10 @@ from fuzz_introspector.exceptions import AnalysisError, DataLoaderError
 
 logger = logging.getLogger(name=__name__)
 
+# Identifiers directly followed by a "(" in header files.
+HEADER_CALL_RE = re.compile(r'(\w+)\(')
+HEADER_IDENTIFIER_RE = re.compile(r'\w+')
+
 
 class IntrospectionProject():
     """Wrapper class for managing Fuzz Introspector analysis.
@@ -60,9 +67,14 @@ class IntrospectionProject():
         based on the raw data given as arguments. This function must be called
         before any real use of `IntrospectionProject` can happen.
         """
+        # Profiles are correlated with their executables and accummulated
+        # while being loaded.
+        correlation_dict = utils.data_file_read_yaml(correlation_file)
         self.profiles = data_loader.load_all_profiles(self.base_folder,
                                                       self.language,
-                                                      parallelise)
+                                                      parallelise,
+                                                      correlation_dict,
+                                                      accummulate=True)
 
         logger.info(f"Found {len(self.profiles)} profiles")
         if len(self.profiles) == 0:
@@ -70,35 +82,6 @@ class IntrospectionProject():
             raise DataLoaderError("No fuzzer profiles")
 
         self.input_bugs = data_loader.try_load_input_bugs()
-        correlation_dict = utils.data_file_read_yaml(correlation_file)
-        if correlation_dict is not None and "pairings" in correlation_dict:
-            for profile in self.profiles:
-                profile.correlate_executable_name(correlation_dict)
-
-        logger.info("[+] Accummulating profiles")
-        logger.info("Accummulating using multiprocessing")
-        manager = multiprocessing.Manager()
-        semaphore = multiprocessing.Semaphore(10)
-
-        return_dict = manager.dict()
-
-        jobs = []
-        idx = 0
-        for profile in self.profiles:
-            p = multiprocessing.Process(
-                target=fuzzer_profile.FuzzerProfile.accummulate_profile,
-                args=(profile, self.base_folder, return_dict, f"uniq-{idx}",
-                      semaphore))
-            jobs.append(p)
-            idx += 1
-            p.start()
-        for proc in jobs:
-            proc.join()
-
-        new_profiles = []
-        for idx in return_dict:
-            new_profiles.append(return_dict[idx])
-        self.profiles = new_profiles
 
         logger.info("[+] Creating project profile")
         self.proj_profile = project_profile.MergedProjectProfile(self.profiles)
@@ -309,13 +292,8 @@ def get_node_coverage_hitcount(demangled_name: str, callstack: Dict[int, str],
                 # Handle coverage
                 return profile.coverage.get_kernel_hitcount(node)
             else:
-                coverage_data = profile.coverage.get_hit_details(
-                    callstack_get_parent(node, callstack))
-                for (n_line_number, hit_count_cov) in coverage_data:
-                    logger.debug("  - iterating %d : %d", n_line_number,
-                                 hit_count_cov)
-                    if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                        node_hitcount = hit_count_cov
+                node_hitcount = profile.coverage.get_func_lineno_hitcount(
+                    callstack_get_parent(node, callstack), node.src_linenumber)
         elif profile.target_lang == "python":
             ih = profile.coverage.is_file_lineno_hit(
                 callstack_get_parent(node, callstack), node.src_linenumber,
@@ -323,13 +301,8 @@ def get_node_coverage_hitcount(demangled_name: str, callstack: Dict[int, str],
             if ih:
                 node_hitcount = 200
         elif profile.target_lang == "jvm":
-            coverage_data = profile.coverage.get_hit_details(
-                callstack_get_parent(node, callstack))
-            for (n_line_number, hit_count_cov) in coverage_data:
-                logger.debug("  - iterating %d : %d", n_line_number,
-                             hit_count_cov)
-                if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                    node_hitcount = hit_count_cov
+            node_hitcount = profile.coverage.get_func_lineno_hitcount(
+                callstack_get_parent(node, callstack), node.src_linenumber)
         node.cov_parent = callstack_get_parent(node, callstack)
     else:
         logger.error(
@@ -342,10 +315,7 @@ def get_node_coverage_hitcount(demangled_name: str, callstack: Dict[int, str],
 
 def get_hit_count_color(hit_count: int) -> str:
     """Map hitcount to color of target"""
-    for cmin, cmax, cname, _ in constants.COLOR_CONSTANTS:
-        if hit_count >= cmin and hit_count < cmax:
-            return cname
-    return "red"
+    return cfg_load.get_hit_count_color(hit_count)
 
 
 def get_url_to_cov_report(profile, node, target_coverage_url):
@@ -427,8 +397,11 @@ def overlay_calltree_with_coverage(
     target_coverage_url = utils.get_target_coverage_url(
         coverage_url, target_name, profile.target_lang)
     logger.info("Using coverage url: %s", target_coverage_url)
-    for node in cfg_load.extract_all_callsites(
-            profile.fuzzer_callsite_calltree):
+
+    # Many nodes share the same links, so only create each of them once.
+    cov_links: Dict[Tuple[str, str], str] = dict()
+    cov_callsite_links: Dict[Tuple[str, int], str] = dict()
+    for node in profile.get_callsites():
         node.cov_ct_idx = ct_idx
         ct_idx += 1
 
@@ -449,28 +422,39 @@ def overlay_calltree_with_coverage(
                                                        profile, is_first)
         is_first = False
 
-        node.cov_color = get_hit_count_color(node.cov_hitcount)
-        node.cov_link = get_url_to_cov_report(profile, node,
-                                              target_coverage_url)
-        node.cov_callsite_link = get_parent_callsite_link(
-            node, callstack, profile, target_coverage_url)
+        link_key = (node.dst_function_name, node.dst_function_source_file)
+        if link_key not in cov_links:
+            cov_links[link_key] = get_url_to_cov_report(
+                profile, node, target_coverage_url)
+        node.cov_link = cov_links[link_key]
+
+        if callstack_has_parent(node, callstack):
+            callsite_link_key = (callstack_get_parent(node, callstack),
+                                 node.src_linenumber)
+            if callsite_link_key not in cov_callsite_links:
+                cov_callsite_links[
+                    callsite_link_key] = get_parent_callsite_link(
+                        node, callstack, profile, target_coverage_url)
+            node.cov_callsite_link = cov_callsite_links[callsite_link_key]
+        else:
+            node.cov_callsite_link = "#"
+    if profile.coverage is not None:
+        logger.info("Coverage key cache: %d hits, %d misses",
+                    profile.coverage.covmap_key_cache_hits,
+                    profile.coverage.covmap_key_cache_misses)
     # For python, do a hack where we check if any node is covered, and, if so,
     # ensure the entrypoint is covered.
     logger.info("Overlaying 2")
-    all_nodes = cfg_load.extract_all_callsites(
-        profile.fuzzer_callsite_calltree)
+    all_nodes = profile.get_callsites()
     if len(all_nodes) > 0:
-        for node in cfg_load.extract_all_callsites(
-                profile.fuzzer_callsite_calltree)[1:]:
+        for node in all_nodes[1:]:
             if node.cov_hitcount > 0:
                 all_nodes[0].cov_hitcount = 200
-                all_nodes[0].cov_color = get_hit_count_color(200)
                 break
 
     # Extract data about which nodes unlocks data
     logger.info("Overlaying 3")
-    all_callsites = cfg_load.extract_all_callsites(
-        profile.fuzzer_callsite_calltree)
+    all_callsites = profile.get_callsites()
     prev_end = -1
     for idx1 in range(len(all_callsites)):
         n1 = all_callsites[idx1]
@@ -912,6 +896,47 @@ def correlate_introspector_func_to_debug_information(if_func,
     return None, None
 
 
+class HeaderFileIndex:
+    """Index of the functions that are called or declared in a set of header
+    files, i.e. names followed by a "(".
+
+    The headers are read once, and the index holds every suffix of each
+    identifier preceding a "(", so a lookup gives the same result as searching
+    for `name(` in the content of each header.
+    """
+
+    def __init__(self, header_files: Iterable[str]) -> None:
+        self.header_contents: Dict[str, str] = dict()
+        self.name_to_headers: Dict[str, Set[str]] = dict()
+
+        for header_file in header_files:
+            if not header_file.endswith((".h", ".hpp")):
+                continue
+            if not os.path.isfile(header_file):
+                continue
+            try:
+                with open(header_file, 'r') as header_file_fd:
+                    content = header_file_fd.read()
+            except UnicodeDecodeError:
+                content = ""
+            self.header_contents[header_file] = content
+
+            for identifier in set(HEADER_CALL_RE.findall(content)):
+                for idx in range(len(identifier)):
+                    self.name_to_headers.setdefault(identifier[idx:],
+                                                    set()).add(header_file)
+
+    def get_headers_with_function(self, name: str) -> Set[str]:
+        """Returns the header files containing `name(`"""
+        if HEADER_IDENTIFIER_RE.fullmatch(name):
+            return self.name_to_headers.get(name, set())
+
+        # Names that are not plain identifiers are not indexed.
+        return set(header_file
+                   for header_file, content in self.header_contents.items()
+                   if f'{name}(' in content)
+
+
 def correlate_introspection_functions_to_debug_info(all_functions_json_report,
                                                     debug_all_functions,
                                                     proj_lang,
@@ -932,29 +957,17 @@ def correlate_introspection_functions_to_debug_info(all_functions_json_report,
     # faster.
     debug_dict_by_name = dict()
     debug_dict_by_filename = dict()
+    header_index: Optional[HeaderFileIndex] = None
     for df in debug_all_functions:
         # Normalize the source file
         df['source']['source_file'] = os.path.normpath(df['source'].get(
             'source_file', ''))
 
         # Find the header file of this debug function.
-        possible_header_files = set()
-        for header_src_file in normalized_paths:
-            if not (header_src_file.endswith(".h")
-                    or header_src_file.endswith(".hpp")):
-                continue
-            if not os.path.isfile(header_src_file):
-                continue
-            try:
-                with open(header_src_file, 'r') as header_file_fd:
-                    content = header_file_fd.read()
-            except UnicodeDecodeError:
-                content = ""
-
-            name = df.get('name', 'TOTALLYRANDOMNOTFUNCNAME123')
-            for line_idx, line in enumerate(content.split("\n")):
-                if f'{name}(' in line:
-                    possible_header_files.add(header_src_file)
+        if header_index is None:
+            header_index = HeaderFileIndex(normalized_paths)
+        possible_header_files = header_index.get_headers_with_function(
+            df.get('name', 'TOTALLYRANDOMNOTFUNCNAME123'))
         df['possible-header-files'] = list(possible_header_files)
 
         # Append debug function to name-index.
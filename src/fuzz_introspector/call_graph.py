@@ -0,0 +1,173 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+""" Module for reachability analysis on call graphs """
+
+import logging
+
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+logger = logging.getLogger(name=__name__)
+
+
+class ReachableSet():
+    """
+    Compact set of functions, stored as a bitset over the indices of a table
+    of function names that is shared by all sets of a call graph.
+    """
+
+    __slots__ = ('names', 'bits')
+
+    def __init__(self, names: List[str], bits: int) -> None:
+        self.names = names
+        self.bits = bits
+
+    def __len__(self) -> int:
+        return bin(self.bits).count('1')
+
+    def indices(self) -> Iterator[int]:
+        """Yields the indices of the functions in the set in ascending
+        order."""
+        reversed_bits = bin(self.bits)[:1:-1]
+        idx = reversed_bits.find('1')
+        while idx != -1:
+            yield idx
+            idx = reversed_bits.find('1', idx + 1)
+
+    def to_names(self) -> List[str]:
+        """Returns the names of the functions in the set."""
+        return [self.names[idx] for idx in self.indices()]
+
+
+def _get_strongly_connected_components(
+        successors: List[List[int]]) -> Tuple[List[List[int]], List[int]]:
+    """Iterative version of Tarjan's algorithm. Returns the components in
+    reverse topological order, i.e. a component is returned after all the
+    components it has edges to, and the component index of each node."""
+    node_count = len(successors)
+    index = [-1] * node_count
+    lowlink = [0] * node_count
+    on_stack = [False] * node_count
+    component_of = [-1] * node_count
+    stack: List[int] = []
+    components: List[List[int]] = []
+    next_index = 0
+
+    for root in range(node_count):
+        if index[root] != -1:
+            continue
+        index[root] = lowlink[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, edge_idx = work[-1]
+            node_successors = successors[node]
+            if edge_idx < len(node_successors):
+                work[-1] = (node, edge_idx + 1)
+                succ = node_successors[edge_idx]
+                if index[succ] == -1:
+                    index[succ] = lowlink[succ] = next_index
+                    next_index += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    work.append((succ, 0))
+                elif on_stack[succ] and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component_of[member] = len(components)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components, component_of
+
+
+def propagate_reachability(
+    call_graph: Dict[str, Iterable[str]]
+) -> Tuple[Dict[str, ReachableSet], Dict[str, int]]:
+    """
+    Computes the functions transitively reached by each function in
+    `call_graph`, which maps function names to the names of the functions
+    they call. Called functions that are not in `call_graph` are reached but
+    do not call anything.
+
+    The graph is condensed into its strongly connected components, so the
+    reachable set of each component is computed once as the union of the
+    sets of the components it calls.
+
+    Returns the reachable set of each function in `call_graph` and its
+    depth, which is the longest chain of calls from the function where calls
+    within a set of mutually recursive functions are not counted.
+    """
+    names: List[str] = list(call_graph)
+    name_to_idx: Dict[str, int] = {name: idx for idx, name in enumerate(names)}
+    successors: List[List[int]] = []
+    for name in list(names):
+        node_successors = []
+        for callee in call_graph[name]:
+            callee_idx = name_to_idx.get(callee)
+            if callee_idx is None:
+                callee_idx = len(names)
+                name_to_idx[callee] = callee_idx
+                names.append(callee)
+            node_successors.append(callee_idx)
+        successors.append(node_successors)
+    for _ in range(len(successors), len(names)):
+        successors.append([])
+
+    components, component_of = _get_strongly_connected_components(successors)
+    logger.info("Condensed %d functions into %d components", len(names),
+                len(components))
+
+    component_bits = [0] * len(components)
+    component_depth = [0] * len(components)
+    for component_idx, component in enumerate(components):
+        bits = 0
+        depth = 0
+        for node in component:
+            for succ in successors[node]:
+                bits |= 1 << succ
+                succ_component = component_of[succ]
+                if succ_component != component_idx:
+                    bits |= component_bits[succ_component]
+                    depth = max(depth, component_depth[succ_component] + 1)
+        component_bits[component_idx] = bits
+        component_depth[component_idx] = depth
+
+    reachable_sets: Dict[str, ReachableSet] = dict()
+    depths: Dict[str, int] = dict()
+    for name in call_graph:
+        component_idx = component_of[name_to_idx[name]]
+        reachable_sets[name] = ReachableSet(names,
+                                            component_bits[component_idx])
+        depths[name] = component_depth[component_idx]
+    return reachable_sets, depths
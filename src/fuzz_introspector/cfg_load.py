@@ -13,10 +13,12 @@
 # limitations under the License.
 """ Module for loading CFG files """
 
+import array
 import logging
 
-from typing import (List, Optional)
+from typing import (Dict, Iterator, List, Optional, Tuple)
 
+from fuzz_introspector import constants
 from fuzz_introspector.exceptions import CalltreeError
 
 logger = logging.getLogger(name=__name__)
@@ -27,6 +29,14 @@ class CalltreeCallsite():
     Represents a single node in the calltree
     """
 
+    # Calltrees can have millions of nodes, so avoid a __dict__ per node.
+    __slots__ = ('dst_function_name', 'dst_function_source_file',
+                 'src_linenumber', 'parent_calltree_callsite', 'depth',
+                 'src_function_source_file', 'src_function_name', 'children',
+                 'cov_ct_idx', 'cov_parent', 'cov_hitcount', 'hitcount',
+                 'cov_link', 'cov_callsite_link', 'cov_forward_reds',
+                 'cov_largest_blocked_func')
+
     def __init__(
             self, dst_function_name: str, dst_function_source_file: str,
             depth: int, src_linenumber: int,
@@ -45,23 +55,47 @@ class CalltreeCallsite():
         self.cov_ct_idx: int = -1
         self.cov_parent: str = ""
         self.cov_hitcount: int = -1
-        self.cov_color: str = ""
         self.hitcount = 0
         self.cov_link: str = ""
         self.cov_callsite_link: str = ""
         self.cov_forward_reds: int = -1
         self.cov_largest_blocked_func: str = ""
 
+    @property
+    def cov_color(self) -> str:
+        """Color of the node based on its runtime coverage hitcount. Empty
+        if the calltree has not been overlaid with coverage."""
+        if self.cov_ct_idx == -1:
+            return ""
+        return get_hit_count_color(self.cov_hitcount)
+
+
+def get_hit_count_color(hit_count: int) -> str:
+    """Map hitcount to color of target"""
+    for cmin, cmax, cname, _ in constants.COLOR_CONSTANTS:
+        if hit_count >= cmin and hit_count < cmax:
+            return cname
+    return "red"
+
 
 def extract_all_callsites_recursive(
         calltree: CalltreeCallsite,
         callsite_nodes: List[CalltreeCallsite]) -> None:
     """
-    Given a node, will assemble all callsites in the children. Recursive function.
+    Given a node, will assemble all callsites in the children in pre-order.
+    Uses an explicit stack, so the depth of the calltree is not bounded by
+    the recursion limit.
     """
     callsite_nodes.append(calltree)
-    for c in calltree.children:
-        extract_all_callsites_recursive(c, callsite_nodes)
+    stack = [iter(calltree.children)]
+    while stack:
+        for node in stack[-1]:
+            callsite_nodes.append(node)
+            if node.children:
+                stack.append(iter(node.children))
+                break
+        else:
+            stack.pop()
 
 
 def extract_all_callsites(
@@ -83,38 +117,100 @@ def print_ctcs_tree(ctcs: CalltreeCallsite) -> None:
         print_ctcs_tree(c)
 
 
-def data_file_read_calltree(filename: str) -> Optional[CalltreeCallsite]:
+class CalltreeArrays():
     """
-    Extracts the calltree of a fuzzer from a .data file.
-    This is for C/C++ files
-
-    Returns a CalltreeCallsite that is the root of the tree read.
+    Array-backed representation of a calltree. Callsite `idx` has depth
+    `depths[idx]`, calls `names[name_ids[idx]]` in `files[file_ids[idx]]`
+    from line `linenumbers[idx]`, and has the parent callsite
+    `parents[idx]`, which is -1 for a callsite without a parent. Callsites
+    are stored in the order of the calltree file.
     """
+
+    def __init__(self) -> None:
+        self.depths = array.array('i')
+        self.name_ids = array.array('i')
+        self.file_ids = array.array('i')
+        self.linenumbers = array.array('i')
+        self.parents = array.array('i')
+        self.names: List[str] = []
+        self.files: List[str] = []
+        self.name_to_id: Dict[str, int] = dict()
+        self.file_to_id: Dict[str, int] = dict()
+
+        # Index of the root callsite, or -1 if there is none.
+        self.root = -1
+
+    def __len__(self) -> int:
+        return len(self.depths)
+
+    def append(self, depth: int, dst_function_name: str,
+               dst_function_source_file: str, src_linenumber: int,
+               parent: int) -> int:
+        """Adds a callsite and returns its index."""
+        name_id = self.name_to_id.get(dst_function_name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.name_to_id[dst_function_name] = name_id
+            self.names.append(dst_function_name)
+        file_id = self.file_to_id.get(dst_function_source_file)
+        if file_id is None:
+            file_id = len(self.files)
+            self.file_to_id[dst_function_source_file] = file_id
+            self.files.append(dst_function_source_file)
+
+        self.depths.append(depth)
+        self.name_ids.append(name_id)
+        self.file_ids.append(file_id)
+        self.linenumbers.append(src_linenumber)
+        self.parents.append(parent)
+        return len(self.depths) - 1
+
+    def to_calltree(self) -> Optional[CalltreeCallsite]:
+        """Creates the CalltreeCallsite tree and returns its root."""
+        if self.root == -1:
+            return None
+
+        nodes: List[CalltreeCallsite] = []
+        names = self.names
+        files = self.files
+        for idx in range(len(self.depths)):
+            parent_idx = self.parents[idx]
+            parent = nodes[parent_idx] if parent_idx != -1 else None
+            ctcs = CalltreeCallsite(names[self.name_ids[idx]],
+                                    files[self.file_ids[idx]],
+                                    self.depths[idx], self.linenumbers[idx],
+                                    parent)
+            if parent is not None:
+                ctcs.src_function_name = parent.dst_function_name
+                parent.children.append(ctcs)
+            nodes.append(ctcs)
+        return nodes[self.root]
+
+
+def _iter_calltree_lines(filename: str) -> Iterator[Tuple[int, str, str, int]]:
+    """Yields the depth, function, source file and line number of each
+    callsite in the calltree of a .data file."""
     read_tree = False
-    curr_ctcs_node = None
-    curr_depth = -1
     with open(filename, "r") as flog:
-        # Read in all lines catching decode errors
-        all_lines = []
         try:
             for line in flog:
-                all_lines.append(line)
-        except UnicodeDecodeError:
-            raise CalltreeError("Decoding error when reading CFG file")
+                line = line.rstrip("\n")
+                if not read_tree or "======" in line:
+                    if "====================================" in line:
+                        read_tree = False
+                    if "Call tree" in line:
+                        read_tree = True
+                    continue
 
-        for line in all_lines:
-            line = line.replace("\n", "")
-            if read_tree and "======" not in line:
-                stripped_line = line.strip().split(" ")
                 # Parse the line
                 # Type: {spacing depth} {target filename} {line count}
+                stripped_line = line.strip().split(" ")
+                target_func = stripped_line[0]
                 if len(stripped_line) == 3:
-                    target_func = stripped_line[0]
                     filename = stripped_line[1]
                     linenumber = int(stripped_line[2].replace(
                         "linenumber=", ""))
                 else:
-                    target_func = stripped_line[0]
                     filename = ""
                     linenumber = 0
 
@@ -123,55 +219,69 @@ def data_file_read_calltree(filename: str) -> Optional[CalltreeCallsite]:
                     target_func = target_func.replace("......", "")
 
                 space_count = len(line) - len(line.lstrip(' '))
-                depth = int(space_count / 2)
-
-                # Create a callsite nide
-                ctcs = CalltreeCallsite(target_func, filename, depth,
-                                        linenumber, curr_ctcs_node)
-
-                # Check if this node is still a child of the current parent node and handle if not.
-                if curr_depth == -1:
-                    # First node
-                    curr_ctcs_node = ctcs
-                elif depth > curr_depth and curr_ctcs_node is not None:
-                    # We are going one calldepth deeper
-                    # Special case in the root parent case, where we have no parent in the current
-                    # node
-                    # and also no children.
-                    if (curr_ctcs_node.parent_calltree_callsite is None
-                            and len(curr_ctcs_node.children) == 0):
-                        None
-                    else:
-                        curr_ctcs_node = curr_ctcs_node.children[-1]
-
-                elif depth < curr_depth and curr_ctcs_node is not None:
-                    # We are going up, find out how much
-                    depth_diff = int(curr_depth - depth)
-                    tmp_node = curr_ctcs_node
-                    idx = 0
-                    while idx < depth_diff and tmp_node.parent_calltree_callsite is not None:
-                        tmp_node = tmp_node.parent_calltree_callsite
-                        idx += 1
-                    curr_ctcs_node = tmp_node
-                # Add the node to the current parent
-                if curr_depth != -1 and curr_ctcs_node is not None:
-                    ctcs.parent_calltree_callsite = curr_ctcs_node
-                    ctcs.src_function_name = ctcs.parent_calltree_callsite.dst_function_name
-                    curr_ctcs_node.children.append(ctcs)
-                curr_depth = depth
-
-            if "====================================" in line:
-                read_tree = False
-            if "Call tree" in line:
-                read_tree = True
+                yield space_count // 2, target_func, filename, linenumber
+        except UnicodeDecodeError:
+            raise CalltreeError("Decoding error when reading CFG file")
+
+
+def data_file_read_calltree_arrays(filename: str) -> CalltreeArrays:
+    """
+    Extracts the calltree of a fuzzer from a .data file into a
+    CalltreeArrays. This is for C/C++ files
+    """
+    calltree = CalltreeArrays()
+    depths = calltree.depths
+    parents = calltree.parents
+    add_callsite = calltree.append
+
+    # Path from the first callsite to the parent of the next callsite at
+    # `curr_depth`, or to the first callsite until a second one is read.
+    parent_stack: List[int] = []
+    curr_depth = -1
+    for depth, target_func, filename, linenumber in _iter_calltree_lines(
+            filename):
+        if depth == curr_depth:
+            add_callsite(depth, target_func, filename, linenumber,
+                         parent_stack[-1])
+            continue
+
+        if curr_depth == -1:
+            # First node
+            parent_stack.append(
+                add_callsite(depth, target_func, filename, linenumber, -1))
+            curr_depth = depth
+            continue
+
+        if depth > curr_depth:
+            # We are going one calldepth deeper. Special case in the root
+            # parent case, where we have no parent in the current node and
+            # also no children.
+            last_idx = len(depths) - 1
+            if last_idx != 0:
+                parent_stack.append(last_idx)
+        else:
+            # We are going up, find out how much
+            for _ in range(min(curr_depth - depth, len(parent_stack) - 1)):
+                parent_stack.pop()
+
+        add_callsite(depth, target_func, filename, linenumber,
+                     parent_stack[-1])
+        curr_depth = depth
 
     # move upwards from any node in the tree
-    ctcs_root: Optional[CalltreeCallsite] = curr_ctcs_node
-    if ctcs_root is None:
-        return None
-    while ctcs_root.depth != 0:
-        ctcs_root = ctcs_root.parent_calltree_callsite
-        if ctcs_root is None:
-            return None
-    # print_ctcs_tree(ctcs_root)
-    return ctcs_root
+    if parent_stack:
+        root = parent_stack[-1]
+        while root != -1 and depths[root] != 0:
+            root = parents[root]
+        calltree.root = root
+    return calltree
+
+
+def data_file_read_calltree(filename: str) -> Optional[CalltreeCallsite]:
+    """
+    Extracts the calltree of a fuzzer from a .data file.
+    This is for C/C++ files
+
+    Returns a CalltreeCallsite that is the root of the tree read.
+    """
+    return data_file_read_calltree_arrays(filename).to_calltree()
@@ -13,21 +13,33 @@
 # limitations under the License.
 """Module for handling code coverage reports"""
 
+import array
+import bisect
+import collections
 import os
 import sys
+import gc
+import itertools
 import json
 import logging
+import mmap
+import multiprocessing
+import operator
 import re
 
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Iterator,
     List,
+    OrderedDict,
     Set,
     Optional,
     Tuple,
 )
 
+from fuzz_introspector import constants
 from fuzz_introspector import utils
 from fuzz_introspector import exceptions
 
@@ -35,9 +47,117 @@ COVERAGE_SWITCH_REGEX = re.compile(r'.*\|.*\sswitch.*\(.*\)')
 COVERAGE_CASE_REGEX = re.compile(r'.*\|.*\scase.*:')
 COVERAGE_BRANCH_REGEX = re.compile(r'.*\|.*\sBranch.*\(.*:.*\):')
 
+# Size of the chunks llvm-cov reports are decoded in.
+LLVM_COVERAGE_CHUNK_SIZE = 64 << 20
+LLVM_COVERAGE_COUNT_UNITS = {'k': 1000, 'M': 1000000, 'G': 1000000000}
+
+# Maximum number of function names without coverage that a CoverageProfile
+# remembers.
+COVERAGE_MISSING_KEYS_CACHE_SIZE = 1 << 16
+
+# Size of the chunks jacoco.xml reports are fed to the parser in.
+JVM_COVERAGE_CHUNK_SIZE = 1 << 20
+
+# Size of the chunks Syzkaller JSON coverage files are decoded in.
+KERNEL_COVERAGE_CHUNK_SIZE = 1 << 20
+JSON_NON_WHITESPACE_REGEX = re.compile(r'[^ \t\n\r]')
+JSON_NUMBER_START = '-0123456789'
+JSON_NUMBER_END = ' \t\n\r,]'
+
 logger = logging.getLogger(name=__name__)
 
 
+class FunctionLineHits:
+    """Line coverage of a single function, stored as arrays of line numbers
+    and hitcounts sorted by line number. Entries with the same line number
+    keep the order they have in the coverage map.
+    """
+
+    __slots__ = ('linenumbers', 'hitcounts', 'lines_hit')
+
+    def __init__(self, line_hits: List[Tuple[int, int]]) -> None:
+        ordered = sorted(line_hits, key=operator.itemgetter(0))
+        self.linenumbers = array.array('q', [ln for ln, _ in ordered])
+        self.hitcounts = array.array('q', [ht for _, ht in ordered])
+        self.lines_hit = sum(1 for ht in self.hitcounts if ht > 0)
+
+    def __len__(self) -> int:
+        return len(self.linenumbers)
+
+    def get_lineno_hitcounts(self, lineno: int) -> array.array:
+        """Returns the hitcounts of all entries for `lineno`."""
+        start = bisect.bisect_left(self.linenumbers, lineno)
+        end = bisect.bisect_right(self.linenumbers, lineno, start)
+        return self.hitcounts[start:end]
+
+
+class FileSuffixIndex:
+    """Index of file paths by their suffixes. The reversed paths are kept
+    sorted, so the paths that end with a given suffix form a contiguous range
+    found with bisect. Sparse tables over the range give the first and last
+    of those paths in the original order.
+    """
+
+    __slots__ = ('paths', 'reversed_paths', 'first_table', 'last_table')
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        self.paths = list(paths)
+        positions = sorted(range(len(self.paths)),
+                           key=lambda position: self.paths[position][::-1])
+        self.reversed_paths = [
+            self.paths[position][::-1] for position in positions
+        ]
+        self.first_table = self._build_sparse_table(positions, min)
+        self.last_table = self._build_sparse_table(positions, max)
+
+    @staticmethod
+    def _build_sparse_table(values: List[int], func) -> List[List[int]]:
+        """Row k holds `func` of each range of 2^k values."""
+        table = [values]
+        span = 1
+        while 2 * span <= len(values):
+            row = table[-1]
+            table.append(list(map(func, row[:-span], row[span:])))
+            span *= 2
+        return table
+
+    def _get_range(self, suffix: str) -> Tuple[int, int]:
+        """Returns the range of `reversed_paths` of the paths ending with
+        `suffix`."""
+        reversed_suffix = suffix[::-1]
+        start = bisect.bisect_left(self.reversed_paths, reversed_suffix)
+        # Paths do not contain the largest code point, so this is past all
+        # reversed paths starting with the reversed suffix.
+        end = bisect.bisect_left(self.reversed_paths,
+                                 reversed_suffix + '\U0010ffff', start)
+        return start, end
+
+    def _query(self, table: List[List[int]], func,
+               suffix: str) -> Optional[int]:
+        start, end = self._get_range(suffix)
+        if start == end:
+            return None
+        level = (end - start).bit_length() - 1
+        row = table[level]
+        return func(row[start], row[end - (1 << level)])
+
+    def get_first_position(self, suffix: str) -> Optional[int]:
+        """Returns the first position in `paths` of a path ending with
+        `suffix`, or `None` if there is none."""
+        return self._query(self.first_table, min, suffix)
+
+    def get_last_position(self, suffix: str) -> Optional[int]:
+        """Returns the last position in `paths` of a path ending with
+        `suffix`, or `None` if there is none."""
+        return self._query(self.last_table, max, suffix)
+
+    def get_positions(self, suffix: str) -> List[int]:
+        """Returns the positions in `paths` of all paths ending with
+        `suffix`, in ascending order."""
+        start, end = self._get_range(suffix)
+        return sorted(self.first_table[0][start:end])
+
+
 class CoverageProfile:
     """Stores and handles a runtime coverage data.
 
@@ -65,6 +185,31 @@ class CoverageProfile:
         self.coverage_files: List[str] = []
         self.dual_file_map: Dict[str, Dict[str, List[int]]] = dict()
         self.kernel_coverage: List[Dict[Any, Any]] = []
+        # Index of the entries of covmap, keyed by function. The covmap list
+        # and its length are stored to detect changes of covmap.
+        self._line_hits: Dict[str, Tuple[List[Tuple[int, int]], int,
+                                         FunctionLineHits]] = dict()
+        # Cache of the covmap keys that queried function names resolve to.
+        # Names that resolve to no key are kept in a bounded LRU. The size of
+        # covmap is stored since new keys may change how names resolve.
+        self._covmap_keys: Dict[str, str] = dict()
+        self._missing_covmap_keys: OrderedDict[str, None] = (
+            collections.OrderedDict())
+        self._covmap_keys_size = 0
+        self.covmap_key_cache_hits = 0
+        self.covmap_key_cache_misses = 0
+        # Index of the files in file_map by path suffix, and the files that
+        # Python module paths resolved to.
+        self._file_suffix_index = FileSuffixIndex([])
+        self._file_suffix_index_size = 0
+        self._resolved_cov_files: Dict[str, Optional[str]] = dict()
+        # Index of the kernel_coverage modules by file name suffix with the
+        # sorted covered lines of each module, and the covered lines of all
+        # modules matching each calltree source file.
+        self._kernel_suffix_index = FileSuffixIndex([])
+        self._kernel_covered_lines: List[List[int]] = []
+        self._kernel_index_size = 0
+        self._kernel_file_covered_lines: Dict[str, List[int]] = dict()
 
     def set_type(self, cov_type: str) -> None:
         self._cov_type = cov_type
@@ -85,14 +230,41 @@ class CoverageProfile:
         if target_file.startswith('../'):
             target_file = target_file[3:]
 
-        for cov_module in self.kernel_coverage:
-            if cov_module['Filename'].endswith(target_file):
-                # Check if the line is hit
-                for i in range(10):
-                    if lineno + i in cov_module.get('Covered', []):
-                        return 100
+        # Check if any of the 10 lines from lineno is hit in a module of the
+        # file.
+        covered_lines = self._get_kernel_covered_lines(target_file)
+        idx = bisect.bisect_left(covered_lines, lineno)
+        if idx < len(covered_lines) and covered_lines[idx] < lineno + 10:
+            return 100
         return 0
 
+    def _get_kernel_covered_lines(self, target_file: str) -> List[int]:
+        """Returns the sorted covered lines of all kernel coverage modules
+        whose file name ends with `target_file`."""
+        if len(self.kernel_coverage) != self._kernel_index_size:
+            self._kernel_suffix_index = FileSuffixIndex(
+                cov_module['Filename'] for cov_module in self.kernel_coverage)
+            self._kernel_covered_lines = [
+                sorted(set(cov_module.get('Covered', [])))
+                for cov_module in self.kernel_coverage
+            ]
+            self._kernel_index_size = len(self.kernel_coverage)
+            self._kernel_file_covered_lines.clear()
+
+        covered_lines = self._kernel_file_covered_lines.get(target_file)
+        if covered_lines is None:
+            positions = self._kernel_suffix_index.get_positions(target_file)
+            if len(positions) == 1:
+                covered_lines = self._kernel_covered_lines[positions[0]]
+            else:
+                covered_lines = sorted(
+                    set(
+                        itertools.chain.from_iterable(
+                            self._kernel_covered_lines[position]
+                            for position in positions)))
+            self._kernel_file_covered_lines[target_file] = covered_lines
+        return covered_lines
+
     def is_file_lineno_hit(self,
                            target_file: str,
                            lineno: int,
@@ -170,21 +342,84 @@ class CoverageProfile:
             was covered.
         """
         logger.debug(f"Getting coverage of {funcname}")
-        fuzz_key = None
-        if funcname in self.covmap:
-            fuzz_key = funcname
-        elif utils.demangle_cpp_func(funcname) in self.covmap:
-            fuzz_key = utils.demangle_cpp_func(funcname)
-        elif utils.normalise_str(funcname) in self.covmap:
-            fuzz_key = utils.normalise_str(funcname)
-        elif utils.remove_jvm_generics(funcname) in self.covmap:
-            fuzz_key = utils.remove_jvm_generics(funcname)
-
-        if fuzz_key is None or fuzz_key not in self.covmap:
+        fuzz_key = self._get_covmap_key(funcname)
+        if fuzz_key is None:
             return []
 
         return self.covmap[fuzz_key]
 
+    def _get_covmap_key(self, funcname: str) -> Optional[str]:
+        """Returns the key of covmap that `funcname` refers to, if any."""
+        if len(self.covmap) != self._covmap_keys_size:
+            self._covmap_keys.clear()
+            self._missing_covmap_keys.clear()
+            self._covmap_keys_size = len(self.covmap)
+
+        fuzz_key = self._covmap_keys.get(funcname)
+        if fuzz_key is not None:
+            self.covmap_key_cache_hits += 1
+            return fuzz_key
+        if funcname in self._missing_covmap_keys:
+            self.covmap_key_cache_hits += 1
+            self._missing_covmap_keys.move_to_end(funcname)
+            return None
+
+        self.covmap_key_cache_misses += 1
+        fuzz_key = self._resolve_covmap_key(funcname)
+        if fuzz_key is not None:
+            self._covmap_keys[funcname] = fuzz_key
+        else:
+            self._missing_covmap_keys[funcname] = None
+            if len(self._missing_covmap_keys
+                   ) > COVERAGE_MISSING_KEYS_CACHE_SIZE:
+                self._missing_covmap_keys.popitem(last=False)
+        return fuzz_key
+
+    def _resolve_covmap_key(self, funcname: str) -> Optional[str]:
+        if funcname in self.covmap:
+            return funcname
+        fuzz_key = utils.demangle_cpp_func(funcname)
+        if fuzz_key in self.covmap:
+            return fuzz_key
+        fuzz_key = utils.normalise_str(funcname)
+        if fuzz_key in self.covmap:
+            return fuzz_key
+        fuzz_key = utils.remove_jvm_generics(funcname)
+        if fuzz_key in self.covmap:
+            return fuzz_key
+        return None
+
+    def get_line_hits(self, funcname: str) -> Optional[FunctionLineHits]:
+        """Returns the line coverage of a given function indexed by line
+        number, or `None` if the function has no coverage.
+
+        This should only be used for coverage profiles that are non-file type.
+        """
+        fuzz_key = self._get_covmap_key(funcname)
+        if fuzz_key is None:
+            return None
+
+        covlist = self.covmap[fuzz_key]
+        cached = self._line_hits.get(fuzz_key)
+        if (cached is None or cached[0] is not covlist
+                or cached[1] != len(covlist)):
+            cached = (covlist, len(covlist), FunctionLineHits(covlist))
+            self._line_hits[fuzz_key] = cached
+        return cached[2]
+
+    def get_func_lineno_hitcount(self, func_name: str, lineno: int) -> int:
+        """Returns the hitcount of a given line number in a function. If the
+        line has multiple entries, the last one with hits is used. Returns 0
+        if the line is not hit.
+        """
+        line_hits = self.get_line_hits(func_name)
+        if line_hits is None:
+            return 0
+        for hitcount in reversed(line_hits.get_lineno_hitcounts(lineno)):
+            if hitcount > 0:
+                return hitcount
+        return 0
+
     def _python_ast_funcname_to_cov_file(self, function_name) -> Optional[str]:
         """Convert a Python module path to a given file, and searches the
         file_map for whether this path exists in it.
@@ -198,7 +433,22 @@ class CoverageProfile:
         for each of those elements are searched whether any of those exist
         in the file_map. In the event one of the elements matches a file
         in the file_map then this file is returned.
+
+        The files are looked up in a suffix index of file_map, and the result
+        for each function name is memoized.
         """
+        if len(self.file_map) != self._file_suffix_index_size:
+            self._file_suffix_index = FileSuffixIndex(self.file_map)
+            self._file_suffix_index_size = len(self.file_map)
+            self._resolved_cov_files.clear()
+        if function_name in self._resolved_cov_files:
+            return self._resolved_cov_files[function_name]
+
+        cov_file = self._resolve_python_cov_file(function_name)
+        self._resolved_cov_files[function_name] = cov_file
+        return cov_file
+
+    def _resolve_python_cov_file(self, function_name: str) -> Optional[str]:
         function_name = function_name.replace("......", "")
 
         # Resolve name if required. This is needed to normalise filenames.
@@ -213,31 +463,29 @@ class CoverageProfile:
             current_path += "/"
 
         logger.debug(f"Potentials: {str(potential_paths)}")
-        for potential_key in self.file_map:
-            logger.debug(f"Scanning {str(potential_key)}")
-            for potential_path in potential_paths:
-                if potential_key.endswith(potential_path):
-                    logger.debug(f"Found key: {str(potential_key)}")
-                    return potential_key
+        # Return the first file in file_map that ends with any of the paths.
+        file_positions = [
+            self._file_suffix_index.get_first_position(potential_path)
+            for potential_path in potential_paths
+        ]
+        found_positions = [pos for pos in file_positions if pos is not None]
+        if found_positions:
+            potential_key = self._file_suffix_index.paths[min(found_positions)]
+            logger.debug(f"Found key: {str(potential_key)}")
+            return potential_key
+
         # We found no matches when filenames exclude __init__.py. Try to
-        # include these now.
-        init_matches = []
-        # Iterate based in init paths since we want to have the longest match
-        # at the end of __init__matches list.
+        # include these now. The longest init path with a match is the most
+        # precise, and the last matching file in file_map is used for it.
         logger.info("Scanning for init paths")
-        for potential_init_path in init_paths:
+        for potential_init_path in reversed(init_paths):
             logger.info("Trying %s", potential_init_path)
-            for potential_key in self.file_map:
-                logger.debug("Scanning %s", str(potential_key))
-                if potential_key.endswith(potential_init_path):
-                    logger.debug("Found __init__ match: %s",
-                                 str(potential_key))
-                    init_matches.append(potential_key)
-
-        # Return the last match, as this signals the path with most precise
-        # matching.
-        if len(init_matches) > 0:
-            return init_matches[-1]
+            position = self._file_suffix_index.get_last_position(
+                potential_init_path)
+            if position is not None:
+                potential_key = self._file_suffix_index.paths[position]
+                logger.debug("Found __init__ match: %s", str(potential_key))
+                return potential_key
 
         # If this is reached then no match was found. Return None.
         logger.debug("Could not find key")
@@ -248,7 +496,8 @@ class CoverageProfile:
         file_and_function_mappings,
     ) -> Dict[str, List[Tuple[str, int, int]]]:
         # Sort function and lines numbers for each coverage file.
-        # Store in function_internals.
+        # Store in function_internals. The end of each function is exclusive,
+        # and -1 if the function extends to the end of the file.
         logger.debug("Geting function start and end line")
         function_internals: Dict[str, List[Tuple[str, int, int]]] = dict()
         for cov_file, function_specs in file_and_function_mappings.items():
@@ -258,16 +507,22 @@ class CoverageProfile:
 
             function_internals[cov_file] = []
             for i in range(len(sorted_func_specs)):
-                fname, fstart = sorted_func_specs[i]
+                fname, fstart, fend = sorted_func_specs[i]
 
                 # Get next function lineno to identify boundary
                 if i < len(sorted_func_specs) - 1:
-                    fnext_name, fnext_start = sorted_func_specs[i + 1]
-                    function_internals[cov_file].append(
-                        (fname, fstart, fnext_start - 1))
+                    fnext_name, fnext_start, _ = sorted_func_specs[i + 1]
+                    boundary = fnext_start - 1
                 else:
                     # Last function identified by end lineno being -1
-                    function_internals[cov_file].append((fname, fstart, -1))
+                    boundary = -1
+
+                # Use the end line of the function if the frontend provides
+                # it and the function ends before the next one.
+                if (fend is not None and fend >= fstart
+                        and (boundary == -1 or fend + 1 < boundary)):
+                    boundary = fend + 1
+                function_internals[cov_file].append((fname, fstart, boundary))
 
         return function_internals
 
@@ -277,31 +532,37 @@ class CoverageProfile:
     ) -> None:
         for filename in function_internals:
             logger.debug("Filename: %s", filename)
-            for fname, fstart, fend in function_internals[filename]:
+            func_ranges = function_internals[filename]
+            for fname, fstart, fend in func_ranges:
                 logger.debug(f"--- {fname} ::: {fstart} ::: {fend}")
 
                 if fname not in self.covmap:
                     # Fail safe
                     self.covmap[fname] = []
 
-                # If we have the file in dual_file_map identify the
-                # executed vs non-executed lines and store in covmap.
-                if filename not in self.dual_file_map:
-                    continue
+            # If we have the file in dual_file_map identify the
+            # executed vs non-executed lines and store in covmap.
+            if filename not in self.dual_file_map:
+                continue
+
+            # The ranges are sorted and do not overlap, so each line can only
+            # be in the last range starting before it.
+            range_starts = [fstart for _, fstart, _ in func_ranges]
+            range_lines: List[List[Tuple[int,
+                                         int]]] = [[] for _ in func_ranges]
+            for lines_key, hitcount in (('executed_lines', 1000),
+                                        ('missing_lines', 0)):
+                for line in self.dual_file_map[filename][lines_key]:
+                    range_idx = bisect.bisect_left(range_starts, line) - 1
+                    if range_idx < 0:
+                        continue
+                    fend = func_ranges[range_idx][2]
+                    if line < fend or fend == -1:
+                        range_lines[range_idx].append((line, hitcount))
 
-                # Create the covmap
-                for exec_line in self.dual_file_map[filename][
-                        'executed_lines']:
-                    if (exec_line > fstart) and (exec_line < fend
-                                                 or fend == -1):
-                        logger.debug("E: %s", exec_line)
-                        self.covmap[fname].append((exec_line, 1000))
-                for non_exec_line in self.dual_file_map[filename][
-                        'missing_lines']:
-                    if (non_exec_line > fstart) and (non_exec_line < fend
-                                                     or fend == -1):
-                        logger.debug("N: %s", non_exec_line)
-                        self.covmap[fname].append((non_exec_line, 0))
+            # Create the covmap
+            for (fname, _, _), lines in zip(func_ranges, range_lines):
+                self.covmap[fname].extend(lines)
 
     def correlate_python_functions_with_coverage(
         self,
@@ -313,7 +574,8 @@ class CoverageProfile:
         # where it resides in with respect to the filepaths from the
         # coverage collection. Store this including the linumber
         # of the function definition.
-        file_and_function_mappings: Dict[str, List[Tuple[str, int]]] = dict()
+        file_and_function_mappings: Dict[str, List[Tuple[str, int,
+                                                         int]]] = dict()
         for func_key in function_list:
             func = function_list[func_key]
             function_name = func.function_name
@@ -334,7 +596,7 @@ class CoverageProfile:
                 file_and_function_mappings[cov_file] = []
 
             file_and_function_mappings[cov_file].append(
-                (function_name, function_line))
+                (function_name, function_line, func.function_line_number_end))
 
         # Sort and retrieve line range of all functions
         function_internals = self._retrieve_func_line(
@@ -360,35 +622,23 @@ class CoverageProfile:
             the total amount of lines in a function and second element is the
             amount of lines in the function that are hit.
         """
-        fuzz_key = None
-        if funcname in self.covmap:
-            fuzz_key = funcname
-        elif utils.demangle_cpp_func(funcname) in self.covmap:
-            fuzz_key = utils.demangle_cpp_func(funcname)
-        elif utils.normalise_str(funcname) in self.covmap:
-            fuzz_key = utils.normalise_str(funcname)
-        elif utils.remove_jvm_generics(funcname) in self.covmap:
-            fuzz_key = utils.remove_jvm_generics(funcname)
-
-        if fuzz_key is None:
+        line_hits = self.get_line_hits(funcname)
+        if line_hits is None:
             return None, None
 
-        lines_hit = [ht for ln, ht in self.covmap[fuzz_key] if ht > 0]
-        return len(self.covmap[fuzz_key]), len(lines_hit)
+        return len(line_hits), line_hits.lines_hit
 
     def is_func_lineno_hit(self, func_name: str, lineno: int) -> bool:
         """
         Checks if a given line number in a function is hit.
         """
-        func_hit_details = self.get_hit_details(func_name)
+        line_hits = self.get_line_hits(func_name)
+        if line_hits is None:
+            return False
 
-        for line_info in func_hit_details:
-            if lineno == line_info[0]:
-                if line_info[1] != 0:
-                    return True
-                else:
-                    return False
-        return False
+        # Only the first entry of the line is considered.
+        hitcounts = line_hits.get_lineno_hitcounts(lineno)
+        return len(hitcounts) > 0 and hitcounts[0] != 0
 
 
 def extract_hitcount(coverage_line: str) -> int:
@@ -420,8 +670,106 @@ def extract_hitcount(coverage_line: str) -> int:
     return int(num)
 
 
+def _merge_line_hits(
+        func_name: str,
+        all_line_hits: List[List[Tuple[int, int]]]) -> List[Tuple[int, int]]:
+    """
+    Merges the line coverage of a function from multiple coverage profiles
+    by taking the highest hitcount of each line. The lines of the first
+    profile are kept, except for lines where a later profile has another
+    line number at the same position. Positions beyond the lines of a
+    profile keep their hitcounts.
+    """
+    if len(all_line_hits) == 1:
+        return all_line_hits[0]
+    if len(all_line_hits[0]) == 0:
+        return []
+
+    linenumbers, hitcounts = (list(column)
+                              for column in zip(*all_line_hits[0]))
+    # Hitcounts of the profiles that have the same lines, which are merged
+    # at once.
+    pending_hitcounts: List[Tuple[int, ...]] = []
+    for line_hits in all_line_hits[1:]:
+        if len(line_hits) >= len(linenumbers):
+            other_linenumbers, other_hitcounts = zip(
+                *line_hits[:len(linenumbers)])
+            if list(other_linenumbers) == linenumbers:
+                pending_hitcounts.append(other_hitcounts)
+                continue
+
+        if pending_hitcounts:
+            hitcounts = list(map(max, hitcounts, *pending_hitcounts))
+            pending_hitcounts = []
+        # It may be that line numbers are not the same for the same function
+        # name across different fuzzers. This will often (almost always)
+        # happen for LLVMFuzzerTestOneInput. In this case we just gracefully
+        # drop the lines.
+        kept = []
+        matched_hitcounts = []
+        for idx, (other_ln,
+                  other_ht) in enumerate(line_hits[:len(linenumbers)]):
+            if other_ln != linenumbers[idx]:
+                logger.info(
+                    f"Line numbers are different in the same function: "
+                    f"{func_name}:{linenumbers[idx]}:{other_ln}, ignoring")
+            else:
+                kept.append(idx)
+                matched_hitcounts.append(other_ht)
+        kept.extend(range(len(line_hits), len(linenumbers)))
+        linenumbers = [linenumbers[idx] for idx in kept]
+        hitcounts = [hitcounts[idx] for idx in kept]
+        hitcounts[:len(matched_hitcounts)] = map(max, hitcounts,
+                                                 matched_hitcounts)
+        if not linenumbers:
+            return []
+
+    if pending_hitcounts:
+        hitcounts = list(map(max, hitcounts, *pending_hitcounts))
+    return list(zip(linenumbers, hitcounts))
+
+
+def _merge_branch_hits(all_branch_hits: List[List[int]]) -> List[int]:
+    """
+    Merges the hitcounts of a branch from multiple coverage profiles by
+    taking the highest hitcount of each side. Switches may have different
+    numbers of cases in different profiles, in which case the additional
+    hitcounts are kept.
+    """
+    merged = list(all_branch_hits[0])
+    for branch_hits in all_branch_hits[1:]:
+        overlap = min(len(merged), len(branch_hits))
+        merged[:overlap] = map(max, merged, branch_hits)
+        merged.extend(branch_hits[overlap:])
+    return merged
+
+
+def merge_coverage_profiles(
+        coverage_profiles: List[CoverageProfile]) -> CoverageProfile:
+    """
+    Merges the function and branch coverage of multiple coverage profiles
+    into a new profile, taking the highest hitcount of each line and branch.
+    """
+    all_func_line_hits: Dict[str, List[List[Tuple[int, int]]]] = dict()
+    all_branch_hits: Dict[str, List[List[int]]] = dict()
+    for coverage_profile in coverage_profiles:
+        for func_name, line_hits in coverage_profile.covmap.items():
+            all_func_line_hits.setdefault(func_name, []).append(line_hits)
+        for branch, branch_hits in coverage_profile.branch_cov_map.items():
+            all_branch_hits.setdefault(branch, []).append(branch_hits)
+
+    merged_profile = CoverageProfile()
+    for func_name, all_line_hits in all_func_line_hits.items():
+        merged_profile.covmap[func_name] = _merge_line_hits(
+            func_name, all_line_hits)
+    for branch, all_hits in all_branch_hits.items():
+        merged_profile.branch_cov_map[branch] = _merge_branch_hits(all_hits)
+    return merged_profile
+
+
 def load_llvm_coverage(target_dir: str,
-                       target_name: Optional[str] = None) -> CoverageProfile:
+                       target_name: Optional[str] = None,
+                       parallelise: bool = True) -> CoverageProfile:
     """
     Scans a directory to read one or more coverage reports, and returns a CoverageProfile
 
@@ -440,7 +788,8 @@ def load_llvm_coverage(target_dir: str,
     As such, this function accepts an arugment "target_name" which is used to
     target specific coverage profiles. However, if no coverage profile matches
     that given name then the function will find *all* coverage reports it can and
-    use all of them.
+    use all of them. If `parallelise` is set, multiple reports are parsed by a
+    pool of worker processes.
     """
 
     if target_name is not None:
@@ -468,149 +817,264 @@ def load_llvm_coverage(target_dir: str,
     cp = CoverageProfile()
     logger.info(f"Using the following coverages {coverage_reports}")
     cp.set_type("function")
-    for profile_file in coverage_reports:
+
+    parsed_reports: Iterable[Tuple[Dict[str, List[Tuple[int, int]]],
+                                   Dict[str, List[int]], Set[str]]]
+    worker_count = 1
+    if parallelise and not multiprocessing.current_process().daemon:
+        worker_count = utils.get_worker_count(
+            len(coverage_reports), constants.LLVM_COVERAGE_LOADING_MEMORY)
+    if worker_count > 1:
+        logger.info(f"Reading coverage reports with {worker_count} workers")
+        with multiprocessing.Pool(worker_count) as pool:
+            parsed_reports = pool.map(_parse_llvm_coverage_report,
+                                      coverage_reports,
+                                      chunksize=1)
+    else:
+        parsed_reports = map(_parse_llvm_coverage_report, coverage_reports)
+
+    for profile_file, (covmap, branch_cov_map,
+                       appended_keys) in zip(coverage_reports, parsed_reports):
         cp.coverage_files.append(profile_file)
-        logger.info(f"Reading coverage report: {profile_file}")
-        with open(profile_file, 'rb') as pf:
-            curr_func = None
-            switch_string = str()
-            switch_line_number = None
-            case_line_numbers: Set[int] = set()
-            for raw_line in pf:
-                line = utils.safe_decode(raw_line)
-                if line is None:
-                    continue
+        # Functions seen again in a later report are overwritten by it.
+        cp.covmap.update(covmap)
+        for key, hitcounts in branch_cov_map.items():
+            if key in appended_keys and key in cp.branch_cov_map:
+                # The report only added `case` hitcounts to a switch of an
+                # earlier report. Drop the placeholder switch hitcounts.
+                cp.branch_cov_map[key].extend(hitcounts[2:])
+            else:
+                cp.branch_cov_map[key] = hitcounts
+    return cp
 
-                line = line.replace("\n", "")
-                logger.debug(f"cov-readline: { line }")
-
-                # Parse lines that signal function names. These linse indicate that the
-                # lines following this line will be the specific source code lines of
-                # the given function.
-                # Example line:
-                #  "LLVMFuzzerTestOneInput:\n"
-                if len(line) > 0 and line[-1] == ":" and "|" not in line:
-                    if len(line.split(":")) == 3:
-                        curr_func = line.split(":")[1].replace(" ",
-                                                               "").replace(
-                                                                   ":", "")
-                    else:
-                        curr_func = line.replace(" ", "").replace(":", "")
-                    curr_func = utils.demangle_cpp_func(curr_func)
-                    cp.covmap[curr_func] = list()
-                    switch_string = ''
-                    switch_line_number = None
-                # Special treatment for switch statement coverage:
-                # The line for switch MAY get one Branch entry; We use it for collecting
-                # overall hitcout of statement.
-                # Each `case` gets its own Branch entry for coverage. The important part
-                # is true_hit because that means if a `case` is taken or not.
-                if curr_func and COVERAGE_SWITCH_REGEX.match(line):
-                    line_segs = line.split("|")
-                    try:
-                        switch_line_number = int(line_segs[0])
-                    except Exception:
-                        continue
 
-                    try:
-                        # Calculate the column of the switch keyword.
-                        column_number = line_segs[2].find('switch') + 1
-                    except Exception:
-                        continue
-                    case_line_numbers = set()  # To keep track of switch cases.
-                    # This string may be updated if there is Branch pattern for this line.
-                    switch_string = f'{curr_func}:{switch_line_number},{column_number}'
-                    logger.debug(f'Seen switch in coverage: {switch_string}')
-
-                # This parses Branch cov info in the form of:
-                #  |  Branch (81:7): [True: 1.2k, False: 0]
-                if curr_func and COVERAGE_BRANCH_REGEX.match(line):
-                    try:
-                        line_number = int(line.split('(')[1].split(':')[0])
-                    except Exception:
-                        continue
-                    try:
-                        column_number = int(line.split(':')[1].split(')')[0])
-                    except Exception:
-                        continue
+def _iter_llvm_coverage_report_chunks(
+        profile_file: str) -> Iterator[List[str]]:
+    """Yields the lines of a coverage report without the newline, in large
+    chunks. The report is memory-mapped and each chunk is decoded at once,
+    and only lines of chunks that are not valid utf-8 are decoded one at a
+    time. Lines that can not be decoded are skipped."""
+    with open(profile_file, 'rb') as pf:
+        if os.fstat(pf.fileno()).st_size == 0:
+            return
+        with mmap.mmap(pf.fileno(), 0, access=mmap.ACCESS_READ) as report:
+            report_size = len(report)
+            offset = 0
+            released = 0
+            while offset < report_size:
+                # Chunks end after the last newline in them, unless a single
+                # line is larger than the chunk size.
+                end = offset + LLVM_COVERAGE_CHUNK_SIZE
+                if end < report_size:
+                    newline = report.rfind(b'\n', offset, end)
+                    if newline == -1:
+                        newline = report.find(b'\n', end)
+                    end = newline + 1 if newline != -1 else report_size
+                else:
+                    end = report_size
+                chunk = report[offset:end]
+                # The chunk is copied, so drop the mapped pages to not keep
+                # the whole report resident.
+                release_end = end - end % mmap.PAGESIZE
+                if release_end > released and hasattr(mmap, 'MADV_DONTNEED'):
+                    report.madvise(mmap.MADV_DONTNEED, released,
+                                   release_end - released)
+                    released = release_end
+                offset = end
+                if chunk[-1:] == b'\n':
+                    chunk = chunk[:-1]
+                try:
+                    yield chunk.decode().split('\n')
+                except UnicodeDecodeError:
+                    lines = []
+                    for raw_line in chunk.split(b'\n'):
+                        line = utils.safe_decode(raw_line)
+                        if line is not None:
+                            lines.append(line.replace("\n", ""))
+                    yield lines
+
+
+def _parse_llvm_coverage_report(
+    profile_file: str
+) -> Tuple[Dict[str, List[Tuple[int, int]]], Dict[str, List[int]], Set[str]]:
+    """
+    Parses a single coverage report. Returns the line coverage of each
+    function and the branch coverage, as in `CoverageProfile`, together with
+    the switch keys whose branch coverage was created from `case` hitcounts
+    because the switch line of the report had no Branch entry.
+    """
+    logger.info(f"Reading coverage report: {profile_file}")
+    # Parsing creates millions of objects that can not form cycles, so do not
+    # let the garbage collector repeatedly scan the growing maps.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_llvm_coverage_lines(
+            itertools.chain.from_iterable(
+                _iter_llvm_coverage_report_chunks(profile_file)))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _parse_llvm_coverage_lines(
+    lines: Iterable[str]
+) -> Tuple[Dict[str, List[Tuple[int, int]]], Dict[str, List[int]], Set[str]]:
+    """Parses the lines of a coverage report. See
+    `_parse_llvm_coverage_report`."""
+    covmap: Dict[str, List[Tuple[int, int]]] = dict()
+    branch_cov_map: Dict[str, List[int]] = dict()
+    appended_keys: Set[str] = set()
+
+    curr_func = None
+    func_cov: List[Tuple[int, int]] = []
+    switch_string = str()
+    switch_line_number = None
+    case_line_numbers: Set[int] = set()
+    for line in lines:
+        # Parse lines that signal function names. These linse indicate that the
+        # lines following this line will be the specific source code lines of
+        # the given function.
+        # Example line:
+        #  "LLVMFuzzerTestOneInput:\n"
+        # All other lines of interest have "|" separated columns.
+        if "|" not in line:
+            if len(line) > 0 and line[-1] == ":":
+                if len(line.split(":")) == 3:
+                    curr_func = line.split(":")[1].replace(" ", "").replace(
+                        ":", "")
+                else:
+                    curr_func = line.replace(" ", "").replace(":", "")
+                curr_func = utils.demangle_cpp_func(curr_func)
+                func_cov = list()
+                covmap[curr_func] = func_cov
+                switch_string = ''
+                switch_line_number = None
+            continue
+        if curr_func is None:
+            continue
 
-                    try:
-                        true_hit = extract_hitcount(
-                            line.split('True:')[1].split(',')[0])
-                        if true_hit == -1:
-                            continue
-                    except Exception:
-                        continue
-                    try:
-                        false_hit = extract_hitcount(
-                            line.split('False:')[1].replace("]", ""))
-                        if false_hit == -1:
-                            continue
-                    except Exception:
-                        continue
+        # Special treatment for switch statement coverage:
+        # The line for switch MAY get one Branch entry; We use it for collecting
+        # overall hitcout of statement.
+        # Each `case` gets its own Branch entry for coverage. The important part
+        # is true_hit because that means if a `case` is taken or not.
+        if curr_func and "switch" in line and COVERAGE_SWITCH_REGEX.match(
+                line):
+            line_segs = line.split("|")
+            try:
+                switch_line_number = int(line_segs[0])
+            except Exception:
+                continue
 
-                    if switch_line_number and line_number == switch_line_number:
-                        # This Branch pattern belongs to switch line.
-                        # Note that the column number is inacurrate as it belongs to
-                        # the variable inside pranthesis. Should not use it for switch_string.
-                        cp.branch_cov_map[switch_string] = [
-                            true_hit, false_hit
-                        ]
-                    elif line_number in case_line_numbers:
-                        # This Branch pattern belongs to a `case`.
-                        try:
-                            # This collects for `case` taken side.
-                            cp.branch_cov_map[switch_string].append(true_hit)
-                        except Exception:
-                            # Taking care of anomalies where the coverage report has no
-                            # Branch pattern for switch line.
-                            logger.debug(
-                                f'The switch had no Branch pattern {switch_string}'
-                            )
-                            cp.branch_cov_map[switch_string] = [
-                                true_hit, false_hit, true_hit
-                            ]
-                    else:
-                        # This Branch pattern belongs to a conditional branch.
-                        branch_string = f'{curr_func}:{line_number},{column_number}'
-                        cp.branch_cov_map[branch_string] = [
-                            true_hit, false_hit
-                        ]
-                # Parse lines that signal specific line of code. These lines only
-                # offer after the function names parsed above.
-                # Example line:
-                #  "   83|  5.99M|    char *kldfj = (char*)malloc(123);\n"
-                elif curr_func is not None and "|" in line:
-                    # Extract source code line number
-                    try:
-                        line_number = int(line.split("|")[0])
-                    except Exception:
-                        continue
+            try:
+                # Calculate the column of the switch keyword.
+                column_number = line_segs[2].find('switch') + 1
+            except Exception:
+                continue
+            case_line_numbers = set()  # To keep track of switch cases.
+            # This string may be updated if there is Branch pattern for this line.
+            switch_string = f'{curr_func}:{switch_line_number},{column_number}'
+            logger.debug(f'Seen switch in coverage: {switch_string}')
+
+        # This parses Branch cov info in the form of:
+        #  |  Branch (81:7): [True: 1.2k, False: 0]
+        if curr_func and "Branch" in line and COVERAGE_BRANCH_REGEX.match(
+                line):
+            try:
+                line_number = int(line.split('(')[1].split(':')[0])
+            except Exception:
+                continue
+            try:
+                column_number = int(line.split(':')[1].split(')')[0])
+            except Exception:
+                continue
 
-                    if COVERAGE_CASE_REGEX.match(line):
-                        if switch_string:
-                            case_line_numbers.add(line_number)
-                        else:
-                            logger.info('found case outside a switch?! \n%s',
-                                        line)
-
-                    # Extract hit count
-                    # Write out numbers e.g. 1.2k into 1200 and 5.99M to 5990000
-                    try:
-                        hit_times = extract_hitcount(line.split("|")[1])
-                        if hit_times == -1:
-                            continue
-                    except Exception:
-                        # Avoid overcounting the code lines by skipping comments and empty lines.
-                        if " 0| " in line:
-                            hit_times = 0
-                        else:
-                            continue
-                    # Add source code line and hitcount to coverage map of current function
-                    logger.debug(f"reading coverage: {curr_func} "
-                                 f"-- {line_number} -- {hit_times}")
-                    cp.covmap[curr_func].append((line_number, hit_times))
-    return cp
+            try:
+                true_hit = extract_hitcount(
+                    line.split('True:')[1].split(',')[0])
+                if true_hit == -1:
+                    continue
+            except Exception:
+                continue
+            try:
+                false_hit = extract_hitcount(
+                    line.split('False:')[1].replace("]", ""))
+                if false_hit == -1:
+                    continue
+            except Exception:
+                continue
+
+            if switch_line_number and line_number == switch_line_number:
+                # This Branch pattern belongs to switch line.
+                # Note that the column number is inacurrate as it belongs to
+                # the variable inside pranthesis. Should not use it for switch_string.
+                branch_cov_map[switch_string] = [true_hit, false_hit]
+                appended_keys.discard(switch_string)
+            elif line_number in case_line_numbers:
+                # This Branch pattern belongs to a `case`.
+                try:
+                    # This collects for `case` taken side.
+                    branch_cov_map[switch_string].append(true_hit)
+                except Exception:
+                    # Taking care of anomalies where the coverage report has no
+                    # Branch pattern for switch line.
+                    logger.debug(
+                        f'The switch had no Branch pattern {switch_string}')
+                    branch_cov_map[switch_string] = [
+                        true_hit, false_hit, true_hit
+                    ]
+                    appended_keys.add(switch_string)
+            else:
+                # This Branch pattern belongs to a conditional branch.
+                branch_string = f'{curr_func}:{line_number},{column_number}'
+                branch_cov_map[branch_string] = [true_hit, false_hit]
+                appended_keys.discard(branch_string)
+            continue
+
+        # Parse lines that signal specific line of code. These lines only
+        # offer after the function names parsed above.
+        # Example line:
+        #  "   83|  5.99M|    char *kldfj = (char*)malloc(123);\n"
+        line_segs = line.split("|", 2)
+        # Extract source code line number
+        try:
+            line_number = int(line_segs[0])
+        except Exception:
+            continue
+
+        if "case" in line and COVERAGE_CASE_REGEX.match(line):
+            if switch_string:
+                case_line_numbers.add(line_number)
+            else:
+                logger.info('found case outside a switch?! \n%s', line)
+
+        # Extract hit count
+        # Write out numbers e.g. 1.2k into 1200 and 5.99M to 5990000
+        # This inlines the common cases of extract_hitcount.
+        hit_count_str = line_segs[1].strip()
+        if hit_count_str.isdecimal():
+            hit_times = int(hit_count_str)
+        elif not hit_count_str:
+            continue
+        else:
+            try:
+                unit = LLVM_COVERAGE_COUNT_UNITS.get(hit_count_str[-1])
+                if unit is not None:
+                    hit_times = int(float(hit_count_str[:-1]) * unit)
+                else:
+                    hit_times = extract_hitcount(hit_count_str)
+                    if hit_times == -1:
+                        continue
+            except Exception:
+                # Avoid overcounting the code lines by skipping comments and empty lines.
+                if " 0| " in line:
+                    hit_times = 0
+                else:
+                    continue
+        # Add source code line and hitcount to coverage map of current function
+        func_cov.append((line_number, hit_times))
+    return covmap, branch_cov_map, appended_keys
 
 
 def load_python_json_coverage(json_file: str,
@@ -658,113 +1122,223 @@ def load_python_json_coverage(json_file: str,
 
 
 def load_jvm_coverage(target_dir: str,
-                      target_name: Optional[str] = None) -> CoverageProfile:
+                      target_name: Optional[str] = None,
+                      parallelise: bool = True) -> CoverageProfile:
     """Find and load jacoco.xml, a jvm xml coverage report file
 
     The xml file is generated from Jacoco plugin. The specific dtd of the xml can
     be found in the following link:
     - https://www.jacoco.org/jacoco/trunk/coverage/report.dtd
 
+    Similar to load_llvm_coverage, if a report is found in a directory named
+    "target_name" then only that report is used. Otherwise all reports found
+    are used, where methods in a later report overwrite the ones in earlier
+    reports. If `parallelise` is set, multiple reports are parsed by a pool
+    of worker processes.
+
     Return a CoverageProfile
     """
-    import xml.etree.ElementTree as ET
     cp = CoverageProfile()
     cp.set_type("function")
 
     # Retrieve jacoco.xml coverage report
-    coverage_reports = utils.get_all_files_in_tree_with_regex(
+    all_coverage_reports = utils.get_all_files_in_tree_with_regex(
         target_dir, "jacoco.xml")
-    logger.info(f"FOUND XML COVERAGE FILES: {str(coverage_reports)}")
+    logger.info(f"FOUND XML COVERAGE FILES: {str(all_coverage_reports)}")
 
-    if len(coverage_reports) > 0:
-        xml_file = coverage_reports[0]
-    else:
+    coverage_reports = list()
+    if target_name is not None:
+        for cov_report in all_coverage_reports:
+            cov_report_dir = os.path.basename(os.path.dirname(cov_report))
+            if cov_report_dir == target_name:
+                coverage_reports.append(cov_report)
+    if len(coverage_reports) == 0:
+        coverage_reports = all_coverage_reports
+
+    if len(coverage_reports) == 0:
         logger.info("Found no coverage files")
         return cp
 
-    # Parse the jacoco.xml to element tree
-    cp.coverage_files.append(xml_file)
+    parsed_reports: Iterable[Dict[str, List[Tuple[int, int]]]]
+    worker_count = 1
+    if parallelise and not multiprocessing.current_process().daemon:
+        worker_count = utils.get_worker_count(
+            len(coverage_reports), constants.JVM_COVERAGE_LOADING_MEMORY)
+    if worker_count > 1:
+        logger.info(f"Reading coverage reports with {worker_count} workers")
+        with multiprocessing.Pool(worker_count) as pool:
+            parsed_reports = pool.map(_parse_jvm_coverage_report,
+                                      coverage_reports,
+                                      chunksize=1)
+    else:
+        parsed_reports = map(_parse_jvm_coverage_report, coverage_reports)
+
+    for xml_file, covmap in zip(coverage_reports, parsed_reports):
+        cp.coverage_files.append(xml_file)
+        cp.covmap.update(covmap)
+    return cp
+
+
+class _JvmCoverageReportTarget:
+    """
+    Parser target that builds the coverage map of the methods in a jacoco.xml
+    report while it is parsed, without building the element tree of the
+    report. Only the classes and source files of the current package are
+    kept, reduced to the attributes used.
+    """
+
+    def __init__(self) -> None:
+        self.covmap: Dict[str, List[Tuple[int, int]]] = dict()
+        # Tags of the elements from the root to the element being parsed.
+        self._path: List[str] = []
+
+        # In jacoco.xml, each packages contains a list of source files and
+        # classes. In each of the source file tag, it contains a list of line
+        # child elements for each valid line in that source file with the
+        # count of runtime coverage of that line. This information is
+        # separated with the methods and thus we are extracting them as a map
+        # for further reference when processing all the methods at the end of
+        # the package.
+        self._source_file_map: Dict[str, List[Tuple[int, int]]] = dict()
+        self._package_classes: List[Tuple[str, str, List[Tuple[str,
+                                                               ...]]]] = []
+
+        self._source_file_attrib: Dict[str, str] = dict()
+        self._line_list: List[Tuple[int, int]] = []
+        self._methods: List[Tuple[str, ...]] = []
+        self._class_attrib: Dict[str, str] = dict()
+        self._method_attrib: Dict[str, str] = dict()
+        self._line_counter: Optional[Tuple[str, str]] = None
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        path = self._path
+        depth = len(path)
+        if depth > 1 and path[1] == 'package':
+            if depth == 2:
+                if tag == 'sourcefile':
+                    self._source_file_attrib = attrib
+                    self._line_list = []
+                elif tag == 'class':
+                    self._class_attrib = attrib
+                    self._methods = []
+            elif depth == 3:
+                if tag == 'line' and path[2] == 'sourcefile':
+                    self._line_list.append(
+                        (int(attrib['nr']), int(attrib['ci'])))
+                elif tag == 'method' and path[2] == 'class':
+                    self._method_attrib = attrib
+                    self._line_counter = None
+            elif (depth == 4 and tag == 'counter' and path[2] == 'class'
+                  and path[3] == 'method' and self._line_counter is None):
+                if attrib['type'] == 'LINE':
+                    self._line_counter = (attrib['missed'], attrib['covered'])
+        path.append(tag)
+
+    def end(self, tag: str) -> None:
+        path = self._path
+        path.pop()
+        depth = len(path)
+        if depth == 1:
+            if tag == 'package':
+                _add_jvm_package_coverage(self.covmap, self._package_classes,
+                                          self._source_file_map)
+                self._source_file_map = dict()
+                self._package_classes = []
+        elif depth == 0 or path[1] != 'package':
+            return
+        elif depth == 2:
+            if tag == 'sourcefile':
+                if self._line_list:
+                    self._source_file_map[
+                        self._source_file_attrib['name']] = self._line_list
+            elif tag == 'class':
+                self._package_classes.append(
+                    (self._class_attrib.get('name', '').replace('/', '.'),
+                     self._class_attrib.get('sourcefilename',
+                                            ''), self._methods))
+        elif depth == 3 and tag == 'method' and path[2] == 'class':
+            missed_line, covered_line = self._line_counter or ('0', '0')
+            self._methods.append(
+                (self._method_attrib.get('name', ''),
+                 self._method_attrib.get('desc', ''),
+                 self._method_attrib.get('line',
+                                         '-1'), missed_line, covered_line))
+
+    def close(self) -> None:
+        pass
+
+
+def _parse_jvm_coverage_report(
+        xml_file: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Parses a jacoco.xml report and returns the coverage map of its methods.
+
+    The report is read in chunks and fed to a streaming parser, so memory use
+    does not grow with the size of the report.
+    """
+    import xml.etree.ElementTree as ET
+    target = _JvmCoverageReportTarget()
+    parser = ET.XMLParser(target=target)
     try:
-        xml_tree = ET.parse(xml_file)
-        root = xml_tree.getroot()
-    except Exception:
+        with open(xml_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(JVM_COVERAGE_CHUNK_SIZE), b''):
+                parser.feed(chunk)
+        parser.close()
+    except (ET.ParseError, OSError):
         raise exceptions.DataLoaderError("Error %s as xml file" % (xml_file))
+    return target.covmap
+
+
+def _add_jvm_package_coverage(
+        covmap: Dict[str, List[Tuple[int, int]]],
+        package_classes: List[Tuple[str, str, List[Tuple[str, ...]]]],
+        source_file_map: Dict[str, List[Tuple[int, int]]]) -> None:
+    """Adds the coverage of the methods of the classes of a package to
+    `covmap`, given the covered lines of the source files of the package."""
+    # Index of the first item of each line number in the line map of each
+    # source file, built for the source files that have classes.
+    line_indices: Dict[str, Dict[int, int]] = dict()
+    for class_name, source_file_name, methods in package_classes:
+        line_list = source_file_map.get(source_file_name, [])
+        if not class_name or not line_list:
+            # Fail safe for malformed or invalid jacoco.xml report or
+            # no source file found because target class not compiled
+            # with correct debug information.
+            continue
 
-    # Handles package by package
-    for package in root.findall('package'):
-        # Extract all source lines mapping
-        # In jacoco.xml, each packages contains a list of source files and classes.
-        # In each of the source file tag, it contains a list of line child elements
-        # for each valid line in that source file with the count of runtime coverage
-        # of that line. This information is separated with the methods and thus we
-        # are extracting them as a map for further reference when processing all
-        # the methods.
-        source_file_map = {}
-        for src in package.findall('sourcefile'):
-            line_list = []
-            for line in src.findall('line'):
-                # Process each line
-                line_list.append(
-                    (int(line.attrib['nr']), int(line.attrib['ci'])))
-            if line_list:
-                source_file_map[src.attrib["name"]] = line_list
-
-        # Process all methods in all classes within this package
-        for cl in package.findall('class'):
-            class_name = cl.attrib.get('name', '').replace('/', '.')
-            line_list = source_file_map.get(
-                cl.attrib.get('sourcefilename', ''), [])
-            if not class_name or not line_list:
-                # Fail safe for malformed or invalid jacoco.xml report or
-                # no source file found because target class not compiled
-                # with correct debug information.
+        line_index = line_indices.get(source_file_name)
+        if line_index is None:
+            line_index = dict()
+            for count, item in enumerate(line_list):
+                line_index.setdefault(item[0], count)
+            line_indices[source_file_name] = line_index
+
+        for name, desc, line, missed_line, covered_line in methods:
+            # Determine method full signaturre
+            start_line = int(line)
+            if not name or not desc or start_line < 0:
+                # Fail safe for malformed or invalid jacoco.xml report with
+                # no line number information.
                 continue
 
-            for method in cl.findall('method'):
-                # Determine method full signaturre
-                name = method.attrib.get('name', '')
-                desc = method.attrib.get('desc', '')
-                start_line = int(method.attrib.get('line', '-1'))
-
-                if not name or not desc or start_line < 0:
-                    # Fail safe for malformed or invalid jacoco.xml report with
-                    # no line number information.
-                    continue
+            args = _interpret_jvm_arguments_type(desc)
+            name = f'[{class_name}].{name}({",".join(args)})'
 
-                args = _interpret_jvm_arguments_type(desc)
-                name = f'[{class_name}].{method.attrib["name"]}({",".join(args)})'
-
-                # Get total valid lines count of this method
-                total_line = 0
-                for counter in method.findall('counter'):
-                    if counter.attrib['type'] == 'LINE':
-                        missed_line = int(counter.attrib['missed'])
-                        covered_line = int(counter.attrib['covered'])
-                        total_line = missed_line + covered_line
-                        break
-
-                # Find the starting item in the line map
-                start_item = -1
-                for count, item in enumerate(line_list):
-                    if item[0] == start_line:
-                        start_item = count
-                        break
-
-                # if starting item not found, skip this method
-                if start_item < 0:
-                    continue
+            # Get total valid lines count of this method
+            total_line = int(missed_line) + int(covered_line)
 
-                # Find the ending item in the line map
-                end_item = min(start_item + total_line, len(line_list))
+            # Find the starting item in the line map, if starting item not
+            # found, skip this method
+            start_item = line_index.get(start_line)
+            if start_item is None:
+                continue
 
-                # Store lines, hit_time into the covmap under the target method
-                cp.covmap[name] = []
-                # Add source code line and hitcount to coverage map of current function
-                logger.debug(f"reading coverage: {name} -- {line_list[count]}")
-                for count in range(start_item, end_item):
-                    cp.covmap[name].append(line_list[count])
+            # Find the ending item in the line map
+            end_item = min(start_item + total_line, len(line_list))
 
-    return cp
+            # Store lines, hit_time into the covmap under the target method
+            logger.debug(
+                f"reading coverage: {name} -- {line_list[start_item]}")
+            covmap[name] = line_list[start_item:end_item]
 
 
 def _interpret_jvm_arguments_type(desc: str) -> List[str]:
@@ -843,14 +1417,72 @@ def _interpret_jvm_arguments_type(desc: str) -> List[str]:
     return args
 
 
+def _iter_json_array(json_file: str) -> Iterator[Any]:
+    """Yields the items of the array a JSON file holds, decoding the file in
+    chunks so that the whole document is never held in memory."""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    # What is expected next: "open" for the opening bracket, "first" for the
+    # first item or the closing bracket, "next" for a separator or the
+    # closing bracket, and "item" for an item.
+    state = 'open'
+    with open(json_file, 'r') as f:
+        while True:
+            match = JSON_NON_WHITESPACE_REGEX.search(buf, pos)
+            pos = match.start() if match is not None else len(buf)
+            need_data = pos == len(buf)
+            if need_data:
+                pass
+            elif state == 'open':
+                if buf[pos] != '[':
+                    raise json.JSONDecodeError("Expecting '['", buf, pos)
+                state = 'first'
+                pos += 1
+            elif buf[pos] == ']' and state != 'item':
+                return
+            elif state == 'next':
+                if buf[pos] != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf,
+                                               pos)
+                state = 'item'
+                pos += 1
+            else:
+                try:
+                    item, item_end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    need_data = True
+                else:
+                    # A number is only complete if it is followed by a
+                    # delimiter, as it may continue in the rest of the file.
+                    need_data = (not eof and buf[pos] in JSON_NUMBER_START
+                                 and (item_end == len(buf)
+                                      or buf[item_end] not in JSON_NUMBER_END))
+                    if not need_data:
+                        yield item
+                        pos = item_end
+                        state = 'next'
+
+            if need_data:
+                if eof:
+                    raise json.JSONDecodeError("Unterminated array", buf, pos)
+                # Read at least as much as is buffered, so items larger than
+                # a chunk are decoded a logarithmic number of times.
+                data = f.read(max(KERNEL_COVERAGE_CHUNK_SIZE, len(buf) - pos))
+                eof = not data
+                buf = buf[pos:] + data
+                pos = 0
+
+
 def load_kernel_cov(filename):
-    """Loads a .json code coverage file from Syzkaller."""
+    """Loads a .json code coverage file from Syzkaller. The file is streamed
+    and only the modules with "/private/" in their file name are kept."""
     print('Loading kernel coverage')
-    with open(filename, 'r') as f:
-        json_coverage = json.loads(f.read())
-
     private_modules = []
-    for elem in json_coverage:
+    for elem in _iter_json_array(filename):
         if '/private/' in elem.get('Filename', ''):
             private_modules.append(elem)
 
@@ -24,6 +24,7 @@ from fuzz_introspector import analysis
 from fuzz_introspector import constants
 from fuzz_introspector import diff_report
 from fuzz_introspector import html_report
+from fuzz_introspector import json_report
 from fuzz_introspector import utils
 
 logger = logging.getLogger(name=__name__)
@@ -61,12 +62,15 @@ def run_analysis_on_dir(target_folder: str,
 
     introspection_proj = analysis.IntrospectionProject(language, target_folder,
                                                        coverage_url)
-    introspection_proj.load_data_files(parallelise, correlation_file)
 
-    logger.info("Analyses to run: %s", str(analyses_to_run))
-    logger.info("[+] Creating HTML report")
-    html_report.create_html_report(introspection_proj, analyses_to_run,
-                                   output_json, report_name, dump_files)
+    # Accumulate the json reports in memory and write them once at the end.
+    with json_report.buffered_report():
+        introspection_proj.load_data_files(parallelise, correlation_file)
+
+        logger.info("Analyses to run: %s", str(analyses_to_run))
+        logger.info("[+] Creating HTML report")
+        html_report.create_html_report(introspection_proj, analyses_to_run,
+                                       output_json, report_name, dump_files)
 
     return constants.APP_EXIT_SUCCESS
 
@@ -31,10 +31,19 @@ DEBUG_INFO_DUMP = "all_debug_info.json"
 
 SAVED_SOURCE_FOLDER = 'source-code'
 
+# Suffix of the binary cache files created next to .data.yaml files.
+DATA_CACHE_SUFFIX = '.ficache'
+
 # Holds data about all functions in javascript, to ease loading of static
 # website.
 ALL_FUNCTION_JS = "all_functions.js"
 
+# Index and pages of the data about all functions when it is sharded, see
+# html_report.write_all_functions_pages.
+ALL_FUNCTION_INDEX_JS = "all_functions_index.js"
+ALL_FUNCTION_PAGE_JS = "all_functions_page_%d.js"
+ALL_FUNCTION_PAGE_SIZE = 1000
+
 FUZZER_TABLE_JS = "fuzzer_table_data.js"
 
 # TODO: change the name of the following file to be something meaningful.
@@ -44,6 +53,22 @@ OPTIMAL_TARGETS_ALL_FUNCTIONS = "analysis_1.js"
 # Indicates if files should be dumped.
 should_dump_files = True
 
+# Estimated peak memory of a worker process loading a fuzzer profile. Used to
+# bound the number of profiles loaded in parallel.
+PROFILE_LOADING_MEMORY = 1 << 30
+JVM_PROFILE_LOADING_MEMORY = 2 << 30
+
+# Estimated peak memory of a worker process parsing a llvm-cov report.
+LLVM_COVERAGE_LOADING_MEMORY = 2 << 30
+
+# Estimated peak memory of a worker process parsing a jacoco.xml report.
+JVM_COVERAGE_LOADING_MEMORY = 1 << 30
+
+# Number of rows of the all functions table created by each task of a worker
+# process, and the estimated peak memory of such a worker.
+ALL_FUNCTION_TABLE_CHUNK_SIZE = 2000
+ALL_FUNCTION_TABLE_MEMORY = 1 << 30
+
 APP_EXIT_ERROR = 1
 APP_EXIT_SUCCESS = 0
 
@@ -14,13 +14,20 @@
 """Reads the data output from the fuzz introspector LLVM plugin."""
 
 import os
+import hashlib
 import json
 import logging
+import marshal
+import mmap
 import multiprocessing
+import struct
 
 from typing import (
     Any,
+    BinaryIO,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
 )
@@ -28,9 +35,19 @@ from typing import (
 from fuzz_introspector import constants
 from fuzz_introspector import utils
 from fuzz_introspector.datatypes import (fuzzer_profile, bug)
+from fuzz_introspector.exceptions import DataLoaderError
 
 logger = logging.getLogger(name=__name__)
 
+# Binary cache of loaded .data.yaml files. The cache starts with a magic
+# value followed by the sha256 digest of the yaml content it was created from.
+# This is followed by a length-prefixed marshal record for each function
+# element, a record holding the remaining dictionary and lastly the offset of
+# that record, which allows the elements to be written as they are parsed.
+DATA_CACHE_MAGIC = b'FIDATA02'
+DATA_CACHE_RECORD_HEADER = struct.Struct('<I')
+DATA_CACHE_TRAILER = struct.Struct('<Q')
+
 
 def read_fuzzer_data_file_to_profile(
         cfg_file: str,
@@ -43,14 +60,20 @@ def read_fuzzer_data_file_to_profile(
     if not os.path.isfile(cfg_file) or not os.path.isfile(cfg_file + ".yaml"):
         return None
 
-    data_dict_yaml = utils.data_file_read_yaml(cfg_file + ".yaml")
-    logger.info("Finished loading %s", cfg_file)
+    data_dict_yaml = load_data_file_yaml(cfg_file + ".yaml")
 
     # Must be  dictionary
     if data_dict_yaml is None or not isinstance(data_dict_yaml, dict):
         return None
 
-    profile = fuzzer_profile.FuzzerProfile(cfg_file, data_dict_yaml, language)
+    # The yaml is parsed while the profile consumes the function elements.
+    try:
+        profile = fuzzer_profile.FuzzerProfile(cfg_file, data_dict_yaml,
+                                               language)
+    except DataLoaderError as e:
+        logger.info("Failed loading %s: %s", cfg_file, str(e))
+        return None
+    logger.info("Finished loading %s", cfg_file)
 
     if not profile.has_entry_point():
         logger.info("Found no entrypoints")
@@ -59,17 +82,214 @@ def read_fuzzer_data_file_to_profile(
     return profile
 
 
-def _load_profile(data_file: str, language: str, manager, semaphore=None):
-    """Internal function used for multithreaded profile loading"""
-    if semaphore is not None:
-        semaphore.acquire()
+def load_data_file_yaml(yaml_file: str) -> Optional[Dict[Any, Any]]:
+    """Loads a .data.yaml file from the frontends. The content is read from
+    a binary cache next to the yaml file if the cache was created from the
+    same yaml content, and otherwise the yaml is parsed and the cache is
+    (re)created. Set FI_DISABLE_DATA_CACHE to always parse the yaml file.
 
+    In both cases content['All functions']['Elements'] is an iterator that
+    loads the elements on demand, see `utils.data_file_read_yaml_stream`.
+    """
+    if os.environ.get('FI_DISABLE_DATA_CACHE', ''):
+        return utils.data_file_read_yaml_stream(yaml_file)
+    if not os.path.isfile(yaml_file):
+        return None
+
+    digest = _get_file_digest(yaml_file)
+    cache_file = yaml_file + constants.DATA_CACHE_SUFFIX
+    data_dict = read_data_file_cache(cache_file, digest)
+    if data_dict is not None:
+        logger.info("Loading %s from data cache", yaml_file)
+        return data_dict
+
+    data_dict = utils.data_file_read_yaml_stream(yaml_file)
+    if data_dict is not None:
+        all_functions = data_dict['All functions']
+        all_functions['Elements'] = write_data_file_cache(
+            cache_file, digest, data_dict, all_functions['Elements'])
+    return data_dict
+
+
+def _get_file_digest(filename: str) -> bytes:
+    """Returns the sha256 digest of the content of a file."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _write_data_cache_record(cache_fd: BinaryIO, record: Any) -> None:
+    payload = marshal.dumps(record)
+    cache_fd.write(DATA_CACHE_RECORD_HEADER.pack(len(payload)))
+    cache_fd.write(payload)
+
+
+def write_data_file_cache(cache_file: str, digest: bytes, data_dict: Dict[Any,
+                                                                          Any],
+                          elements: Iterable[Any]) -> Iterator[Any]:
+    """Yields the function `elements` of `data_dict` while writing them to a
+    binary cache file. The remaining content of `data_dict` is written once
+    all elements are consumed.
+
+    The cache is written to a temporary file and renamed when complete, so
+    concurrent readers never see a partial cache. Nothing is cached if the
+    elements are not fully consumed.
+    """
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    cache_fd: Optional[BinaryIO] = None
+    try:
+        cache_fd = open(tmp_file, 'wb')
+        cache_fd.write(DATA_CACHE_MAGIC + digest)
+    except OSError as e:
+        # The cache is only an optimisation, e.g. the data directory may be
+        # read-only.
+        logger.info("Could not write data cache %s: %s", cache_file, str(e))
+        if cache_fd is not None:
+            cache_fd.close()
+            cache_fd = None
+
+    completed = False
+    try:
+        for elem in elements:
+            if cache_fd is not None:
+                try:
+                    _write_data_cache_record(cache_fd, elem)
+                except (OSError, ValueError) as e:
+                    # The yaml may hold types that marshal can't handle.
+                    logger.info("Could not write data cache %s: %s",
+                                cache_file, str(e))
+                    cache_fd.close()
+                    cache_fd = None
+            yield elem
+
+        if cache_fd is None:
+            return
+        header_dict = dict(data_dict)
+        header_dict['All functions'] = dict(data_dict['All functions'])
+        header_dict['All functions'].pop('Elements', None)
+        try:
+            header_offset = cache_fd.tell()
+            _write_data_cache_record(cache_fd, header_dict)
+            cache_fd.write(DATA_CACHE_TRAILER.pack(header_offset))
+            cache_fd.close()
+            os.replace(tmp_file, cache_file)
+            completed = True
+        except (OSError, ValueError) as e:
+            logger.info("Could not write data cache %s: %s", cache_file,
+                        str(e))
+    finally:
+        if cache_fd is not None:
+            cache_fd.close()
+        if not completed and os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+
+def read_data_file_cache(cache_file: str,
+                         digest: bytes) -> Optional[Dict[Any, Any]]:
+    """Reads a cache written by `write_data_file_cache`. Returns None if the
+    cache does not exist, is malformed or was created from other content than
+    what `digest` identifies.
+
+    The function elements are unmarshalled as they are iterated.
+    """
+    if not os.path.isfile(cache_file):
+        return None
+
+    prefix = DATA_CACHE_MAGIC + digest
+    try:
+        with open(cache_file, 'rb') as cache_fd:
+            cache_map = mmap.mmap(cache_fd.fileno(),
+                                  0,
+                                  access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logger.info("Could not read data cache %s: %s", cache_file, str(e))
+        return None
+
+    view = memoryview(cache_map)
+    try:
+        if (len(view) < len(prefix) + DATA_CACHE_TRAILER.size
+                or view[:len(prefix)] != prefix):
+            raise ValueError("unexpected cache header")
+        header_end = len(view) - DATA_CACHE_TRAILER.size
+        (header_offset, ) = DATA_CACHE_TRAILER.unpack_from(view, header_end)
+
+        # Validate the chain of records before handing out any elements.
+        offset = len(prefix)
+        while offset < header_offset:
+            (size, ) = DATA_CACHE_RECORD_HEADER.unpack_from(view, offset)
+            offset += DATA_CACHE_RECORD_HEADER.size + size
+        if offset != header_offset:
+            raise ValueError("inconsistent cache records")
+        (size, ) = DATA_CACHE_RECORD_HEADER.unpack_from(view, header_offset)
+        if header_offset + DATA_CACHE_RECORD_HEADER.size + size != header_end:
+            raise ValueError("inconsistent cache records")
+
+        data_dict = marshal.loads(
+            view[header_offset + DATA_CACHE_RECORD_HEADER.size:header_end])
+        if (not isinstance(data_dict, dict)
+                or not isinstance(data_dict.get('All functions'), dict)):
+            raise ValueError("unexpected cache content")
+    except (ValueError, EOFError, TypeError, struct.error) as e:
+        logger.info("Could not read data cache %s: %s", cache_file, str(e))
+        view.release()
+        cache_map.close()
+        return None
+
+    data_dict['All functions']['Elements'] = _iter_data_cache_records(
+        cache_map, view, len(prefix), header_offset)
+    return data_dict
+
+
+def _iter_data_cache_records(cache_map: mmap.mmap, view: memoryview,
+                             offset: int, end: int) -> Iterator[Any]:
+    """Yields the records of a mapped cache between `offset` and `end`. The
+    mapping is released once the records are consumed."""
+    try:
+        while offset < end:
+            (size, ) = DATA_CACHE_RECORD_HEADER.unpack_from(view, offset)
+            offset += DATA_CACHE_RECORD_HEADER.size
+            try:
+                yield marshal.loads(view[offset:offset + size])
+            except (ValueError, EOFError, TypeError) as e:
+                raise DataLoaderError(f"Malformed data cache: {str(e)}")
+            offset += size
+    finally:
+        view.release()
+        cache_map.close()
+
+
+def _load_profile(
+    data_file: str,
+    language: str,
+    target_folder: Optional[str] = None,
+    correlation_dict: Optional[Dict[Any, Any]] = None
+) -> Optional[fuzzer_profile.FuzzerProfile]:
+    """Loads the profile of a data file, correlates it with its executable
+    and accummulates it if `target_folder` is given."""
     profile = read_fuzzer_data_file_to_profile(data_file, language)
-    if profile is not None:
-        manager[data_file] = profile
+    if profile is None:
+        return None
+    if correlation_dict is not None and "pairings" in correlation_dict:
+        profile.correlate_executable_name(correlation_dict)
+    if target_folder is not None:
+        profile.accummulate_profile(target_folder, None, None, None)
+    return profile
 
-    if semaphore is not None:
-        semaphore.release()
+
+def _load_profile_in_worker(
+    data_file: str, language: str, target_folder: Optional[str],
+    correlation_dict: Optional[Dict[Any, Any]]
+) -> Optional[fuzzer_profile.FuzzerProfile]:
+    """Internal function used for multiprocess profile loading. A profile
+    that fails to load is skipped rather than failing all profiles."""
+    try:
+        return _load_profile(data_file, language, target_folder,
+                             correlation_dict)
+    except Exception as e:
+        logger.error("Failed loading profile %s: %s", data_file, str(e))
+        return None
 
 
 def load_all_debug_files(target_folder: str):
@@ -102,44 +322,43 @@ def find_all_debug_function_files(target_folder: str):
 def load_all_profiles(
         target_folder: str,
         language: str,
-        parallelise: bool = True) -> List[fuzzer_profile.FuzzerProfile]:
-    """Loads all profiles in target_folder in a multi-threaded manner"""
-
-    if language == "jvm":
-        # Java targets tend to be quite large, so we try to avoid memory
-        # exhaustion here.
-        semaphore_count = 3
-    else:
-        semaphore_count = 6
-
-    profiles = []
+        parallelise: bool = True,
+        correlation_dict: Optional[Dict[Any, Any]] = None,
+        accummulate: bool = False) -> List[fuzzer_profile.FuzzerProfile]:
+    """Loads all profiles in target_folder in a multi-process manner.
+
+    If `correlation_dict` is given, the profiles are correlated with their
+    executables, and if `accummulate` is set the profiles are accummulated
+    before they are returned. Doing so in the worker processes means each
+    profile is only transferred once.
+    """
     data_files = utils.get_all_files_in_tree_with_regex(
         target_folder, "fuzzerLogFile.*\.data$")
     logger.info(" - found %d profiles to load", len(data_files))
-    if parallelise:
-        manager = multiprocessing.Manager()
-        semaphore = multiprocessing.Semaphore(semaphore_count)
-        return_dict = manager.dict()
-        jobs = []
-        for data_file in data_files:
-            p = multiprocessing.Process(target=_load_profile,
-                                        args=(data_file, language, return_dict,
-                                              semaphore))
-            jobs.append(p)
-            p.start()
-        for proc in jobs:
-            proc.join()
-
-        for v in return_dict.values():
-            profiles.append(v)
+
+    load_args = [(data_file, language, target_folder if accummulate else None,
+                  correlation_dict) for data_file in data_files]
+    if parallelise and len(data_files) > 1:
+        # Java targets tend to be quite large, so we try to avoid memory
+        # exhaustion here.
+        if language == "jvm":
+            memory_per_worker = constants.JVM_PROFILE_LOADING_MEMORY
+        else:
+            memory_per_worker = constants.PROFILE_LOADING_MEMORY
+        worker_count = utils.get_worker_count(len(data_files),
+                                              memory_per_worker)
+        logger.info(" - loading profiles with %d workers", worker_count)
+
+        # Use a fresh process for each profile, so the memory of a loaded
+        # profile is released when its result has been sent back.
+        with multiprocessing.Pool(worker_count, maxtasksperchild=1) as pool:
+            loaded_profiles = pool.starmap(_load_profile_in_worker,
+                                           load_args,
+                                           chunksize=1)
     else:
-        return_dict_gen: Dict[Any, Any] = dict()
-        for data_file in data_files:
-            _load_profile(data_file, language, return_dict_gen, None)
-        for v in return_dict_gen.values():
-            profiles.append(v)
+        loaded_profiles = [_load_profile(*args) for args in load_args]
 
-    return profiles
+    return [profile for profile in loaded_profiles if profile is not None]
 
 
 def try_load_input_bugs() -> List[bug.Bug]:
@@ -19,9 +19,11 @@ from typing import (
     Any,
     Dict,
     List,
+    Optional,
 )
 
 from fuzz_introspector.datatypes import branch_profile
+from fuzz_introspector import call_graph
 from fuzz_introspector import utils
 
 logger = logging.getLogger(name=__name__)
@@ -33,6 +35,9 @@ class FunctionProfile:
     """
 
     def __init__(self, elem: Dict[Any, Any]) -> None:
+        self._functions_reached: Optional[List[str]] = None
+        self.reachable_set: Optional[call_graph.ReachableSet] = None
+
         self.function_name = utils.demangle_cpp_func(elem['functionName'])
         self.raw_function_name = elem['functionName']
         self.function_source_file = elem['functionSourceFile']
@@ -96,6 +101,29 @@ class FunctionProfile:
         self.new_unreached_complexity: int = 0
         self.total_cyclomatic_complexity: int = 0
 
+    @property
+    def functions_reached(self) -> List[str]:
+        """Names of the functions reached by this function. If the reached
+        functions are set as a `call_graph.ReachableSet`, the list is created
+        when first accessed."""
+        if self._functions_reached is None:
+            if self.reachable_set is None:
+                self._functions_reached = []
+            else:
+                self._functions_reached = self.reachable_set.to_names()
+        return self._functions_reached
+
+    @functions_reached.setter
+    def functions_reached(self, functions_reached: List[str]) -> None:
+        self._functions_reached = functions_reached
+        self.reachable_set = None
+
+    def set_reachable_set(self,
+                          reachable_set: call_graph.ReachableSet) -> None:
+        """Sets the functions reached by this function as a compact set."""
+        self._functions_reached = None
+        self.reachable_set = reachable_set
+
     @property
     def has_source_file(self) -> bool:
         return len(self.function_source_file.strip()) > 0
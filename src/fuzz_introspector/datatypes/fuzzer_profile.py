@@ -25,7 +25,8 @@ from typing import (
     Tuple,
 )
 
-from fuzz_introspector import (cfg_load, code_coverage, json_report, utils)
+from fuzz_introspector import (call_graph, cfg_load, code_coverage,
+                               json_report, utils)
 from fuzz_introspector.datatypes import function_profile
 from fuzz_introspector.exceptions import DataLoaderError
 
@@ -55,12 +56,22 @@ class FuzzerProfile:
         self.branch_blockers: List[Any] = []
         self._target_lang = target_lang
         self.introspector_data_file = cfg_file
+        self._all_callsites: Optional[List[cfg_load.CalltreeCallsite]] = None
+        # Functions of each source file, keyed by the basefolder removed from
+        # the source files, and whether files are covered, keyed by file and
+        # basefolder.
+        self._file_functions: Dict[Optional[str], Dict[str,
+                                                       List[str]]] = dict()
+        self._file_coverage: Dict[Tuple[str, Optional[str]], bool] = dict()
 
         # Load calltree file
         self.fuzzer_callsite_calltree = cfg_load.data_file_read_calltree(
             cfg_file)
 
-        # Read yaml data (as dictionary) from frontend
+        # Read yaml data (as dictionary) from frontend. The function elements
+        # may be an iterator that parses the yaml lazily, in which case the
+        # remaining keys are only complete once the elements are consumed.
+        self._set_function_list(frontend_yaml)
         try:
             self.fuzzer_source_file: str = frontend_yaml['Fuzzer filename']
         except KeyError:
@@ -75,10 +86,29 @@ class FuzzerProfile:
         if target_lang == "jvm":
             self.entrypoint_method = frontend_yaml['Fuzzing method']
 
-        self._set_function_list(frontend_yaml)
         self.dst_to_fd_cache: Dict[str,
                                    function_profile.FunctionProfile] = dict()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # The callsite and file indexes are rebuilt on demand, so do not
+        # pickle them.
+        state = self.__dict__.copy()
+        state['_all_callsites'] = None
+        state['_file_functions'] = dict()
+        state['_file_coverage'] = dict()
+        return state
+
+    @property
+    def fuzzer_callsite_calltree(self) -> Optional[cfg_load.CalltreeCallsite]:
+        """The root of the fuzzer's calltree"""
+        return self._fuzzer_callsite_calltree
+
+    @fuzzer_callsite_calltree.setter
+    def fuzzer_callsite_calltree(
+            self, calltree: Optional[cfg_load.CalltreeCallsite]) -> None:
+        self._fuzzer_callsite_calltree = calltree
+        self.invalidate_callsites()
+
     @property
     def target_lang(self):
         """Language the fuzzer is written in"""
@@ -129,8 +159,7 @@ class FuzzerProfile:
     def max_func_call_depth(self):
         """The maximum depth of all callsites in the fuzzer's calltree."""
         max_depth = 0
-        for callsite in cfg_load.extract_all_callsites(
-                self.fuzzer_callsite_calltree):
+        for callsite in self.get_callsites():
             if callsite.depth > max_depth:
                 max_depth = callsite.depth
         return max_depth
@@ -182,8 +211,7 @@ class FuzzerProfile:
             basefolder, "")
 
         if self.fuzzer_callsite_calltree is not None:
-            all_callsites = cfg_load.extract_all_callsites(
-                self.fuzzer_callsite_calltree)
+            all_callsites = self.get_callsites()
             for cs in all_callsites:
                 cs.dst_function_source_file = cs.dst_function_source_file.replace(
                     basefolder, "")
@@ -192,9 +220,53 @@ class FuzzerProfile:
             for key in self.file_targets:
                 new_dict[key.replace(basefolder, "")] = self.file_targets[key]
             self.file_targets = new_dict
+            self.invalidate_file_coverage()
+
+    def get_callsites(self) -> List[cfg_load.CalltreeCallsite]:
+        """Returns all callsites of the calltree in pre-order.
 
-    def get_callsites(self):
-        return cfg_load.extract_all_callsites(self.fuzzer_callsite_calltree)
+        The list is computed once and shared between callers, so it must not
+        be modified. Call `invalidate_callsites` after changing the structure
+        of the calltree.
+        """
+        if self._all_callsites is None:
+            if self.fuzzer_callsite_calltree is None:
+                return cfg_load.extract_all_callsites(None)
+            self._all_callsites = cfg_load.extract_all_callsites(
+                self.fuzzer_callsite_calltree)
+        return self._all_callsites
+
+    def invalidate_callsites(self) -> None:
+        """Drops the cached callsites returned by `get_callsites`."""
+        self._all_callsites = None
+
+    def get_file_functions(self,
+                           basefolder: Optional[str] = None
+                           ) -> Dict[str, List[str]]:
+        """Returns the names of the functions in each source file. The index
+        is built once and must not be modified.
+
+        :param basefolder: basefolder path. If not `None` will be removed from
+                           the source file paths.
+        :type basefolder: str
+        """
+        file_functions = self._file_functions.get(basefolder)
+        if file_functions is None:
+            file_functions = dict()
+            for funcname, fd in self.all_class_functions.items():
+                source_file = fd.function_source_file
+                if basefolder is not None:
+                    source_file = source_file.replace(basefolder, "")
+                file_functions.setdefault(source_file, []).append(funcname)
+            self._file_functions[basefolder] = file_functions
+        return file_functions
+
+    def invalidate_file_coverage(self) -> None:
+        """Drops the cached functions of each file and the cached results of
+        `is_file_covered`. Must be called when the functions, coverage or
+        file targets of the profile change."""
+        self._file_functions.clear()
+        self._file_coverage.clear()
 
     def reaches_file(self,
                      file_name: str,
@@ -252,51 +324,16 @@ class FuzzerProfile:
 
     def _propagate_functions_reached(self) -> None:
         """Accummulates all functions reached by a given fuzzer. This is
-        achieved by iterating the outgoing edges of each function recursively
+        achieved by computing the transitive closure of the outgoing edges of
+        all functions, which also gives the call depth of each function.
         """
-        new_all_class_functions: Dict[
-            str, function_profile.FunctionProfile] = dict()
-
-        for func in self.all_class_functions:
-            worklist = []
-            max_depth = 0
-            for func_reached in self.all_class_functions[
-                    func].functions_reached:
-                worklist.append((func_reached, 1))
-            visited = set()
-
-            while len(worklist) > 0:
-                elem, depth = worklist.pop()
-                if depth > max_depth:
-                    max_depth = depth
-
-                if elem in visited:
-                    continue
-                visited.add(elem)
-
-                # Check if we have done this function already.
-                try:
-                    fd = new_all_class_functions[elem]
-                    visited.update(set(fd.functions_reached))
-                    tmp_depth = fd.function_depth + depth
-                    max_depth = max(max_depth, tmp_depth)
-                    continue
-                except KeyError:
-                    pass
-
-                # Otherwise traverse the functions reached.
-                try:
-                    for func_reached2 in self.all_class_functions[
-                            elem].functions_reached:
-                        worklist.append((func_reached2, depth + 1))
-                except KeyError:
-                    pass
-
-            # Save the work
-            new_all_class_functions[func] = self.all_class_functions[func]
-            new_all_class_functions[func].functions_reached = list(visited)
-            new_all_class_functions[func].function_depth = max_depth
-        self.all_class_functions = new_all_class_functions
+        reachable_sets, depths = call_graph.propagate_reachability({
+            func_name: fd.functions_reached
+            for func_name, fd in self.all_class_functions.items()
+        })
+        for func_name, fd in self.all_class_functions.items():
+            fd.set_reachable_set(reachable_sets[func_name])
+            fd.function_depth = depths[func_name]
 
     def _set_fd_cache(self):
         for fd_k, fd in self.all_class_functions.items():
@@ -370,30 +407,41 @@ class FuzzerProfile:
 
         :rtype: bool
         :returns: `True` if the file is covered by runtime code coverage,
-                  `False` otherwise.
+                  `False` otherwise. The result is cached per file.
         """
         # We need to refine the pathname to match how coverage file paths are.
         file_name = os.path.abspath(file_name)
+        if basefolder == "/":
+            basefolder = None
 
+        key = (file_name, basefolder)
+        is_covered = self._file_coverage.get(key)
+        if is_covered is None:
+            is_covered = self._is_file_covered(file_name, basefolder)
+            self._file_coverage[key] = is_covered
+        return is_covered
+
+    def _is_file_covered(self, file_name: str,
+                         basefolder: Optional[str]) -> bool:
         # Refine filename if needed
-        if basefolder is not None and basefolder != "/":
+        if basefolder is not None:
             new_file_name = file_name.replace(basefolder, "")
         else:
             new_file_name = file_name
 
-        for funcname in self.all_class_functions:
-            # Check it's a relevant filename
-            func_file_name = self.all_class_functions[
-                funcname].function_source_file
-            if basefolder is not None and basefolder != "/":
-                new_func_file_name = func_file_name.replace(basefolder, "")
-            else:
-                new_func_file_name = func_file_name
-            if func_file_name != file_name and new_func_file_name != new_file_name:
-                continue
+        # Functions are relevant if either their source file is the file or
+        # it is the file once the basefolder is removed from both.
+        funcnames = self.get_file_functions().get(file_name, [])
+        if basefolder is not None:
+            funcnames = funcnames + self.get_file_functions(basefolder).get(
+                new_file_name, [])
+
+        for funcname in funcnames:
             # Return true if the function is hit
             tf, hl, hp = self.get_cov_metrics(funcname)
             if hp is not None and hp > 0.0:
+                func_file_name = self.all_class_functions[
+                    funcname].function_source_file
                 if func_file_name in self.file_targets or new_file_name in self.file_targets:
                     return True
         return False
@@ -491,6 +539,7 @@ class FuzzerProfile:
     def _load_coverage(self, target_folder: str) -> None:
         """Load coverage data for this profile"""
         logger.info(f"Loading coverage of type {self.target_lang}")
+        self.invalidate_file_coverage()
         if self.target_lang == "c-cpp" or self.target_lang == "rust":
             if os.getenv('FI_KERNEL_COV', ''):
                 self.coverage = code_coverage.load_kernel_cov(
@@ -521,9 +570,9 @@ class FuzzerProfile:
         a set of strings containing strings which are the names of the functions
         in the given file that are reached by the fuzzer.
         """
+        self.invalidate_file_coverage()
         if self.fuzzer_callsite_calltree is not None:
-            all_callsites = cfg_load.extract_all_callsites(
-                self.fuzzer_callsite_calltree)
+            all_callsites = self.get_callsites()
             for cs in all_callsites:
                 if cs.dst_function_source_file.replace(" ", "") == "":
                     continue
@@ -19,6 +19,7 @@ import logging
 from typing import (
     Dict,
     List,
+    Set,
     Tuple,
 )
 
@@ -44,19 +45,23 @@ class MergedProjectProfile:
                                  function_profile.FunctionProfile] = dict()
         self.all_constructors: Dict[str,
                                     function_profile.FunctionProfile] = dict()
-        self.unreached_functions = set()
-        self.functions_reached = set()
+        self.unreached_functions: Set[str] = set()
+        self.functions_reached: Set[str] = set()
         self.coverage_url = "#"
         self.dst_to_fd_cache: Dict[str,
                                    function_profile.FunctionProfile] = dict()
 
         logger.info(
             f"Creating merged profile of {len(self.profiles)} profiles")
-        # Populate functions reached
+        # Index the fuzzers that reach each function, in the order of the
+        # profiles.
         logger.info("Populating functions reached")
+        reaching_fuzzers: Dict[str, List[str]] = dict()
         for profile in profiles:
-            for func_name in profile.functions_reached_by_fuzzer:
-                self.functions_reached.add(func_name)
+            identifier = profile.identifier
+            for func_name in set(profile.functions_reached_by_fuzzer):
+                reaching_fuzzers.setdefault(func_name, []).append(identifier)
+        self.functions_reached.update(reaching_fuzzers)
 
         # Set all unreached functions
         logger.info("Populating functions unreached")
@@ -83,12 +88,11 @@ class MergedProjectProfile:
                     continue
 
                 # populate hitcount and reached_by_fuzzers and whether it has been handled already
-                for profile2 in profiles:
-                    if profile2.reaches_func(fd.function_name):
-                        fd.hitcount += 1
-                        fd.reached_by_fuzzers.append(profile2.identifier)
-                    if fd.function_name not in self.all_functions:
-                        self.all_functions[fd.function_name] = fd
+                fuzzer_identifiers = reaching_fuzzers.get(fd.function_name, [])
+                fd.hitcount += len(fuzzer_identifiers)
+                fd.reached_by_fuzzers.extend(fuzzer_identifiers)
+                if fd.function_name not in self.all_functions:
+                    self.all_functions[fd.function_name] = fd
 
         # Gather complexity information about each function
         logger.info(
@@ -125,44 +129,10 @@ class MergedProjectProfile:
                                                   fp_obj.cyclomatic_complexity)
 
         # Accumulate run-time coverage mapping
-        self.runtime_coverage = code_coverage.CoverageProfile()
-        for profile in profiles:
-            if profile.coverage is None:
-                continue
-            for func_name in profile.coverage.covmap:
-                if func_name not in self.runtime_coverage.covmap:
-                    self.runtime_coverage.covmap[
-                        func_name] = profile.coverage.covmap[func_name]
-                else:
-                    # Merge by picking highest line numbers. Here we can assume they coverage
-                    # maps have the same number of elements with the same line numbers but
-                    # different hit counts.
-                    new_line_counts = list()
-                    for idx1 in range(
-                            len(self.runtime_coverage.covmap[func_name])):
-                        try:
-                            ln1, ht1 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                            ln2, ht2 = profile.coverage.covmap[func_name][idx1]
-                        except Exception:
-                            ln1, ht1 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                            ln2, ht2 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                        # It may be that line numbers are not the same for the same function
-                        # name across different fuzzers.
-                        # This *could* actually happen, and will often (almost always) happen for
-                        # LLVMFuzzerTestOneInput. In this case we just gracefully
-                        # continue and ignore issues.
-                        if ln1 != ln2:
-                            logger.info(
-                                f"Line numbers are different in the same function: "
-                                f"{func_name}:{ln1}:{ln2}, ignoring")
-                            continue
-                        new_line_counts.append((ln1, max(ht1, ht2)))
-                    self.runtime_coverage.covmap[func_name] = new_line_counts
-            # TODO (navidem): will need to merge branch coverages (branch_cov_map) if we need to
-            # identify blockers based on all fuzz targets coverage
+        self.runtime_coverage = code_coverage.merge_coverage_profiles([
+            profile.coverage for profile in profiles
+            if profile.coverage is not None
+        ])
         self._set_basefolder()
         self._set_fd_cache()
         logger.info("Completed creationg of merged profile")
@@ -102,6 +102,13 @@ ALL_FUNCTION_TABLE_COLUMNS = [
      "Based on static analysis."), ("Undiscovered complexity", "")
 ]
 
+# Columns of the all functions table that are sorted as numbers.
+ALL_FUNCTION_TABLE_NUMERIC_COLUMNS = [
+    "Function call depth", "Func lines hit %", "I Count", "BB Count",
+    "Cyclomatic complexity", "Functions reached", "Reached by functions",
+    "Accumulated cyclomatic complexity", "Undiscovered complexity"
+]
+
 FUZZER_OVERVIEW_TABLE_COLUMNS = [
     ("Fuzzer", "Fuzzer key. Usually fuzzer executable file"),
     ("Fuzzer filename", "Fuzzer source code file"),
@@ -18,11 +18,13 @@ from typing import (
     Dict,
     List,
     Optional,
+    TextIO,
     Tuple,
 )
 
 import os
 import bs4
+import html.parser
 import logging
 from datetime import datetime
 from enum import Enum
@@ -523,6 +525,235 @@ def prettify_html(html_doc: str) -> str:
     return pretty_html
 
 
+# Elements that have no end tag, elements whose content is not reindented and
+# attributes holding whitespace separated values, as BeautifulSoup has them.
+# Older BeautifulSoup versions only have the void elements as
+# `empty_element_tags`.
+HTML_VOID_ELEMENTS = frozenset(
+    getattr(bs4.builder.HTMLTreeBuilder, "DEFAULT_EMPTY_ELEMENT_TAGS", None)
+    or bs4.builder.HTMLTreeBuilder.empty_element_tags or ())
+HTML_PRESERVE_WHITESPACE_ELEMENTS = frozenset(
+    bs4.builder.HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+HTML_LIST_ATTRIBUTES = bs4.builder.HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+# Older BeautifulSoup versions end the document without a newline when it
+# ends with an end tag.
+PRETTIFY_ENDS_WITH_NEWLINE = bs4.BeautifulSoup(
+    "<p></p>", "html.parser").prettify().endswith("\n")
+
+
+class IndentedHtmlWriter(html.parser.HTMLParser):
+    """Writes HTML to `out` indented the way BeautifulSoup's prettify()
+    does, as the HTML is parsed.
+
+    This parses with the same parser as `prettify_html`, but writes each
+    tag as soon as it is parsed instead of building a tree of the document,
+    so it takes a fraction of the time and memory. Tags left open are closed
+    at the end of the document, end tags without an open tag are dropped and
+    character references are converted, as BeautifulSoup does. The one
+    difference known is that BeautifulSoup 4.10 nests a self-closing void
+    tag such as `<br/>` in an earlier `<br>`, which is not done here.
+    """
+
+    def __init__(self, out: TextIO):
+        # Character references are converted as BeautifulSoup does, which
+        # differs from html.unescape() for names that are not entities.
+        super().__init__(convert_charrefs=False)
+        self.out = out
+        self.open_tags: List[str] = []
+        # Number of open tags when the content started to be written
+        # unchanged, which is when in a tag that preserves whitespace.
+        self.literal_level: Optional[int] = None
+        self.text: List[str] = []
+        # Whether the newline after the last end tag of the document is
+        # held back, see PRETTIFY_ENDS_WITH_NEWLINE.
+        self.newline_pending = False
+        # Void elements whose start tag was written, and whose end tag is
+        # ignored once, as BeautifulSoup does.
+        self.closed_void_elements: List[str] = []
+
+    def _write(self,
+               piece: str,
+               is_string: bool = False,
+               indent_before: bool = True,
+               indent_after: bool = True) -> None:
+        """Writes a tag or string at the indentation of the open tags."""
+        if self.literal_level is not None:
+            indent_before = indent_after = False
+        if indent_before or indent_after:
+            if is_string:
+                piece = piece.strip()
+            if not piece:
+                return
+            if indent_before and self.open_tags:
+                piece = " " * len(self.open_tags) + piece
+            if indent_after:
+                piece += "\n"
+        self._write_pending_newline()
+        self.out.write(piece)
+
+    def _write_pending_newline(self) -> None:
+        """Writes the newline after the last end tag, which is followed by
+        more of the document."""
+        if self.newline_pending:
+            self.out.write("\n")
+            self.newline_pending = False
+
+    def _write_text(self) -> None:
+        """Writes the text since the last tag."""
+        if not self.text:
+            return
+        text = "".join(self.text)
+        self.text = []
+        if not self.open_tags or self.open_tags[-1] not in ("script", "style"):
+            text = bs4.dammit.EntitySubstitution.substitute_xml(text)
+        self._write(text, is_string=True)
+
+    def _format_start_tag(self, tag: str,
+                          attrs: List[Tuple[str, Optional[str]]]) -> str:
+        values: Dict[str, str] = dict()
+        for key, value in attrs:
+            values[key] = "" if value is None else value
+        formatted = ""
+        for key, value in sorted(values.items()):
+            if (key in HTML_LIST_ATTRIBUTES["*"]
+                    or key in HTML_LIST_ATTRIBUTES.get(tag, ())):
+                value = " ".join(value.split())
+            formatted += " " + key + "=" + \
+                bs4.dammit.EntitySubstitution.quoted_attribute_value(
+                    bs4.dammit.EntitySubstitution.substitute_xml(value))
+        if tag in HTML_VOID_ELEMENTS:
+            return f"<{tag}{formatted}/>"
+        return f"<{tag}{formatted}>"
+
+    def handle_starttag(self, tag: str,
+                        attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._write_text()
+        start_tag = self._format_start_tag(tag, attrs)
+        if tag in HTML_VOID_ELEMENTS:
+            self._write(start_tag)
+            self.closed_void_elements.append(tag)
+            return
+        if (self.literal_level is None
+                and tag in HTML_PRESERVE_WHITESPACE_ELEMENTS):
+            self._write(start_tag, indent_after=False)
+            self.literal_level = len(self.open_tags)
+        else:
+            self._write(start_tag)
+        self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag: str,
+                           attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in HTML_VOID_ELEMENTS:
+            self._write_text()
+            self._write(self._format_start_tag(tag, attrs))
+            return
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.closed_void_elements:
+            # The text around the end tag is kept as one string.
+            self.closed_void_elements.remove(tag)
+            return
+        self._write_text()
+        if tag not in self.open_tags:
+            return
+        while True:
+            open_tag = self.open_tags.pop()
+            indent_before = True
+            if len(self.open_tags) == self.literal_level:
+                self.literal_level = None
+                indent_before = False
+            self._write(f"</{open_tag}>",
+                        indent_before=indent_before,
+                        indent_after=bool(self.open_tags))
+            if not self.open_tags:
+                self.newline_pending = True
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data: str) -> None:
+        if data:
+            self._write_pending_newline()
+        self.text.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        if name.startswith(("x", "X")):
+            number = int(name[1:], 16)
+        else:
+            number = int(name)
+        if hasattr(bs4.dammit.UnicodeDammit, "numeric_character_reference"):
+            data, _ = bs4.dammit.UnicodeDammit.numeric_character_reference(
+                number)
+        else:
+            data = ""
+            if number < 256:
+                try:
+                    data = bytearray([number]).decode("windows-1252")
+                except UnicodeDecodeError:
+                    pass
+            if not data:
+                try:
+                    data = chr(number)
+                except (ValueError, OverflowError):
+                    pass
+            data = data or "\N{REPLACEMENT CHARACTER}"
+        self.handle_data(data)
+
+    def handle_entityref(self, name: str) -> None:
+        # Names that are not entities are kept as they are, in which case
+        # the semicolon is dropped.
+        self.handle_data(
+            bs4.dammit.EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(
+                name, "&" + name))
+
+    def handle_comment(self, data: str) -> None:
+        self._write_text()
+        self._write(f"<!--{data}-->", is_string=True)
+
+    def handle_decl(self, decl: str) -> None:
+        self._write_text()
+        self._write(f"<!DOCTYPE {decl[len('DOCTYPE '):]}>", is_string=True)
+
+    def handle_pi(self, data: str) -> None:
+        self._write_text()
+        self._write(f"<?{data}>", is_string=True)
+
+    def unknown_decl(self, data: str) -> None:
+        self._write_text()
+        if data.upper().startswith("CDATA["):
+            self._write(f"<![CDATA[{data[len('CDATA['):]}]]>", is_string=True)
+        else:
+            self._write(f"<!{data}>", is_string=True)
+
+    def close(self) -> None:
+        super().close()
+        self._write_text()
+        while self.open_tags:
+            self.handle_endtag(self.open_tags[-1])
+        if self.newline_pending and PRETTIFY_ENDS_WITH_NEWLINE:
+            self.out.write("\n")
+        self.newline_pending = False
+
+
+def write_html(out: TextIO, html_doc: str) -> None:
+    """Writes a HTML document indented to `out`.
+
+    The document is indented while it is parsed by `IndentedHtmlWriter`
+    when FI_DIRECT_HTML is set, which it is by default in batch builds
+    where FUZZ_INTROSPECTOR is set (FI_DIRECT_HTML=0 turns it off). Otherwise
+    it is beautified by `prettify_html`, which for large reports takes
+    minutes and several GB of memory.
+    """
+    default = "1" if os.environ.get("FUZZ_INTROSPECTOR") else ""
+    if os.environ.get("FI_DIRECT_HTML", default) not in ("", "0"):
+        writer = IndentedHtmlWriter(out)
+        writer.feed(html_doc)
+        writer.close()
+    else:
+        out.write(prettify_html(html_doc))
+
+
 def wrap_link(url, text):
     return f"<a href='{url}'>{text}</a>"
 
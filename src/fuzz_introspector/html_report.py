@@ -15,9 +15,8 @@
 import os
 import logging
 import json
+import multiprocessing
 import typing
-import random
-import string
 
 from typing import (
     Any,
@@ -30,7 +29,8 @@ from typing import (
 from fuzz_introspector import (analysis, constants, html_constants,
                                html_helpers, json_report, styling, utils)
 
-from fuzz_introspector.datatypes import project_profile, fuzzer_profile
+from fuzz_introspector.datatypes import (function_profile, fuzzer_profile,
+                                         project_profile)
 
 logger = logging.getLogger(name=__name__)
 
@@ -55,33 +55,46 @@ def create_overview_table(tables: List[str],
     return html_string
 
 
-def create_all_function_table(
-    tables: List[str],
-    proj_profile: project_profile.MergedProjectProfile,
-    coverage_url: str,
-    basefolder: str,
-    table_id: Optional[str] = None
-) -> Tuple[str, List[typing.Dict[str, Any]], List[typing.Dict[str, Any]]]:
-    """Table for all functions in the project. Contains many details about each
-        function"""
-    random_suffix = '_' + ''.join(
-        random.choices(string.ascii_lowercase + string.ascii_uppercase, k=7))
-    if table_id is None:
-        table_id = tables[-1]
+# The functions of the project profile the all functions table rows are
+# created for, set in the worker processes of the pool creating them.
+_table_profile: Optional[project_profile.MergedProjectProfile] = None
+_table_functions: List[function_profile.FunctionProfile] = []
+_table_coverage_url = ""
+_table_id = ""
 
-    html_string = html_helpers.html_create_table_head(
-        table_id,
-        html_constants.ALL_FUNCTION_TABLE_COLUMNS,
-        sort_by_column=len(html_constants.ALL_FUNCTION_TABLE_COLUMNS) - 1,
-        sort_order="desc")
 
-    # an array in development to replace html generation in python.
-    # this will be stored as a json object and will be used to populate
-    # the table in the frontend
-    table_rows_json_html = []
-    table_rows_json_report = []
+def _init_all_function_table_worker(
+        proj_profile: project_profile.MergedProjectProfile, coverage_url: str,
+        table_id: str) -> None:
+    global _table_profile, _table_functions, _table_coverage_url, _table_id
+    _table_profile = proj_profile
+    _table_functions = list(
+        proj_profile.get_all_functions_with_source().values())
+    _table_coverage_url = coverage_url
+    _table_id = table_id
+
+
+def _create_all_function_table_rows_in_worker(
+        row_range: Tuple[int,
+                         int]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    assert _table_profile is not None
+    start, end = row_range
+    return _create_all_function_table_rows(_table_profile,
+                                           _table_functions[start:end], start,
+                                           _table_coverage_url, _table_id)
+
 
-    for fd_k, fd in proj_profile.get_all_functions_with_source().items():
+def _create_all_function_table_rows(
+        proj_profile: project_profile.MergedProjectProfile,
+        functions: List[function_profile.FunctionProfile], first_row_idx: int,
+        coverage_url: str,
+        table_id: str) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Creates the rows of the all functions table for `functions`, both the
+    HTML-formatted row and the raw row of the json report. The collapsible
+    elements are identified by the table and row index, so the rows do not
+    depend on which process creates them."""
+    rows = []
+    for row_idx, fd in enumerate(functions, first_row_idx):
         demangled_func_name = utils.demangle_cpp_func(fd.function_name)
         hit_percentage = proj_profile.get_func_hit_percentage(fd.function_name)
 
@@ -97,7 +110,7 @@ def create_all_function_table(
         func_name_row = html_helpers.wrap_link(
             func_cov_url, html_helpers.create_coded_text(demangled_func_name))
 
-        collapsible_id = demangled_func_name + random_suffix
+        collapsible_id = f"{table_id}-{row_idx}"
         if fd.hitcount > 0:
             reached_by_fuzzers_row = html_helpers.create_collapsible_element(
                 str(fd.hitcount), str(fd.reached_by_fuzzers), collapsible_id)
@@ -106,7 +119,7 @@ def create_all_function_table(
 
         if fd.arg_count > 0:
             args_row = html_helpers.create_collapsible_element(
-                str(fd.arg_count), str(fd.arg_types), collapsible_id + "2")
+                str(fd.arg_count), str(fd.arg_types), collapsible_id + "-args")
         else:
             args_row = "0"
 
@@ -129,7 +142,6 @@ def create_all_function_table(
             fd.total_cyclomatic_complexity,
             "Undiscovered complexity": fd.new_unreached_complexity
         }
-        table_rows_json_html.append(row_element)
 
         # Add the entry to json list.
         # Overwrite some fields to have raw text and not HTML-formatted text.
@@ -149,7 +161,61 @@ def create_all_function_table(
         json_copy['is_static'] = fd.is_static
         json_copy['need_close'] = fd.need_close
         json_copy['exceptions'] = fd.exceptions
-        table_rows_json_report.append(json_copy)
+        rows.append((row_element, json_copy))
+    return rows
+
+
+def create_all_function_table(
+    tables: List[str],
+    proj_profile: project_profile.MergedProjectProfile,
+    coverage_url: str,
+    basefolder: str,
+    table_id: Optional[str] = None,
+    parallelise: bool = True
+) -> Tuple[str, List[typing.Dict[str, Any]], List[typing.Dict[str, Any]]]:
+    """Table for all functions in the project. Contains many details about each
+        function. If `parallelise` is set, large tables are created in chunks
+        by a pool of worker processes."""
+    if table_id is None:
+        table_id = tables[-1]
+
+    html_string = html_helpers.html_create_table_head(
+        table_id,
+        html_constants.ALL_FUNCTION_TABLE_COLUMNS,
+        sort_by_column=len(html_constants.ALL_FUNCTION_TABLE_COLUMNS) - 1,
+        sort_order="desc")
+
+    # an array in development to replace html generation in python.
+    # this will be stored as a json object and will be used to populate
+    # the table in the frontend
+    functions = list(proj_profile.get_all_functions_with_source().values())
+    chunk_size = constants.ALL_FUNCTION_TABLE_CHUNK_SIZE
+    row_ranges = [(start, min(start + chunk_size, len(functions)))
+                  for start in range(0, len(functions), chunk_size)]
+
+    worker_count = 1
+    if parallelise and not multiprocessing.current_process().daemon:
+        worker_count = utils.get_worker_count(
+            len(row_ranges), constants.ALL_FUNCTION_TABLE_MEMORY)
+    if worker_count > 1:
+        logger.info(f"Creating all functions table with {worker_count} "
+                    "workers")
+        # The workers inherit the profile when forked, and the chunks are
+        # returned in order.
+        with multiprocessing.Pool(worker_count,
+                                  initializer=_init_all_function_table_worker,
+                                  initargs=(proj_profile, coverage_url,
+                                            table_id)) as pool:
+            row_chunks = pool.map(_create_all_function_table_rows_in_worker,
+                                  row_ranges,
+                                  chunksize=1)
+        rows = [row for row_chunk in row_chunks for row in row_chunk]
+    else:
+        rows = _create_all_function_table_rows(proj_profile, functions, 0,
+                                               coverage_url, table_id)
+
+    table_rows_json_html = [row_element for row_element, _ in rows]
+    table_rows_json_report = [json_copy for _, json_copy in rows]
 
     logger.info("Assembled a total of %d entries" %
                 (len(table_rows_json_report)))
@@ -495,6 +561,66 @@ def create_html_footer(tables):
     return html_footer
 
 
+def shard_all_functions_table() -> bool:
+    """Whether the data of the all functions table is written in pages that
+    the report loads when they are shown, see `write_all_functions_pages`.
+    This is enabled with FI_SHARDED_FUNCTIONS_TABLE, unless the javascript
+    is inlined in the report."""
+    return bool(
+        os.environ.get('FI_SHARDED_FUNCTIONS_TABLE', '')
+        and not os.environ.get('FI_INLINE_JS', ''))
+
+
+def write_all_functions_pages(
+        all_functions_json_html: List[typing.Dict[str, Any]]) -> None:
+    """Writes the rows of the all functions table in pages of
+    ALL_FUNCTION_PAGE_SIZE rows, which custom.js loads when it shows them,
+    so the report opens without loading the data of all functions.
+
+    The rows are paged in the default order of the table, by undiscovered
+    complexity, so its first page is the only one loaded when the report
+    opens. The index holds the minimum and maximum of the numeric columns
+    in each page, which custom.js uses to load only the pages holding the
+    rows shown when sorting by these columns.
+    """
+    sort_column = html_constants.ALL_FUNCTION_TABLE_COLUMNS[-1][0]
+    rows = sorted(all_functions_json_html,
+                  key=lambda row: _table_value_to_number(row[sort_column]),
+                  reverse=True)
+    page_size = constants.ALL_FUNCTION_PAGE_SIZE
+    page_count = -(-len(rows) // page_size)
+    column_ranges: typing.Dict[str, List[List[float]]] = {
+        column: []
+        for column in html_constants.ALL_FUNCTION_TABLE_NUMERIC_COLUMNS
+    }
+    for page_idx in range(page_count):
+        page = rows[page_idx * page_size:(page_idx + 1) * page_size]
+        for column, ranges in column_ranges.items():
+            values = [_table_value_to_number(row[column]) for row in page]
+            ranges.append([min(values), max(values)])
+        with open(constants.ALL_FUNCTION_PAGE_JS % page_idx, 'w') as page_file:
+            page_file.write(f"allFunctionsPageLoaded({page_idx}, ")
+            page_file.write(json.dumps(page))
+            page_file.write(");\n")
+
+    with open(constants.ALL_FUNCTION_INDEX_JS, 'w') as index_file:
+        index_file.write("var all_functions_table_index = ")
+        index_file.write(
+            json.dumps({
+                "rowCount": len(rows),
+                "pageSize": page_size,
+                "pageCount": page_count,
+                "columnRanges": column_ranges
+            }))
+
+
+def _table_value_to_number(value: Any) -> float:
+    """Returns the number in a numeric table cell, such as "12.5%"."""
+    if isinstance(value, str):
+        return float(value.rstrip("%"))
+    return value
+
+
 def write_content_to_html_files(html_full_doc, all_functions_json_html,
                                 fuzzer_table_data):
     """Writes the content of the HTML static website to the relevant files.
@@ -512,12 +638,15 @@ def write_content_to_html_files(html_full_doc, all_functions_json_html,
     """
     # Dump the HTML report.
     with open(constants.HTML_REPORT, 'w') as report_file:
-        report_file.write(html_helpers.prettify_html(html_full_doc))
+        html_helpers.write_html(report_file, html_full_doc)
 
     # Dump function data to the relevant javascript file.
-    with open(constants.ALL_FUNCTION_JS, 'w') as all_function_file:
-        all_function_file.write("var all_functions_table_data = ")
-        all_function_file.write(json.dumps(all_functions_json_html))
+    if shard_all_functions_table():
+        write_all_functions_pages(all_functions_json_html)
+    else:
+        with open(constants.ALL_FUNCTION_JS, 'w') as all_function_file:
+            all_function_file.write("var all_functions_table_data = ")
+            all_function_file.write(json.dumps(all_functions_json_html))
 
     # Dump table data to relevant javascript file.
     with open(constants.FUZZER_TABLE_JS, 'w') as js_file_fd:
@@ -690,7 +819,10 @@ def get_body_script_tags(all_functions_json, fuzzer_table_data) -> str:
     else:
         html_script_tags = ""
         js_files = styling.MAIN_JS_FILES
-        js_files.append(constants.ALL_FUNCTION_JS)
+        if shard_all_functions_table():
+            js_files.append(constants.ALL_FUNCTION_INDEX_JS)
+        else:
+            js_files.append(constants.ALL_FUNCTION_JS)
         js_files.append(constants.OPTIMAL_TARGETS_ALL_FUNCTIONS)
         js_files.append(constants.FUZZER_TABLE_JS)
         js_files.extend(styling.JAVASCRIPT_REMOTE_SCRIPTS)
@@ -12,38 +12,111 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Module for creating JSON reports"""
+import contextlib
 import os
 import json
 import logging
 
-from typing import (Any, Dict)
+from typing import (Any, Dict, Iterator, Optional)
 
 from fuzz_introspector import constants
 
 logger = logging.getLogger(name=__name__)
 
 
-def _get_summary_dict() -> Dict[Any, Any]:
-    """Returns the current json report on disk as a dictionary."""
-    if not os.path.isfile(constants.SUMMARY_FILE):
-        existing_contents = dict()
-    else:
-        with open(constants.SUMMARY_FILE, "r") as report_fd:
-            existing_contents = json.load(report_fd)
+class JsonReportBuilder:
+    """Holds the json report files in memory while a report is assembled.
+
+    While a builder is active, see `buffered_report`, the functions of this
+    module update the builder instead of reading and rewriting the files on
+    disk for each key, and the files are written once when the builder is
+    flushed.
+    """
 
-    return existing_contents
+    def __init__(self) -> None:
+        self.summary: Dict[Any, Any] = _read_json_file(constants.SUMMARY_FILE)
+        self.branch_blockers: Dict[Any, Any] = _read_json_file(
+            constants.BRANCH_BLOCKERS_FILE)
+        self.summary_updated = False
+        self.branch_blockers_updated = False
+
+    def flush(self) -> None:
+        """Writes the updated report files to disk."""
+        if self.summary_updated and constants.should_dump_files:
+            _write_json_file(constants.SUMMARY_FILE, self.summary)
+        if self.branch_blockers_updated:
+            _write_json_file(constants.BRANCH_BLOCKERS_FILE,
+                             self.branch_blockers)
+        self.summary_updated = False
+        self.branch_blockers_updated = False
+
+
+_active_builder: Optional[JsonReportBuilder] = None
+
+
+@contextlib.contextmanager
+def buffered_report() -> Iterator[JsonReportBuilder]:
+    """Context manager that accumulates all report updates in a
+    `JsonReportBuilder` and flushes them to disk on exit. Nested uses share
+    the outermost builder."""
+    global _active_builder
+    if _active_builder is not None:
+        yield _active_builder
+        return
+
+    builder = JsonReportBuilder()
+    _active_builder = builder
+    try:
+        yield builder
+    finally:
+        _active_builder = None
+        builder.flush()
+
+
+def _read_json_file(filename: str) -> Dict[Any, Any]:
+    """Returns the contents of a json file, or an empty dictionary if the
+    file does not exist."""
+    if not os.path.isfile(filename):
+        return dict()
+    with open(filename, "r") as json_fd:
+        return json.load(json_fd)
+
+
+def _write_json_file(filename: str, contents: Dict[Any, Any]) -> None:
+    """Writes `contents` to a json file. The json is encoded incrementally to
+    a temporary file which is then renamed, so readers never see a partially
+    written file."""
+    tmp_file = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w') as json_fd:
+            json.dump(contents, json_fd)
+        os.replace(tmp_file, filename)
+    finally:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+
+
+def _get_summary_dict() -> Dict[Any, Any]:
+    """Returns the current json report as a dictionary."""
+    if _active_builder is not None:
+        return _active_builder.summary
+    return _read_json_file(constants.SUMMARY_FILE)
 
 
 def _overwrite_report_with_dict(new_dict: Dict[Any, Any]) -> None:
     """Writes `new_dict` as contents to the report on disk. Will overwrite any
     contents of the existing report.
     """
+    if _active_builder is not None:
+        _active_builder.summary = new_dict
+        _active_builder.summary_updated = True
+        return
+
     if not constants.should_dump_files:
         return
 
     # Write back the json file
-    with open(constants.SUMMARY_FILE, 'w') as report_fd:
-        json.dump(dict(new_dict), report_fd)
+    _write_json_file(constants.SUMMARY_FILE, dict(new_dict))
 
 
 def add_analysis_dict_to_json_report(analysis_name: str,
@@ -115,13 +188,13 @@ def create_all_jvm_constructor_json(functions_dict) -> None:
 
 def add_branch_blocker_key_value_to_report(profile_identifier, key,
                                            branch_blockers_list):
-    """Returns the current json report on disk as a dictionary."""
-    if not os.path.isfile(constants.BRANCH_BLOCKERS_FILE):
-        existing_contents = dict()
-    else:
-        with open(constants.BRANCH_BLOCKERS_FILE, "r") as report_fd:
-            existing_contents = json.load(report_fd)
+    """Adds the branch blockers of a profile to the branch blockers report."""
+    if _active_builder is not None:
+        _active_builder.branch_blockers[
+            profile_identifier] = branch_blockers_list
+        _active_builder.branch_blockers_updated = True
+        return
 
+    existing_contents = _read_json_file(constants.BRANCH_BLOCKERS_FILE)
     existing_contents[profile_identifier] = branch_blockers_list
-    with open(constants.BRANCH_BLOCKERS_FILE, 'w') as branch_fd:
-        json.dump(existing_contents, branch_fd)
+    _write_json_file(constants.BRANCH_BLOCKERS_FILE, existing_contents)
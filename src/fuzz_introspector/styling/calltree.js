@@ -1,8 +1,20 @@
 var StdCFuncNames;
 StdCFuncNames = ["free", "abort", "malloc", "calloc", "exit", "memcmp", "strlen"];
 
+// The calltree of the page if its nodes are loaded from data files rather
+// than included in the page, see VirtualCalltree.
+var virtualCalltree = null;
+
+// Number of rows of the virtual calltree rendered above and below the view.
+const VIRTUAL_ROW_MARGIN = 50;
+
 
 $( document ).ready(function() {
+  var virtualElement = document.getElementById("calltree-virtual");
+  if(virtualElement!==null) {
+    virtualCalltree = new VirtualCalltree(virtualElement, calltree_index);
+  }
+
     $('.coverage-line-inner').click(function(){
       var wrapper = $(this).closest(".calltree-line-wrapper");
       var wrapperClasses = $(wrapper).attr("class").split(/\s+/);
@@ -42,6 +54,9 @@ $( document ).ready(function() {
 
   // Add blocker lines to the calltree
   var funcList = addFuzzBlockerLines();
+  if(virtualCalltree!==null) {
+    funcList = calltree_index.collapsible;
+  }
 
   // Instantiate all click events for buttons in the navbar
   addNavbarClickEffects();
@@ -58,6 +73,10 @@ $( document ).ready(function() {
       e = e || window.event;
       var target = e.target;
       var funcName = target.innerText;
+      if(virtualCalltree!==null) {
+        virtualCalltree.collapseByName(funcName);
+        return;
+      }
 
       // Close all nodes with this funcName:
       var elems = document.getElementsByClassName("coverage-line-inner collapse-symbol");
@@ -102,6 +121,10 @@ function scrollOnLoad() {
   const urlParams = new URLSearchParams(queryString);
   const scrollToNode = urlParams.get('scrollToNode')
   if(scrollToNode!==null) {
+    if(virtualCalltree!==null) {
+      virtualCalltree.scrollToNode(scrollToNode);
+      return;
+    }
     var dataValue = "[data-calltree-idx='"+scrollToNode+"']";
     var elementToScrollTo = document.querySelector(dataValue);
     if(elementToScrollTo===null) {
@@ -114,6 +137,10 @@ function scrollOnLoad() {
 
 // Scrolls to a node
 function scrollToNodeInCT(nodeId) {
+  if(virtualCalltree!==null) {
+    virtualCalltree.scrollToNode(nodeId);
+    return;
+  }
   var dataValue = "[data-calltree-idx='"+nodeId+"']";
   var elementToScrollTo = document.querySelector(dataValue);
   if(elementToScrollTo===null) {
@@ -143,7 +170,7 @@ function addFuzzBlockerLines() {
 
   var funcList;
   funcList = [];
-  var blocker_infos = JSON.parse(fuzz_blocker_infos);
+  var blocker_infos = getFuzzBlockerInfos();
   for(var i=0;i<coverageLines.length;i++) {
     // Add fuzz blocker line
     var thisDataIdx = coverageLines[i].getAttribute("data-calltree-idx");
@@ -173,6 +200,14 @@ function addFuzzBlockerLines() {
   return funcList;
 }
 
+// Returns the links to the coverage report of the fuzz blockers by calltree index
+function getFuzzBlockerInfos() {
+  if(typeof fuzz_blocker_infos==="undefined") {
+    return {};
+  }
+  return JSON.parse(fuzz_blocker_infos);
+}
+
 /* When the user clicks on the button,
 toggle between hiding and showing the dropdown content */
 function displayNavBar() {
@@ -357,6 +392,10 @@ function addNavbarClickEffects() {
   createStdCClickeffects();
 
   $("#expand-all-button").click(function(){
+    if(virtualCalltree!==null) {
+      virtualCalltree.expandAll();
+      return;
+    }
     Array.from(document.querySelectorAll('.calltree-line-wrapper:not(.open)')).forEach((el) => el.classList.add('open'));
     Array.from(document.querySelectorAll('.coverage-line-inner.expand-symbol')).forEach(function(el) {
       el.classList.remove('expand-symbol')
@@ -365,6 +404,10 @@ function addNavbarClickEffects() {
   })
 
   $("#collapse-all-button").click(function(){
+    if(virtualCalltree!==null) {
+      virtualCalltree.collapseAll();
+      return;
+    }
     Array.from(document.querySelectorAll('.calltree-line-wrapper.open')).forEach((el) => el.classList.remove('open'));
     Array.from(document.querySelectorAll('.coverage-line-inner.collapse-symbol')).forEach(function(el) {
       el.classList.remove('collapse-symbol')
@@ -374,6 +417,9 @@ function addNavbarClickEffects() {
 
   $(".fontsize-option").click(function(){
     var selectedFontSize=$(this).data("fontsize");
+    if(virtualCalltree!==null) {
+      virtualCalltree.setFontSize(selectedFontSize);
+    }
     $(".coverage-line-inner").css("font-size", selectedFontSize);
     $(".fontsize-option").removeClass("active");
     $(this).addClass("active");
@@ -413,6 +459,10 @@ function hideDropdown(dropdownId) {
 
 function hideNodesWithText(text) {
   console.log("changing nodes with text ", text)
+  if(virtualCalltree!==null) {
+    virtualCalltree.toggleHiddenName(text);
+    return;
+  }
   $(".coverage-line-inner").each(function( index ) {
     var funcName = $( this ).find(".language-clike").text().trim()
     if(funcName===text) {
@@ -471,3 +521,435 @@ function tabLineHover() {
     }
   });
 }
+
+// Called by the data files of the virtual calltree when they are loaded.
+function calltreeChunkLoaded(calltreeName, chunkIdx, chunk) {
+  if(virtualCalltree!==null && virtualCalltree.name===calltreeName) {
+    virtualCalltree.chunkLoaded(chunkIdx, chunk);
+  }
+}
+
+// Returns the number of integers in [0, count) for which pred holds, where
+// pred holds for a prefix of them.
+function countWhile(count, pred) {
+  var low = 0;
+  var high = count;
+  while(low<high) {
+    var mid = (low + high) >> 1;
+    if(pred(mid)) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+// Calltree whose nodes are loaded in chunks from the data files written by
+// calltree_analysis.write_calltree_data when they are shown, and of which
+// only the rows in view are rendered.
+//
+// The rows shown are the nodes that are not in the subtree of a folded node
+// and whose function is not hidden. These are tracked as the sorted, disjoint
+// ranges of node indices that are not shown, which map rows to nodes by
+// binary search.
+class VirtualCalltree {
+  constructor(element, index) {
+    this.element = element;
+    this.name = element.dataset.calltreeName;
+    this.index = index;
+    this.chunks = new Array(index.chunkCount).fill(null);
+    // Callbacks waiting for the chunks that are being loaded.
+    this.pendingChunks = {};
+    // Folded nodes mapped to the index following their subtree.
+    this.folded = new Map();
+    // Folded nodes whose callees are folded when they are unfolded, which
+    // is how "Collapse all" folds the whole calltree.
+    this.foldCallees = new Set();
+    this.hiddenNames = new Set();
+    this.hiddenNodes = [];
+    this.blockerInfos = getFuzzBlockerInfos();
+    this.fontSize = null;
+    this.highlighted = -1;
+    this.renderPending = false;
+
+    // The rows are positioned in the element, so it does not size its parent.
+    element.parentElement.style.flex = "4";
+    element.style.position = "relative";
+    this.rows = document.createElement("div");
+    this.rows.style.position = "absolute";
+    this.rows.style.left = "0px";
+    this.rows.style.right = "0px";
+    this.marker = document.createElement("div");
+    this.marker.style.position = "absolute";
+    this.marker.style.width = "1px";
+    element.append(this.rows, this.marker);
+
+    element.addEventListener("click", (e) => {
+      var inner = e.target.closest(".coverage-line-inner");
+      if(inner!==null && e.target.closest("a")===null) {
+        this.toggle(parseInt(inner.dataset.node));
+      }
+    });
+    element.addEventListener("mouseover", (e) => {
+      var line = e.target.closest(".coverage-line");
+      if(line!==null) {
+        line.classList.add("hovered");
+      }
+    });
+    element.addEventListener("mouseout", (e) => {
+      var line = e.target.closest(".coverage-line");
+      if(line!==null) {
+        line.classList.remove("hovered");
+      }
+    });
+    // Scroll events do not bubble, so capture them from any scrolling parent.
+    document.addEventListener("scroll", () => this.scheduleRender(), true);
+    window.addEventListener("resize", () => this.scheduleRender());
+
+    this.measureRowHeight();
+    this.updateRanges();
+    this.scheduleRender();
+  }
+
+  // Loads the data file of a chunk, and resolves once it is loaded.
+  loadChunk(chunkIdx) {
+    if(this.chunks[chunkIdx]!==null) {
+      return Promise.resolve();
+    }
+    if(!(chunkIdx in this.pendingChunks)) {
+      this.pendingChunks[chunkIdx] = [];
+      let script = document.createElement("script");
+      script.src = this.name + "_chunk_" + chunkIdx + ".js";
+      document.body.append(script);
+    }
+    return new Promise((resolve) => this.pendingChunks[chunkIdx].push(resolve));
+  }
+
+  loadAllChunks() {
+    return Promise.all(this.chunks.map((chunk, chunkIdx) => this.loadChunk(chunkIdx)));
+  }
+
+  chunkLoaded(chunkIdx, chunk) {
+    this.chunks[chunkIdx] = chunk;
+    var callbacks = this.pendingChunks[chunkIdx] || [];
+    delete this.pendingChunks[chunkIdx];
+    callbacks.forEach((resolve) => resolve());
+  }
+
+  // Returns the node at nodeIdx, or null if its chunk is not loaded.
+  getNode(nodeIdx) {
+    var chunk = this.chunks[Math.floor(nodeIdx / this.index.chunkSize)];
+    if(chunk===null) {
+      return null;
+    }
+    var data = chunk.nodes;
+    var strings = chunk.strings;
+    var i = (nodeIdx % this.index.chunkSize) * this.index.nodeFields;
+    return {
+      idx: nodeIdx,
+      depth: data[i],
+      end: data[i + 1],
+      name: strings[data[i + 2]],
+      color: strings[data[i + 3]],
+      funcLink: data[i + 4] < 0 ? null : strings[data[i + 4]],
+      callsiteLink: strings[data[i + 5]],
+      ctIdx: String(data[i + 6]).padStart(5, "0")
+    };
+  }
+
+  async loadNode(nodeIdx) {
+    await this.loadChunk(Math.floor(nodeIdx / this.index.chunkSize));
+    return this.getNode(nodeIdx);
+  }
+
+  // Recomputes the ranges of nodes that are not shown.
+  updateRanges() {
+    var ranges = [];
+    this.folded.forEach((end, nodeIdx) => ranges.push([nodeIdx + 1, end]));
+    this.hiddenNodes.forEach((nodeIdx) => ranges.push([nodeIdx, nodeIdx + 1]));
+    ranges.sort((a, b) => a[0] - b[0]);
+
+    this.rangeStarts = [];
+    this.rangeEnds = [];
+    // Number of nodes not shown before each range.
+    this.hiddenBefore = [];
+    var hidden = 0;
+    for(const [start, end] of ranges) {
+      var last = this.rangeEnds.length - 1;
+      if(last>=0 && start<=this.rangeEnds[last]) {
+        if(end>this.rangeEnds[last]) {
+          hidden += end - this.rangeEnds[last];
+          this.rangeEnds[last] = end;
+        }
+      } else if(start<end) {
+        this.rangeStarts.push(start);
+        this.rangeEnds.push(end);
+        this.hiddenBefore.push(hidden);
+        hidden += end - start;
+      }
+    }
+    this.rowCount = this.index.nodeCount - hidden;
+  }
+
+  // Returns the number of nodes not shown in the first `count` ranges.
+  hiddenInRanges(count) {
+    if(count===0) {
+      return 0;
+    }
+    return this.hiddenBefore[count - 1] + this.rangeEnds[count - 1] - this.rangeStarts[count - 1];
+  }
+
+  rowToNode(row) {
+    var count = countWhile(this.rangeStarts.length,
+                           (k) => this.rangeStarts[k] - this.hiddenBefore[k] <= row);
+    return row + this.hiddenInRanges(count);
+  }
+
+  // Returns the row of a node, or -1 if it is not shown.
+  nodeToRow(nodeIdx) {
+    var count = countWhile(this.rangeStarts.length, (k) => this.rangeStarts[k] <= nodeIdx);
+    if(count>0 && nodeIdx<this.rangeEnds[count - 1]) {
+      return -1;
+    }
+    return nodeIdx - this.hiddenInRanges(count);
+  }
+
+  update() {
+    this.updateRanges();
+    this.render();
+  }
+
+  scheduleRender() {
+    if(this.renderPending) {
+      return;
+    }
+    this.renderPending = true;
+    requestAnimationFrame(() => {
+      this.renderPending = false;
+      this.render();
+    });
+  }
+
+  // Renders the rows in view, and loads the chunks of those that are not
+  // loaded yet.
+  render() {
+    this.element.style.height = (this.rowCount * this.rowHeight) + "px";
+    var top = -this.element.getBoundingClientRect().top;
+    var first = Math.max(0, Math.floor(top / this.rowHeight) - VIRTUAL_ROW_MARGIN);
+    var last = Math.min(this.rowCount,
+                        Math.ceil((top + window.innerHeight) / this.rowHeight) + VIRTUAL_ROW_MARGIN);
+
+    var missingChunks = new Set();
+    var fragment = document.createDocumentFragment();
+    for(var row=first;row<last;row++) {
+      var nodeIdx = this.rowToNode(row);
+      var node = this.getNode(nodeIdx);
+      if(node===null) {
+        missingChunks.add(Math.floor(nodeIdx / this.index.chunkSize));
+        let line = document.createElement("div");
+        line.classList.add("coverage-line");
+        line.style.height = this.rowHeight + "px";
+        fragment.append(line);
+      } else {
+        fragment.append(this.createRow(node));
+      }
+    }
+    this.rows.style.top = (first * this.rowHeight) + "px";
+    this.rows.replaceChildren(fragment);
+    missingChunks.forEach((chunkIdx) => {
+      this.loadChunk(chunkIdx).then(() => this.scheduleRender());
+    });
+  }
+
+  // Creates the row of a node, which is the same as in calltrees included
+  // in the page.
+  createRow(node) {
+    let line = document.createElement("div");
+    line.className = node.color + "-background coverage-line";
+    let inner = document.createElement("span");
+    inner.classList.add("coverage-line-inner");
+    inner.dataset.calltreeIdx = node.ctIdx;
+    inner.dataset.node = node.idx;
+    var indentation = (node.depth * 16 + 100) + "px";
+    inner.dataset.paddingleft = indentation;
+    inner.style.paddingLeft = indentation;
+    if(this.fontSize!==null) {
+      inner.style.fontSize = this.fontSize;
+    }
+    if(node.end>node.idx + 1) {
+      inner.classList.add(this.folded.has(node.idx) ? "expand-symbol" : "collapse-symbol");
+    }
+    if(node.idx===this.highlighted) {
+      inner.style.background = "#ffe08c";
+    }
+
+    let depth = document.createElement("span");
+    depth.classList.add("node-depth-wrapper");
+    depth.textContent = node.depth;
+    let code = document.createElement("code");
+    code.classList.add("language-clike");
+    code.textContent = node.name;
+    let filename = document.createElement("span");
+    filename.classList.add("coverage-line-filename");
+    if(node.funcLink!==null) {
+      let funcLink = document.createElement("a");
+      funcLink.href = node.funcLink;
+      funcLink.textContent = "[function]";
+      filename.append(funcLink, " ");
+    }
+    let callsiteLink = document.createElement("a");
+    callsiteLink.href = node.callsiteLink;
+    callsiteLink.textContent = "[call site]";
+    let ctIdx = document.createElement("span");
+    ctIdx.classList.add("calltree-idx");
+    ctIdx.textContent = node.ctIdx;
+    filename.append(callsiteLink, " ", ctIdx);
+    inner.append(depth, " ", code, " ", filename);
+
+    if(node.ctIdx in this.blockerInfos) {
+      inner.classList.add("with-fuzz-blocker-line");
+      let infoBtn = document.createElement("a");
+      infoBtn.classList.add("fuzz-blocker-info-btn");
+      infoBtn.innerText = "FUZZ BLOCKER";
+      infoBtn.href = this.blockerInfos[node.ctIdx];
+      inner.append(infoBtn);
+    }
+    line.append(inner);
+    return line;
+  }
+
+  // Rows have a fixed height, which is that of a row in the current font size.
+  measureRowHeight() {
+    var line = this.createRow({idx: -1, depth: 0, end: 0, name: "x", color: "red",
+                               funcLink: null, callsiteLink: "", ctIdx: ""});
+    this.rows.replaceChildren(line);
+    this.rowHeight = Math.max(1, line.offsetHeight);
+    line.remove();
+  }
+
+  async toggle(nodeIdx) {
+    var node = this.getNode(nodeIdx);
+    if(node===null || node.end<=nodeIdx + 1) {
+      return;
+    }
+    if(this.folded.has(nodeIdx)) {
+      await this.unfold(node);
+    } else {
+      this.folded.set(nodeIdx, node.end);
+    }
+    this.update();
+  }
+
+  async unfold(node) {
+    this.folded.delete(node.idx);
+    if(!this.foldCallees.delete(node.idx)) {
+      return;
+    }
+    for(var calleeIdx=node.idx + 1;calleeIdx<node.end;) {
+      var callee = await this.loadNode(calleeIdx);
+      if(callee.end>calleeIdx + 1) {
+        this.folded.set(calleeIdx, callee.end);
+        this.foldCallees.add(calleeIdx);
+      }
+      calleeIdx = callee.end;
+    }
+  }
+
+  expandAll() {
+    this.folded.clear();
+    this.foldCallees.clear();
+    this.update();
+  }
+
+  collapseAll() {
+    this.folded.clear();
+    this.foldCallees.clear();
+    for(const [nodeIdx, end] of this.index.topLevel) {
+      this.folded.set(nodeIdx, end);
+      this.foldCallees.add(nodeIdx);
+    }
+    this.update();
+  }
+
+  async collapseByName(funcName) {
+    await this.loadAllChunks();
+    var fields = this.index.nodeFields;
+    this.chunks.forEach((chunk, chunkIdx) => {
+      var nameId = chunk.strings.indexOf(funcName);
+      for(var i=0;nameId>=0 && i<chunk.nodes.length;i+=fields) {
+        var nodeIdx = chunkIdx * this.index.chunkSize + i / fields;
+        var end = chunk.nodes[i + 1];
+        if(chunk.nodes[i + 2]===nameId && end>nodeIdx + 1) {
+          this.folded.set(nodeIdx, end);
+        }
+      }
+    });
+    this.update();
+  }
+
+  // Hides or shows the rows of the nodes calling funcName.
+  async toggleHiddenName(funcName) {
+    if(!this.hiddenNames.delete(funcName)) {
+      this.hiddenNames.add(funcName);
+    }
+    await this.loadAllChunks();
+    var fields = this.index.nodeFields;
+    this.hiddenNodes = [];
+    this.chunks.forEach((chunk, chunkIdx) => {
+      var nameIds = new Set();
+      chunk.strings.forEach((s, stringId) => {
+        if(this.hiddenNames.has(s)) {
+          nameIds.add(stringId);
+        }
+      });
+      for(var i=0;nameIds.size>0 && i<chunk.nodes.length;i+=fields) {
+        if(nameIds.has(chunk.nodes[i + 2])) {
+          this.hiddenNodes.push(chunkIdx * this.index.chunkSize + i / fields);
+        }
+      }
+    });
+    this.update();
+  }
+
+  setFontSize(fontSize) {
+    this.fontSize = fontSize;
+    this.measureRowHeight();
+    this.render();
+  }
+
+  // Unfolds the nodes around a node and scrolls to it, where nodeId is the
+  // calltree index of the node, which is its index in the calltree.
+  async scrollToNode(nodeId) {
+    var nodeIdx = parseInt(nodeId, 10);
+    if(isNaN(nodeIdx) || nodeIdx<0 || nodeIdx>=this.index.nodeCount) {
+      return;
+    }
+    var node = await this.loadNode(nodeIdx);
+    if(node===null || node.ctIdx!==nodeId) {
+      return;
+    }
+    var ancestors;
+    do {
+      ancestors = [];
+      this.folded.forEach((end, foldedIdx) => {
+        if(foldedIdx<nodeIdx && nodeIdx<end) {
+          ancestors.push(foldedIdx);
+        }
+      });
+      for(const ancestorIdx of ancestors) {
+        await this.unfold(await this.loadNode(ancestorIdx));
+      }
+    } while(ancestors.length>0);
+
+    this.highlighted = nodeIdx;
+    this.update();
+    var row = this.nodeToRow(nodeIdx);
+    if(row<0) {
+      return;
+    }
+    this.marker.style.top = (row * this.rowHeight) + "px";
+    this.marker.style.height = this.rowHeight + "px";
+    this.marker.scrollIntoView({behavior: "smooth", block: "center"});
+  }
+}
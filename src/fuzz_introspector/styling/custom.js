@@ -157,6 +157,16 @@ function createTable(value) {
       ]
   }
 
+  // The all functions table loads its rows from pages when it shows them,
+  // if the data of the table is sharded.
+  if(value==="fuzzers_overview_table" && typeof all_functions_table_index!=="undefined") {
+    tableConfig.serverSide = true;
+    tableConfig.searchDelay = 400;
+    tableConfig.ajax = function(data, callback, settings) {
+      getAllFunctionsTableRows(data, tableConfig.columns).then(callback);
+    };
+  }
+
   // Fuzzer function hit tables
   if(value in fuzzer_table_data) {
     tableConfig.columns = [
@@ -193,6 +203,9 @@ function populateFuzzersOverviewTable(value) {
   dataWithMarkup = [];
 
   if(value==="fuzzers_overview_table") {
+    if(typeof all_functions_table_index!=="undefined") {
+      return;
+    }
     for(var i=0;i<all_functions_table_data.length;i++) {
       dataWithMarkup.push(all_functions_table_data[i]);
 
@@ -216,6 +229,150 @@ function populateFuzzersOverviewTable(value) {
   table.draw();  
 }
 
+// Pages of the sharded all functions table that are loaded, and callbacks
+// waiting for the pages that are being loaded.
+var allFunctionsPages = {};
+var allFunctionsPendingPages = {};
+
+// Called by the page files of the all functions table when they are loaded.
+function allFunctionsPageLoaded(pageIdx, rows) {
+  allFunctionsPages[pageIdx] = rows;
+  var callbacks = allFunctionsPendingPages[pageIdx] || [];
+  delete allFunctionsPendingPages[pageIdx];
+  callbacks.forEach((resolve) => resolve());
+}
+
+// Loads the page files, which are scripts rather than JSON files so they can
+// be loaded when the report is opened from disk.
+function loadAllFunctionsPages(pageIdxs) {
+  return Promise.all(pageIdxs.map(function(pageIdx) {
+    if(pageIdx in allFunctionsPages) {
+      return Promise.resolve();
+    }
+    if(!(pageIdx in allFunctionsPendingPages)) {
+      allFunctionsPendingPages[pageIdx] = [];
+      let script = document.createElement("script");
+      script.src = "all_functions_page_" + pageIdx + ".js";
+      document.body.append(script);
+    }
+    return new Promise((resolve) => allFunctionsPendingPages[pageIdx].push(resolve));
+  }));
+}
+
+// Returns the rows of the loaded pages with their index in the table data.
+function getLoadedAllFunctionsRows() {
+  var rows = [];
+  for (const [pageIdx, pageRows] of Object.entries(allFunctionsPages)) {
+    for(var i=0;i<pageRows.length;i++) {
+      rows.push({row: pageRows[i], idx: pageIdx * all_functions_table_index.pageSize + i});
+    }
+  }
+  return rows;
+}
+
+function getAllFunctionsTableSortValue(row, column) {
+  if(column in all_functions_table_index.columnRanges) {
+    return parseFloat(row[column]);
+  }
+  return String(row[column]).replace(/<.*?>/g, "").toLowerCase();
+}
+
+// Sorts rows as the table does, keeping the order of the table data for
+// rows with equal values.
+function sortAllFunctionsTableRows(rows, column, dir) {
+  var sign = dir==="desc" ? -1 : 1;
+  rows.forEach((r) => r.value = getAllFunctionsTableSortValue(r.row, column));
+  rows.sort(function(a, b) {
+    if(a.value<b.value) {
+      return -sign;
+    }
+    if(a.value>b.value) {
+      return sign;
+    }
+    return a.idx - b.idx;
+  });
+  return rows;
+}
+
+// Returns the first `count` rows of the table sorted by a numeric column,
+// loading only the pages that may hold any of them according to the range
+// of the column in each page.
+async function getTopAllFunctionsTableRows(column, dir, count) {
+  var index = all_functions_table_index;
+  var ranges = index.columnRanges[column];
+  // Pages in the order of their best value.
+  var pageIdxs = Array.from(ranges.keys());
+  if(dir==="desc") {
+    pageIdxs.sort((a, b) => ranges[b][1] - ranges[a][1]);
+  } else {
+    pageIdxs.sort((a, b) => ranges[a][0] - ranges[b][0]);
+  }
+  while(true) {
+    var rows = sortAllFunctionsTableRows(getLoadedAllFunctionsRows(), column, dir);
+    var unloaded = pageIdxs.filter((pageIdx) => !(pageIdx in allFunctionsPages));
+    var toLoad;
+    if(rows.length<count) {
+      var missingPages = Math.ceil((count - rows.length) / index.pageSize);
+      toLoad = unloaded.slice(0, missingPages);
+    } else {
+      // Pages whose best value is better than that of the last row shown,
+      // or as good but that come before it in the table data.
+      var last = rows[count - 1];
+      toLoad = unloaded.filter(function(pageIdx) {
+        var best = dir==="desc" ? ranges[pageIdx][1] : ranges[pageIdx][0];
+        if(best===last.value) {
+          return pageIdx * index.pageSize<last.idx;
+        }
+        return dir==="desc" ? best>last.value : best<last.value;
+      });
+    }
+    if(toLoad.length===0) {
+      return rows.slice(0, count);
+    }
+    await loadAllFunctionsPages(toLoad);
+  }
+}
+
+// Returns the rows of the all functions table for a draw request of the
+// table, which has the data of the table in pages.
+async function getAllFunctionsTableRows(data, columns) {
+  var index = all_functions_table_index;
+  var column = columns[data.order[0].column].data;
+  var dir = data.order[0].dir;
+  var end = data.length<0 ? index.rowCount : data.start + data.length;
+  var search = data.search.value.trim().toLowerCase();
+  var rows;
+  var rowCount = index.rowCount;
+  if(search==="" && column in index.columnRanges) {
+    rows = await getTopAllFunctionsTableRows(column, dir, end);
+  } else {
+    await loadAllFunctionsPages(Array.from(Array(index.pageCount).keys()));
+    rows = getLoadedAllFunctionsRows();
+    if(search!=="") {
+      // Rows with all words of the search in any column, like the table does.
+      var words = search.split(/\s+/);
+      rows = rows.filter(function(r) {
+        var text = columns.map((c) => String(r.row[c.data]).replace(/<.*?>/g, "")).join(" ").toLowerCase();
+        return words.every((word) => text.includes(word));
+      });
+      rowCount = rows.length;
+    }
+    rows = sortAllFunctionsTableRows(rows, column, dir);
+  }
+
+  var rowsShown = rows.slice(data.start, end).map(function(r) {
+    var row = Object.assign({}, r.row);
+    row["Func lines hit %"] = getPercentageWrapper(row["Func lines hit %"]);
+    return row;
+  });
+  return {
+    draw: data.draw,
+    recordsTotal: index.rowCount,
+    recordsFiltered: rowCount,
+    data: rowsShown
+  };
+}
+
 function getPercentageWrapper(val) {
   var numberString = val.replace('%','');
   var numberFloat = parseFloat(numberString);
@@ -25,12 +25,14 @@ from typing import (
     Any,
     List,
     Dict,
+    Iterator,
     Optional,
     Set,
     Tuple,
 )
 
 from fuzz_introspector import constants
+from fuzz_introspector.exceptions import DataLoaderError
 
 logger = logging.getLogger(name=__name__)
 
@@ -63,6 +65,40 @@ def safe_decode(data) -> Optional[str]:
     return None
 
 
+def _get_available_memory() -> Optional[int]:
+    """Returns the available memory in bytes, or None if unknown."""
+    try:
+        with open('/proc/meminfo', 'r') as meminfo_fd:
+            for line in meminfo_fd:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def get_worker_count(task_count: int, memory_per_worker: int) -> int:
+    """
+    Returns the number of worker processes to use for `task_count` tasks.
+    This is bounded by the available CPUs, by the available memory given the
+    estimated memory needed by each worker, and by FI_MAX_WORKERS if set.
+    """
+    try:
+        cpu_count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpu_count = os.cpu_count() or 1
+    worker_count = min(task_count, cpu_count)
+
+    available_memory = _get_available_memory()
+    if available_memory is not None:
+        worker_count = min(worker_count, available_memory // memory_per_worker)
+
+    max_workers = os.environ.get('FI_MAX_WORKERS', '')
+    if max_workers.isdigit() and int(max_workers) > 0:
+        worker_count = min(worker_count, int(max_workers))
+    return max(worker_count, 1)
+
+
 def get_all_files_in_tree_with_regex(basedir: str,
                                      regex_str: str) -> List[str]:
     """
@@ -145,6 +181,130 @@ def data_file_read_yaml(filename: str) -> Optional[Dict[Any, Any]]:
     return content
 
 
+def _yaml_construct_from_events(loader: Any, event: yaml.Event,
+                                anchors: Dict[Any, Any]) -> Any:
+    """Constructs the value starting with `event` by pulling the remaining
+    events of the value from `loader`.
+    """
+    value: Any
+    if isinstance(event, yaml.AliasEvent):
+        return anchors[event.anchor]
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, style=event.style)
+        constructor = loader.yaml_constructors.get(
+            tag, loader.yaml_constructors[None])
+        value = constructor(loader, node)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        value = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            value.append(
+                _yaml_construct_from_events(loader, loader.get_event(),
+                                            anchors))
+        loader.get_event()
+    elif isinstance(event, yaml.MappingStartEvent):
+        value = dict()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _yaml_construct_from_events(loader, loader.get_event(),
+                                              anchors)
+            value[key] = _yaml_construct_from_events(loader,
+                                                     loader.get_event(),
+                                                     anchors)
+        loader.get_event()
+    else:
+        raise DataLoaderError(f"Unexpected yaml event {event}")
+
+    if event.anchor is not None:
+        anchors[event.anchor] = value
+    return value
+
+
+def _data_file_iter_yaml_elements(
+        filename: str, content: Dict[Any, Any]) -> Iterator[Dict[Any, Any]]:
+    """Yields the "All functions" elements of all yaml documents in
+    `filename`. Any other keys of the documents are stored in `content`.
+    """
+    loader_cls = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(filename, 'r') as stream:
+            loader = loader_cls(stream)
+            try:
+                while not loader.check_event(yaml.StreamEndEvent):
+                    if not isinstance(loader.get_event(),
+                                      yaml.DocumentStartEvent):
+                        continue
+                    if not loader.check_event(yaml.MappingStartEvent):
+                        raise DataLoaderError(
+                            "yaml document is not a dictionary")
+                    loader.get_event()
+                    anchors: Dict[Any, Any] = dict()
+                    while not loader.check_event(yaml.MappingEndEvent):
+                        key = _yaml_construct_from_events(
+                            loader, loader.get_event(), anchors)
+                        if (key != "All functions" or not loader.check_event(
+                                yaml.MappingStartEvent)):
+                            content.setdefault(
+                                key,
+                                _yaml_construct_from_events(
+                                    loader, loader.get_event(), anchors))
+                            continue
+
+                        # Stream the elements one at a time.
+                        loader.get_event()
+                        while not loader.check_event(yaml.MappingEndEvent):
+                            sub_key = _yaml_construct_from_events(
+                                loader, loader.get_event(), anchors)
+                            if (sub_key != "Elements"
+                                    or not loader.check_event(
+                                        yaml.SequenceStartEvent)):
+                                content["All functions"].setdefault(
+                                    sub_key,
+                                    _yaml_construct_from_events(
+                                        loader, loader.get_event(), anchors))
+                                continue
+                            loader.get_event()
+                            while not loader.check_event(
+                                    yaml.SequenceEndEvent):
+                                yield _yaml_construct_from_events(
+                                    loader, loader.get_event(), anchors)
+                            loader.get_event()
+                        loader.get_event()
+                    loader.get_event()
+            finally:
+                loader.dispose()
+    except yaml.YAMLError as e:
+        raise DataLoaderError(f"Failed loading YAML: {str(e)}")
+
+    if "Fuzzer filename" not in content:
+        raise DataLoaderError("Fuzzer filename not in loaded yaml")
+
+
+def data_file_read_yaml_stream(filename: str) -> Optional[Dict[Any, Any]]:
+    """
+    Streaming version of `data_file_read_yaml` for the output of the fuzz
+    introspector frontends. This avoids holding the whole document tree in
+    memory, as function elements are constructed one at a time.
+
+    The returned dictionary has the same format as `data_file_read_yaml`,
+    except content['All functions']['Elements'] is an iterator that parses
+    the file as it is consumed. The remaining keys of the dictionary are added
+    as they are parsed, and are only guaranteed to be present once the
+    iterator is exhausted. The iterator raises `DataLoaderError` if the file
+    is malformed.
+    """
+    if filename == "":
+        return None
+    if not os.path.isfile(filename):
+        return None
+
+    content: Dict[Any, Any] = {'All functions': dict()}
+    content['All functions']['Elements'] = _data_file_iter_yaml_elements(
+        filename, content)
+    return content
+
+
 def demangle_cpp_func(funcname: str) -> str:
     try:
         demangled: str = cxxfilt.demangle(funcname.replace(" ", ""))
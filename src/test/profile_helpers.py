@@ -0,0 +1,69 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers creating project profiles for tests"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import code_coverage  # noqa: E402
+from fuzz_introspector.datatypes import (function_profile,  # noqa: E402
+                                         project_profile)
+
+
+class FakeFuzzerProfile:
+    target_lang = "c-cpp"
+
+
+def create_merged_profile(func_count, seed):
+    """Creates a merged profile of `func_count` functions calling each other
+    at random, without any runtime coverage"""
+    rnd = random.Random(seed)
+    merged_profile = project_profile.MergedProjectProfile.__new__(
+        project_profile.MergedProjectProfile)
+    merged_profile.profiles = [FakeFuzzerProfile()]
+    merged_profile.all_functions = dict()
+    merged_profile.dst_to_fd_cache = dict()
+    merged_profile.runtime_coverage = code_coverage.CoverageProfile()
+    for idx in range(func_count):
+        reached = [
+            f"f_{rnd.randrange(func_count)}"
+            for _ in range(rnd.randrange(10))
+        ] + ["missing_func"]
+        fd = function_profile.FunctionProfile({
+            'functionName': f"f_{idx}",
+            'functionSourceFile': "/src/a.c",
+            'linkageType': 0,
+            'functionLinenumber': idx,
+            'returnType': 'int',
+            'argCount': 1,
+            'argTypes': ['int'],
+            'argNames': ['a'],
+            'BBCount': 4,
+            'ICount': 10,
+            'EdgeCount': 4,
+            'CyclomaticComplexity': rnd.randrange(1, 30),
+            'functionsReached': reached,
+            'functionUses': 0,
+            'functionDepth': 0,
+            'constantsTouched': [],
+            'BranchProfiles': [],
+        })
+        fd.hitcount = 1 if rnd.random() < 0.2 else 0
+        fd.new_unreached_complexity = rnd.randrange(100)
+        fd.total_cyclomatic_complexity = rnd.randrange(100)
+        merged_profile.all_functions[fd.function_name] = fd
+    return merged_profile
@@ -0,0 +1,49 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test analysis.py"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import analysis  # noqa: E402
+
+
+def test_header_file_index(tmpdir):
+    headers = {
+        "a.h": "int parse_input(const char *data);\nvoid init(void);\n",
+        "b.hpp": "struct x { int operator==(const x &o); };\nint myinit(int);",
+        "c.c": "int parse_input(const char *data) { return 0; }\n",
+    }
+    header_files = []
+    for filename, content in headers.items():
+        header_file = os.path.join(tmpdir, filename)
+        with open(header_file, "w") as f:
+            f.write(content)
+        header_files.append(header_file)
+    header_files.append(os.path.join(tmpdir, "missing.h"))
+
+    header_index = analysis.HeaderFileIndex(header_files)
+    for name in [
+            "parse_input", "init", "nit", "operator==", "x", "data",
+            "TOTALLYRANDOMNOTFUNCNAME123", ""
+    ]:
+        expected = set(
+            header_file for header_file in header_files[:2]
+            if f"{name}(" in headers[os.path.basename(header_file)])
+        assert header_index.get_headers_with_function(name) == expected
+
+    assert header_index.get_headers_with_function("init") == set(
+        header_files[:2])
@@ -0,0 +1,72 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test call_graph.py"""
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import call_graph  # noqa: E402
+
+
+def _naive_reachable(graph, func_name):
+    visited = set()
+    worklist = list(graph[func_name])
+    while worklist:
+        elem = worklist.pop()
+        if elem in visited:
+            continue
+        visited.add(elem)
+        worklist.extend(graph.get(elem, []))
+    return visited
+
+
+def test_propagate_reachability_depths():
+    graph = {
+        "main": ["a", "b"],
+        "a": ["c", "external"],
+        "b": ["b"],
+        "c": ["d"],
+        "d": ["c", "e"],
+        "e": [],
+    }
+    reachable_sets, depths = call_graph.propagate_reachability(graph)
+
+    assert sorted(reachable_sets["main"].to_names()) == [
+        "a", "b", "c", "d", "e", "external"
+    ]
+    assert sorted(reachable_sets["b"].to_names()) == ["b"]
+    assert sorted(reachable_sets["c"].to_names()) == ["c", "d", "e"]
+    assert reachable_sets["e"].to_names() == []
+    assert len(reachable_sets["a"]) == 4
+
+    # Calls within the recursive c <-> d cycle are not counted.
+    assert depths == {"main": 3, "a": 2, "b": 0, "c": 1, "d": 1, "e": 0}
+
+
+def test_propagate_reachability_random_graph():
+    rnd = random.Random(1)
+    graph = dict()
+    for idx in range(300):
+        graph[f"f_{idx}"] = [
+            f"f_{rnd.randrange(320)}" for _ in range(rnd.randrange(4))
+        ]
+    reachable_sets, _ = call_graph.propagate_reachability(graph)
+
+    for func_name in graph:
+        names = reachable_sets[func_name].to_names()
+        assert len(names) == len(set(names))
+        assert set(names) == _naive_reachable(graph, func_name)
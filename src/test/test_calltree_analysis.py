@@ -0,0 +1,158 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test analyses/calltree_analysis.py"""
+
+import json
+import os
+import sys
+
+from bs4 import BeautifulSoup as bs
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector.analyses import calltree_analysis  # noqa: E402
+from fuzz_introspector.datatypes import fuzzer_profile  # noqa: E402
+
+
+def test_create_calltree(tmpdir, monkeypatch):
+    """Tests writing the calltree page"""
+    cfg_path = os.path.join(tmpdir, "test_file.data")
+    with open(cfg_path, "w") as f:
+        f.write("""Call tree
+LLVMFuzzerTestOneInput /src/fuzz.c linenumber=-1
+  parse<int> /src/a&b.c linenumber=10
+    read   linenumber=20
+  write /src/c.c linenumber=11""")
+    fp = fuzzer_profile.FuzzerProfile(
+        cfg_path, {
+            "Fuzzer filename": "/src/fuzz.c",
+            "All functions": {
+                "Elements": []
+            }
+        }, "c-cpp")
+    for idx, node in enumerate(fp.get_callsites()):
+        node.cov_ct_idx = idx
+        node.cov_hitcount = idx % 2
+        node.cov_link = f"/cov{node.dst_function_source_file}.html"
+
+    monkeypatch.chdir(tmpdir)
+    cta = calltree_analysis.FuzzCalltreeAnalysis()
+    assert cta.create_calltree(fp) == "calltree_view_0.html"
+    with open("calltree_view_0.html") as f:
+        calltree_html = f.read()
+
+    # The page is written already indented.
+    soup = bs(calltree_html, "html.parser")
+    assert soup.prettify() == calltree_html
+
+    lines = soup.select("#calltree-wrapper .coverage-line")
+    assert [line.code.get_text(strip=True) for line in lines
+            ] == ["LLVMFuzzerTestOneInput", "parse<int>", "read", "write"]
+    assert [line.get("class")[0] for line in lines] == [
+        f"{node.cov_color}-background" for node in fp.get_callsites()
+    ]
+    assert lines[0].get("class")[0] == "red-background"
+    # Nodes with a source file link to the function.
+    assert lines[1].find("a")["href"] == "/cov/src/a&b.c.html"
+    assert lines[2].find("a").get_text(strip=True) == "[call site]"
+
+    # Callees are folded in a wrapper of their caller.
+    wrapper = lines[0].find("div", class_="calltree-line-wrapper")
+    assert [line.code.get_text(strip=True) for line in wrapper.find_all(
+        "div", class_="coverage-line", recursive=False)] == ["parse<int>", "write"]
+    assert soup.find(id="side-overview-wrapper").parent["id"] == "calltree-wrapper"
+
+    # Nothing is written when dumping files is disabled.
+    cta.dump_files = False
+    assert cta.create_calltree(fp) == "calltree_view_1.html"
+    assert not os.path.isfile("calltree_view_1.html")
+
+
+def test_create_virtual_calltree(tmpdir, monkeypatch):
+    """Tests writing the calltree as data files of the virtual calltree"""
+    cfg_path = os.path.join(tmpdir, "test_file.data")
+    with open(cfg_path, "w") as f:
+        f.write("""Call tree
+LLVMFuzzerTestOneInput /src/fuzz.c linenumber=-1
+  parse /src/a.c linenumber=10
+    read   linenumber=20
+      memcpy   linenumber=21
+  write /src/c.c linenumber=11
+  parse /src/a.c linenumber=12
+    read   linenumber=20""")
+    fp = fuzzer_profile.FuzzerProfile(
+        cfg_path, {
+            "Fuzzer filename": "/src/fuzz.c",
+            "All functions": {
+                "Elements": []
+            }
+        }, "c-cpp")
+    for idx, node in enumerate(fp.get_callsites()):
+        node.cov_ct_idx = idx
+        node.cov_link = f"/cov{node.dst_function_source_file}.html"
+
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setenv("FI_VIRTUAL_CALLTREE", "1")
+    monkeypatch.setattr(calltree_analysis, "CALLTREE_CHUNK_SIZE", 4)
+    cta = calltree_analysis.FuzzCalltreeAnalysis()
+    assert cta.get_subtree_ends(fp.get_callsites()) == [7, 4, 4, 4, 5, 7, 7]
+    assert cta.create_calltree(fp) == "calltree_view_0.html"
+
+    # The page holds no nodes but loads the index of the data files.
+    with open("calltree_view_0.html") as f:
+        soup = bs(f.read(), "html.parser")
+    assert soup.find(class_="coverage-line") is None
+    virtual = soup.find(id="calltree-virtual")
+    assert virtual["data-calltree-name"] == "calltree_view_0"
+    assert [s["src"] for s in soup.find_all("script", src=True)
+            ][-2:] == ["calltree_view_0_index.js", "calltree.js"]
+
+    with open("calltree_view_0_index.js") as f:
+        index_js = f.read()
+    assert index_js.startswith("var calltree_index = ")
+    index = json.loads(index_js[len("var calltree_index = "):].rstrip(";\n"))
+    assert index == {
+        "nodeCount": 7,
+        "nodeFields": calltree_analysis.CALLTREE_NODE_FIELDS,
+        "chunkSize": 4,
+        "chunkCount": 2,
+        "topLevel": [[1, 4], [5, 7]],
+        "collapsible": ["LLVMFuzzerTestOneInput", "parse", "read"]
+    }
+
+    nodes = []
+    for chunk_idx in range(2):
+        with open(f"calltree_view_0_chunk_{chunk_idx}.js") as f:
+            chunk_js = f.read()
+        prefix = f'calltreeChunkLoaded("calltree_view_0", {chunk_idx}, '
+        assert chunk_js.startswith(prefix)
+        chunk = json.loads(chunk_js[len(prefix):].rstrip(");\n"))
+        strings = chunk["strings"]
+        data = chunk["nodes"]
+        for i in range(0, len(data), calltree_analysis.CALLTREE_NODE_FIELDS):
+            nodes.append((data[i], data[i + 1], strings[data[i + 2]],
+                          strings[data[i + 3]], data[i + 4] >= 0
+                          and strings[data[i + 4]], data[i + 6]))
+    callsites = fp.get_callsites()
+    assert nodes == [(0, 7, "LLVMFuzzerTestOneInput", callsites[0].cov_color,
+                      "/cov/src/fuzz.c.html", 0),
+                     (1, 4, "parse", callsites[1].cov_color,
+                      "/cov/src/a.c.html", 1),
+                     (2, 4, "read", callsites[2].cov_color, False, 2),
+                     (3, 4, "memcpy", callsites[3].cov_color, False, 3),
+                     (1, 5, "write", callsites[4].cov_color,
+                      "/cov/src/c.c.html", 4),
+                     (1, 7, "parse", callsites[5].cov_color,
+                      "/cov/src/a.c.html", 5),
+                     (2, 7, "read", callsites[6].cov_color, False, 6)]
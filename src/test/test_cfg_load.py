@@ -73,3 +73,54 @@ def test_cfg_nodes(tmpdir, sample_cfg1):
     assert all_callsites[3].depth == 2
     assert all_callsites[4].depth == 2
     assert all_callsites[5].depth == 2
+
+
+def test_cfg_arrays(tmpdir, sample_cfg1):
+    cfg_path = os.path.join(tmpdir, "test_file.data")
+    with open(cfg_path, "w") as f:
+        f.write(sample_cfg1)
+    calltree = cfg_load.data_file_read_calltree_arrays(cfg_path)
+
+    assert len(calltree) == 6
+    assert calltree.root == 0
+    assert list(calltree.depths) == [0, 1, 2, 2, 2, 2]
+    assert list(calltree.parents) == [-1, 0, 1, 1, 1, 1]
+    assert list(calltree.linenumbers) == [-1, 93, 67, 68, 72, 74]
+
+    # Repeated functions share the same name and file ids
+    assert calltree.name_ids[2] == calltree.name_ids[3]
+    assert calltree.file_ids[2] == calltree.file_ids[3]
+    assert calltree.names[calltree.name_ids[5]] == "fuzz"
+    assert calltree.files[calltree.file_ids[4]] == "/src/wuffs/fuzz/...-snapshot.c"
+
+
+def test_cfg_going_up_multiple_levels(tmpdir):
+    cfg = _load_cfg(
+        tmpdir, """Call tree
+LLVMFuzzerTestOneInput /src/fuzzer.c linenumber=-1
+  a /src/a.c linenumber=1
+    b /src/a.c linenumber=2
+      c /src/a.c linenumber=3
+  d /src/a.c linenumber=4
+====================================
+  e /src/a.c linenumber=5""")
+    all_callsites = cfg_load.extract_all_callsites(cfg)
+
+    assert [cs.dst_function_name for cs in all_callsites
+            ] == ["LLVMFuzzerTestOneInput", "a", "b", "c", "d"]
+    assert all_callsites[4].parent_calltree_callsite is cfg
+    assert all_callsites[4].src_function_name == "LLVMFuzzerTestOneInput"
+
+
+def test_callsite_cov_color():
+    callsite = cfg_load.CalltreeCallsite("a", "/src/a.c", 0, -1, None)
+
+    assert not hasattr(callsite, "__dict__")
+    assert callsite.cov_color == ""
+
+    callsite.cov_ct_idx = 0
+    assert callsite.cov_color == "red"
+    callsite.cov_hitcount = 5
+    assert callsite.cov_color == "gold"
+    callsite.cov_hitcount = 200
+    assert callsite.cov_color == "lawngreen"
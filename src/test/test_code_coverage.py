@@ -20,7 +20,9 @@ import pytest
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
 
+from fuzz_introspector import cfg_load  # noqa: E402
 from fuzz_introspector import code_coverage  # noqa: E402
+from fuzz_introspector import exceptions  # noqa: E402
 from fuzz_introspector.datatypes import function_profile  # noqa: E402
 
 TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
@@ -92,6 +94,161 @@ def test_load_llvm_coverage():
         [3260, 36000000, 3260, 3510000, 1570000])
 
 
+@pytest.mark.parametrize("parallelise", [False, True])
+def test_load_llvm_coverage_multiple_reports(tmpdir, parallelise):
+    """Tests merging the coverage of multiple .covreport files."""
+    with open(os.path.join(tmpdir, "a.covreport"), "w") as f:
+        f.write("""foo:
+    1|      5|  switch (x) {
+  |  Branch (1:11): [True: 5, False: 0]
+    2|      3|  case 1:
+  |  Branch (2:3): [True: 3, False: 2]
+""")
+    with open(os.path.join(tmpdir, "b.covreport"), "wb") as f:
+        f.write(b"""foo:
+    1|      5|  switch (x) {
+    2|      4|  case 1:
+  |  Branch (2:3): [True: 4, False: 1]
+bar:
+   10|   1.5k|  return 0; // \xff
+   11|       |  // comment
+   12|     0 |  }""")
+
+    cov_profile = code_coverage.load_llvm_coverage(str(tmpdir),
+                                                   parallelise=parallelise)
+    assert len(cov_profile.coverage_files) == 2
+    assert cov_profile.covmap['bar'] == [(10, 1500), (12, 0)]
+    # The report read last overwrites the coverage of foo, except that the
+    # switch without a Branch entry only adds its case hitcounts.
+    if cov_profile.coverage_files[0].endswith("a.covreport"):
+        assert cov_profile.covmap['foo'] == [(1, 5), (2, 4)]
+        assert cov_profile.branch_cov_map['foo:1,3'] == [5, 0, 3, 4]
+    else:
+        assert cov_profile.covmap['foo'] == [(1, 5), (2, 3)]
+        assert cov_profile.branch_cov_map['foo:1,3'] == [5, 0, 3]
+
+
+def test_line_hits_lookup():
+    """Tests looking up the hitcounts of lines in a function."""
+    cov_profile = code_coverage.CoverageProfile()
+    cov_profile.covmap['foo'] = [(12, 0), (10, 3), (11, 0), (12, 7), (13, 2)]
+
+    assert cov_profile.get_hit_summary('foo') == (5, 3)
+    assert cov_profile.get_hit_summary('bar') == (None, None)
+    assert list(cov_profile.get_line_hits('foo').linenumbers) == [
+        10, 11, 12, 12, 13
+    ]
+
+    # The first entry of a line decides whether it is hit, while the
+    # hitcount is the one of the last entry with hits.
+    assert cov_profile.is_func_lineno_hit('foo', 10)
+    assert not cov_profile.is_func_lineno_hit('foo', 11)
+    assert not cov_profile.is_func_lineno_hit('foo', 12)
+    assert not cov_profile.is_func_lineno_hit('foo', 14)
+    assert cov_profile.get_func_lineno_hitcount('foo', 12) == 7
+    assert cov_profile.get_func_lineno_hitcount('foo', 11) == 0
+    assert cov_profile.get_func_lineno_hitcount('bar', 11) == 0
+
+    # The index follows changes of covmap
+    cov_profile.covmap['foo'].append((14, 1))
+    assert cov_profile.is_func_lineno_hit('foo', 14)
+    cov_profile.covmap['foo'] = [(10, 0)]
+    assert cov_profile.get_hit_summary('foo') == (1, 0)
+
+
+def test_covmap_key_cache():
+    """Tests caching how function names resolve to covmap keys."""
+    cov_profile = code_coverage.CoverageProfile()
+    cov_profile.covmap['foo'] = [(10, 1)]
+
+    assert cov_profile.get_hit_details(' fo o') == [(10, 1)]
+    assert cov_profile.get_hit_details(' fo o') == [(10, 1)]
+    assert cov_profile.get_hit_details('bar') == []
+    assert cov_profile.get_hit_summary('bar') == (None, None)
+    assert cov_profile.covmap_key_cache_hits == 2
+    assert cov_profile.covmap_key_cache_misses == 2
+
+    # New keys are picked up for names that previously had no key
+    cov_profile.covmap['bar'] = [(20, 0)]
+    assert cov_profile.get_hit_details('bar') == [(20, 0)]
+
+
+def test_merge_coverage_profiles():
+    """Tests merging the coverage of multiple fuzzers."""
+    cov_profiles = [code_coverage.CoverageProfile() for _ in range(3)]
+    cov_profiles[0].covmap['foo'] = [(10, 0), (11, 5), (12, 0)]
+    cov_profiles[1].covmap['foo'] = [(10, 2), (11, 1), (12, 0)]
+    cov_profiles[2].covmap['foo'] = [(10, 1), (13, 9)]
+    cov_profiles[2].covmap['bar'] = [(20, 1)]
+    cov_profiles[0].branch_cov_map['foo:10,3'] = [0, 4]
+    cov_profiles[1].branch_cov_map['foo:10,3'] = [2, 1]
+    cov_profiles[0].branch_cov_map['foo:11,3'] = [5, 0, 3]
+    cov_profiles[2].branch_cov_map['foo:11,3'] = [5, 0, 1, 2]
+
+    merged = code_coverage.merge_coverage_profiles(cov_profiles)
+
+    # Lines at positions with different line numbers are dropped, and lines
+    # beyond the coverage of a profile are kept.
+    assert merged.covmap['foo'] == [(10, 2), (12, 0)]
+    assert merged.covmap['bar'] == [(20, 1)]
+    assert list(merged.covmap) == ['foo', 'bar']
+    assert merged.branch_cov_map['foo:10,3'] == [2, 4]
+    assert merged.branch_cov_map['foo:11,3'] == [5, 0, 3, 2]
+    assert cov_profiles[0].branch_cov_map['foo:11,3'] == [5, 0, 3]
+
+
+def test_python_ast_funcname_to_cov_file():
+    """Tests resolving Python module paths to files in the file map."""
+    cov_profile = code_coverage.CoverageProfile()
+    for cov_file in [
+            "/src/pkg/mod/__init__.py", "/src/pkg/mod.py", "/src/pkg/sub/a.py",
+            "/src/other/pkg/sub/a.py", "/src/pkg/sub/__init__.py",
+            "/src/pkg2/sub/__init__.py"
+    ]:
+        cov_profile.file_map[cov_file] = []
+
+    # The first file in the file map ending with any module path is used.
+    assert cov_profile._python_ast_funcname_to_cov_file(
+        "pkg.mod.func") == "/src/pkg/mod.py"
+    assert cov_profile._python_ast_funcname_to_cov_file(
+        "sub.a.Class.func") == "/src/pkg/sub/a.py"
+    # Otherwise, the last file ending with the longest matching __init__.py
+    assert cov_profile._python_ast_funcname_to_cov_file(
+        "sub.func") == "/src/pkg2/sub/__init__.py"
+    assert cov_profile._python_ast_funcname_to_cov_file(
+        "......pkg.sub.func") == "/src/pkg/sub/__init__.py"
+    assert cov_profile._python_ast_funcname_to_cov_file("missing.func") is None
+
+    # Files added later are found
+    cov_profile.file_map["/src/missing.py"] = []
+    assert cov_profile._python_ast_funcname_to_cov_file(
+        "missing.func") == "/src/missing.py"
+
+
+def test_correlate_python_functions_with_coverage():
+    """Tests mapping Python line coverage to the functions of a file."""
+    cov_profile = code_coverage.CoverageProfile()
+    cov_profile.file_map["/src/mod.py"] = [2, 3, 7, 12, 13]
+    cov_profile.dual_file_map["/src/mod.py"] = {
+        "executed_lines": [2, 3, 7, 12, 13],
+        "missing_lines": [4, 8, 14]
+    }
+    functions = dict()
+    for name, start, end in [("mod.a", 1, -1), ("mod.b", 6, 8),
+                             ("mod.c", 11, -1)]:
+        functions[name] = generate_temp_function_profile(name, "/src/mod.py")
+        functions[name].function_linenumber = start
+        functions[name].function_line_number_end = end
+
+    cov_profile.correlate_python_functions_with_coverage(functions)
+
+    # Functions without an end line extend to the line before the one
+    # preceding the next function.
+    assert cov_profile.covmap["mod.a"] == [(2, 1000), (3, 1000), (4, 0)]
+    assert cov_profile.covmap["mod.b"] == [(7, 1000), (8, 0)]
+    assert cov_profile.covmap["mod.c"] == [(12, 1000), (13, 1000), (14, 0)]
+
+
 def write_coverage_file(tmpdir, coverage_file):
     # Write the coverage_file
     path = os.path.join(tmpdir, "jacoco.xml")
@@ -144,3 +301,71 @@ def test_jvm_coverage(tmpdir, sample_jvm_coverage_xml):
     assert cp.covmap["[BASE64EncoderStreamFuzzer].<init>()"] == [(23, 0)]
     assert cp.covmap[
         "[BASE64EncoderStreamFuzzer].fuzzerTestOneInput(FuzzedDataProvider)"] == [(25, 3), (27, 6)]
+
+
+@pytest.mark.parametrize("parallelise", [False, True])
+def test_jvm_coverage_multiple_reports(tmpdir, sample_jvm_coverage_xml, parallelise):
+    """Tests loading the jacoco.xml reports of several fuzzers"""
+    other_coverage_xml = sample_jvm_coverage_xml.replace(
+        'ci="3"', 'ci="5"').replace(
+            'BASE64EncoderStreamFuzzer"', 'OtherFuzzer"')
+    for fuzzer, coverage_xml in [("fuzzer1", sample_jvm_coverage_xml),
+                                 ("fuzzer2", other_coverage_xml)]:
+        os.mkdir(os.path.join(tmpdir, fuzzer))
+        write_coverage_file(os.path.join(tmpdir, fuzzer), coverage_xml)
+
+    # Only the report of the target is used if there is one.
+    cp = code_coverage.load_jvm_coverage(str(tmpdir), "fuzzer2", parallelise=parallelise)
+    assert cp.coverage_files == [os.path.join(tmpdir, "fuzzer2", "jacoco.xml")]
+    assert len(cp.covmap) == 2
+    assert cp.covmap["[OtherFuzzer].fuzzerTestOneInput(FuzzedDataProvider)"] == [(25, 5), (27, 6)]
+
+    # Otherwise all reports are used.
+    cp = code_coverage.load_jvm_coverage(str(tmpdir), "fuzzer3", parallelise=parallelise)
+    assert len(cp.coverage_files) == 2
+    assert len(cp.covmap) == 4
+    assert cp.covmap[
+        "[BASE64EncoderStreamFuzzer].fuzzerTestOneInput(FuzzedDataProvider)"] == [(25, 3), (27, 6)]
+    assert cp.covmap["[OtherFuzzer].<init>()"] == [(23, 0)]
+
+
+def test_jvm_coverage_invalid_report(tmpdir, sample_jvm_coverage_xml):
+    """Tests loading a truncated jacoco.xml report"""
+    write_coverage_file(tmpdir, sample_jvm_coverage_xml[:-100])
+
+    with pytest.raises(exceptions.DataLoaderError):
+        code_coverage.load_jvm_coverage(str(tmpdir))
+
+
+def test_kernel_coverage(tmpdir, monkeypatch):
+    """Tests loading Syzkaller coverage and looking up kernel hitcounts"""
+    json_file = os.path.join(tmpdir, "kernel_cov.json")
+    with open(json_file, "w") as f:
+        f.write("""[
+  {"Filename": "/src/linux/private/net/foo.c", "Covered": [30, 12, -1e3]},
+  {"Filename": "/src/linux/net/bar.c", "Covered": [20]},
+  {"Filename": "/src/linux/private/fs/foo.c", "Covered": [51]}
+]""")
+    # Decode the file in chunks smaller than its items.
+    monkeypatch.setattr(code_coverage, "KERNEL_COVERAGE_CHUNK_SIZE", 4)
+
+    cp = code_coverage.load_kernel_cov(json_file)
+    assert cp.get_type() == "kernel"
+    assert [module["Filename"] for module in cp.kernel_coverage] == [
+        "/src/linux/private/net/foo.c", "/src/linux/private/fs/foo.c"
+    ]
+    assert cp.kernel_coverage[0]["Covered"] == [30, 12, -1000.0]
+
+    def get_hitcount(source_file, lineno):
+        parent = cfg_load.CalltreeCallsite("parent", source_file, 0, 0, None)
+        node = cfg_load.CalltreeCallsite("child", "", 1, lineno, parent)
+        return cp.get_kernel_hitcount(node)
+
+    # Lines up to 9 lines before a covered line in any matching file are hit.
+    assert get_hitcount("../foo.c", 3) == 100
+    assert get_hitcount("net/foo.c", 2) == 0
+    assert get_hitcount("net/foo.c", 21) == 100
+    assert get_hitcount("fs/foo.c", 21) == 0
+    assert get_hitcount("foo.c", 42) == 100
+    assert get_hitcount("foo.c", 52) == 0
+    assert get_hitcount("bar.c", 20) == 0
@@ -0,0 +1,176 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test data_loader.py"""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import constants, data_loader  # noqa: E402
+
+SAMPLE_YAML = """---
+Fuzzer filename: /src/fuzzer.c
+All functions:
+  Function list name: All functions
+  Elements:
+  - functionName: LLVMFuzzerTestOneInput
+    functionsReached:
+    - abc
+  - functionName: abc
+    functionsReached: []
+---
+All functions:
+  Elements:
+  - functionName: def
+    functionsReached: []
+"""
+
+
+def _write_yaml(tmpdir, content):
+    yaml_file = os.path.join(tmpdir, "fuzzerLogFile-test.data.yaml")
+    with open(yaml_file, "w") as f:
+        f.write(content)
+    return yaml_file
+
+
+def _load_data_file_yaml(yaml_file):
+    """Loads a data file and consumes the lazily loaded elements"""
+    data_dict = data_loader.load_data_file_yaml(yaml_file)
+    data_dict['All functions']['Elements'] = list(
+        data_dict['All functions']['Elements'])
+    return data_dict
+
+
+def test_data_file_cache_roundtrip(tmpdir):
+    """Test the binary cache gives the same content as parsing the yaml"""
+    yaml_file = _write_yaml(tmpdir, SAMPLE_YAML)
+
+    parsed = _load_data_file_yaml(yaml_file)
+    assert os.path.isfile(yaml_file + constants.DATA_CACHE_SUFFIX)
+
+    cached = _load_data_file_yaml(yaml_file)
+    assert cached == parsed
+    assert cached['All functions']['Function list name'] == 'All functions'
+    assert cached['Fuzzer filename'] == '/src/fuzzer.c'
+    assert [
+        elem['functionName'] for elem in cached['All functions']['Elements']
+    ] == ['LLVMFuzzerTestOneInput', 'abc', 'def']
+
+
+def test_data_file_cache_invalidated_on_change(tmpdir):
+    """Test the cache is not used when the yaml content changes"""
+    yaml_file = _write_yaml(tmpdir, SAMPLE_YAML)
+    _load_data_file_yaml(yaml_file)
+
+    _write_yaml(tmpdir, SAMPLE_YAML.replace("/src/fuzzer.c", "/src/other.c"))
+    reloaded = _load_data_file_yaml(yaml_file)
+    assert reloaded['Fuzzer filename'] == '/src/other.c'
+
+
+def test_data_file_cache_malformed(tmpdir):
+    """Test a truncated cache is ignored"""
+    yaml_file = _write_yaml(tmpdir, SAMPLE_YAML)
+    parsed = _load_data_file_yaml(yaml_file)
+
+    cache_file = yaml_file + constants.DATA_CACHE_SUFFIX
+    with open(cache_file, "rb") as f:
+        content = f.read()
+    with open(cache_file, "wb") as f:
+        f.write(content[:-5])
+
+    assert _load_data_file_yaml(yaml_file) == parsed
+
+
+def test_data_file_cache_partial_iteration(tmpdir):
+    """Test no cache is written if the elements are not all consumed"""
+    yaml_file = _write_yaml(tmpdir, SAMPLE_YAML)
+
+    data_dict = data_loader.load_data_file_yaml(yaml_file)
+    elements = data_dict['All functions']['Elements']
+    assert next(elements)['functionName'] == 'LLVMFuzzerTestOneInput'
+    elements.close()
+
+    assert not os.path.isfile(yaml_file + constants.DATA_CACHE_SUFFIX)
+    assert os.listdir(tmpdir) == [os.path.basename(yaml_file)]
+
+
+def _write_fuzzer_data_files(tmpdir, fuzzer_name):
+    """Writes the frontend output of a small fuzzer"""
+    elements = []
+    for func_name, reached in [("LLVMFuzzerTestOneInput", [fuzzer_name]),
+                               (fuzzer_name, ["shared"]), ("shared", [])]:
+        elements.append({
+            'functionName': func_name,
+            'functionSourceFile': f"/src/{fuzzer_name}.c",
+            'linkageType': 0,
+            'functionLinenumber': 1,
+            'returnType': 'int',
+            'argCount': 0,
+            'argTypes': [],
+            'argNames': [],
+            'BBCount': 1,
+            'ICount': 1,
+            'EdgeCount': 1,
+            'CyclomaticComplexity': 1,
+            'functionsReached': reached,
+            'functionUses': 0,
+            'functionDepth': 0,
+            'constantsTouched': [],
+            'BranchProfiles': [],
+        })
+    data_file = os.path.join(tmpdir, f"fuzzerLogFile-{fuzzer_name}.data")
+    with open(data_file, "w") as f:
+        f.write(f"""Call tree
+LLVMFuzzerTestOneInput /src/{fuzzer_name}.c linenumber=-1
+  {fuzzer_name} /src/{fuzzer_name}.c linenumber=3
+    shared /src/{fuzzer_name}.c linenumber=5
+""")
+    with open(data_file + ".yaml", "w") as f:
+        yaml.dump(
+            {
+                'Fuzzer filename': f"/src/{fuzzer_name}.c",
+                'All functions': {
+                    'Elements': elements
+                }
+            }, f)
+    return {
+        'executable_path': f"/out/{fuzzer_name}",
+        'fuzzer_log_file': f"fuzzerLogFile-{fuzzer_name}"
+    }
+
+
+@pytest.mark.parametrize("parallelise", [False, True])
+def test_load_all_profiles(tmpdir, parallelise):
+    """Test profiles are loaded, correlated and accummulated"""
+    pairings = [
+        _write_fuzzer_data_files(tmpdir, fuzzer_name)
+        for fuzzer_name in ["fuzz_a", "fuzz_b", "fuzz_c"]
+    ]
+
+    profiles = data_loader.load_all_profiles(str(tmpdir),
+                                             "c-cpp",
+                                             parallelise,
+                                             {'pairings': pairings},
+                                             accummulate=True)
+
+    assert sorted(profile.identifier for profile in profiles) == [
+        "fuzz_a", "fuzz_b", "fuzz_c"
+    ]
+    for profile in profiles:
+        assert sorted(profile.functions_reached_by_fuzzer) == sorted(
+            ["LLVMFuzzerTestOneInput", profile.identifier, "shared"])
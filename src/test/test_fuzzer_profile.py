@@ -19,6 +19,7 @@ import pytest
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
 
+from fuzz_introspector import code_coverage  # noqa: E402
 from fuzz_introspector.datatypes import fuzzer_profile  # noqa: E402
 
 
@@ -135,3 +136,57 @@ def test_reaches_func(tmpdir, sample_cfg1):
     assert fp.reaches_func('abc')
     assert not fp.reaches_func('stu')
     assert not fp.reaches_func('mno')
+
+
+def test_get_callsites(tmpdir, sample_cfg1):
+    fp = base_cpp_profile(tmpdir, sample_cfg1, [])
+
+    callsites = fp.get_callsites()
+    assert [cs.src_linenumber for cs in callsites] == [-1, 93, 67, 68, 72, 74]
+    assert fp.get_callsites() is callsites
+    assert fp.max_func_call_depth == 2
+
+    # The index is dropped when the calltree changes
+    fp.fuzzer_callsite_calltree = callsites[1]
+    assert [cs.src_linenumber for cs in fp.get_callsites()] == [93, 67, 68, 72, 74]
+
+    # Calltrees deeper than the recursion limit are supported
+    deep_cfg = "Call tree\n" + "\n".join(
+        "  " * depth + f"f{depth} /src/a.c linenumber={depth}"
+        for depth in range(sys.getrecursionlimit() + 10))
+    fp = base_cpp_profile(tmpdir, deep_cfg, [])
+    assert len(fp.get_callsites()) == sys.getrecursionlimit() + 10
+
+
+def test_is_file_covered(tmpdir, sample_cfg1):
+    """Tests whether files are covered, with and without a basefolder"""
+    elem = []
+    for name, source_file in [("fuzz", "/src/wuffs/fuzz/c/std/bmp_fuzzer.c"),
+                              ("main", "/src/wuffs/fuzz/c/std/bmp_fuzzer.c"),
+                              ("jenkins_hash_u32", "/src/other/fuzzlib.c")]:
+        elem.append(generate_temp_elem(name, []))
+        elem[-1]["functionSourceFile"] = source_file
+    fp = base_cpp_profile(tmpdir, sample_cfg1, elem)
+    fp._set_file_targets()
+    fp.coverage = code_coverage.CoverageProfile()
+    fp.coverage.covmap["fuzz"] = [(74, 0)]
+    fp.coverage.covmap["main"] = [(80, 2)]
+    fp.coverage.covmap["jenkins_hash_u32"] = [(67, 2)]
+
+    assert fp.get_file_functions() == {
+        "/src/wuffs/fuzz/c/std/bmp_fuzzer.c": ["fuzz", "main"],
+        "/src/other/fuzzlib.c": ["jenkins_hash_u32"]
+    }
+    assert fp.is_file_covered("/src/wuffs/fuzz/c/std/bmp_fuzzer.c")
+    assert fp.is_file_covered("/src/wuffs/fuzz/c/std/../std/bmp_fuzzer.c", "/")
+    # Covered, but not reached by the fuzzer.
+    assert not fp.is_file_covered("/src/other/fuzzlib.c")
+
+    # The cached results are dropped when the paths are refined.
+    fp.refine_paths("/src/wuffs/fuzz/c")
+    assert fp.is_file_covered("/src/wuffs/fuzz/c/std/bmp_fuzzer.c", "/src/wuffs/fuzz/c")
+    assert not fp.is_file_covered("/src/wuffs/fuzz/c/std/bmp_fuzzer.c")
+
+    fp.coverage.covmap["main"] = [(80, 0)]
+    fp.invalidate_file_coverage()
+    assert not fp.is_file_covered("/src/wuffs/fuzz/c/std/bmp_fuzzer.c", "/src/wuffs/fuzz/c")
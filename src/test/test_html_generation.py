@@ -11,12 +11,20 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import io
+import json
 import os
 import sys
 
+import bs4
+import pytest
+
 sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
 
-from fuzz_introspector import html_helpers  # noqa: E402
+from fuzz_introspector import (constants, html_constants,  # noqa: E402
+                               html_helpers, html_report, utils)
+
+from profile_helpers import create_merged_profile  # noqa: E402
 
 
 def test_gtag():
@@ -28,3 +36,144 @@ def test_gtag():
     header = html_helpers.html_get_header()
     assert "<!-- Google tag (gtag.js) -->" in header
     assert "FUZZINTRO123" in header
+
+
+def test_indented_html_writer():
+    """Tests indenting HTML while parsing it is the same as prettifying it"""
+    html_doc = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        "<title>A &amp; B</title><script>if (a < b) {}</script></head>"
+        "<body><div class='x  y' id=z checked><p>hello <b>world</b> "
+        "&quot;q&quot; a>b</p><br><img src=a></div><!-- c -->"
+        "<pre>  keep\n  <b>this</b></pre><a href='?a=1&b=2' title='\"'>t</a>"
+        "<div>not closed<span>x</div></span></body></html>")
+    out = io.StringIO()
+    writer = html_helpers.IndentedHtmlWriter(out)
+    writer.feed(html_doc)
+    writer.close()
+    assert out.getvalue() == html_helpers.prettify_html(html_doc)
+
+
+@pytest.mark.parametrize("html_doc", [
+    "<p>&copya &amp x &copy; &#65 &#x41; &#147; &bogus; &lt</p>",
+    "<p a='&copya &#147;'>x</p>",
+    "<div><img src=a></img>a</img>b</div></br>",
+    "<p>a</br>b<br>c</br><br/>d</p>",
+    "<ul><li>a<li>b</ul></p></div><pre> x </pre>",
+    "<p>a</p>\n",
+    "text",
+])
+def test_indented_html_writer_malformed(html_doc):
+    """Tests indenting malformed HTML while parsing it is the same as
+    prettifying it"""
+    out = io.StringIO()
+    writer = html_helpers.IndentedHtmlWriter(out)
+    writer.feed(html_doc)
+    writer.close()
+    assert out.getvalue() == html_helpers.prettify_html(html_doc)
+
+
+def test_indented_html_writer_bs4_version():
+    """Tests the BeautifulSoup defaults the writer uses, for the version
+    in requirements.txt"""
+    with open(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                           "../../requirements.txt")) as f:
+        requirements = f.read().split()
+    if f"beautifulsoup4=={bs4.__version__}" not in requirements:
+        pytest.skip(f"beautifulsoup4 {bs4.__version__} is not the required "
+                    "version")
+
+    assert html_helpers.HTML_VOID_ELEMENTS == {
+        "area", "base", "basefont", "bgsound", "br", "col", "command",
+        "embed", "frame", "hr", "image", "img", "input", "isindex", "keygen",
+        "link", "menuitem", "meta", "nextid", "param", "source", "spacer",
+        "track", "wbr"
+    }
+    assert html_helpers.HTML_PRESERVE_WHITESPACE_ELEMENTS == {
+        "pre", "textarea"
+    }
+    assert html_helpers.HTML_LIST_ATTRIBUTES["*"] == [
+        "class", "accesskey", "dropzone"
+    ]
+    assert not html_helpers.PRETTIFY_ENDS_WITH_NEWLINE
+
+
+def test_write_html(monkeypatch):
+    """Tests the report HTML is indented directly in batch builds"""
+    expected = html_helpers.prettify_html("<p>a</p>")
+    prettified = []
+    monkeypatch.setattr(html_helpers, "prettify_html",
+                        lambda doc: prettified.append(doc) or doc)
+    monkeypatch.delenv("FUZZ_INTROSPECTOR", raising=False)
+    monkeypatch.delenv("FI_DIRECT_HTML", raising=False)
+
+    out = io.StringIO()
+    html_helpers.write_html(out, "<p>a</p>")
+    assert prettified == ["<p>a</p>"]
+
+    monkeypatch.setenv("FUZZ_INTROSPECTOR", "1")
+    out = io.StringIO()
+    html_helpers.write_html(out, "<p>a</p>")
+    assert out.getvalue() == expected
+    assert len(prettified) == 1
+
+    monkeypatch.setenv("FI_DIRECT_HTML", "0")
+    html_helpers.write_html(io.StringIO(), "<p>a</p>")
+    assert len(prettified) == 2
+
+
+def test_write_all_functions_pages(tmpdir, monkeypatch):
+    """Tests writing the all functions table data in pages"""
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(constants, "ALL_FUNCTION_PAGE_SIZE", 2)
+    numeric_columns = html_constants.ALL_FUNCTION_TABLE_NUMERIC_COLUMNS
+    rows = []
+    for i, complexity in enumerate([3, 9, 1, 9, 5]):
+        row = {column: i for column in numeric_columns}
+        row["Func lines hit %"] = f"{i * 10}.0%"
+        row["Undiscovered complexity"] = complexity
+        row["Func name"] = f"f{i}"
+        rows.append(row)
+    html_report.write_all_functions_pages(rows)
+
+    with open(constants.ALL_FUNCTION_INDEX_JS) as f:
+        index_js = f.read()
+    assert index_js.startswith("var all_functions_table_index = ")
+    index = json.loads(index_js[len("var all_functions_table_index = "):])
+    assert index["rowCount"] == 5
+    assert index["pageSize"] == 2
+    assert index["pageCount"] == 3
+    assert index["columnRanges"]["Undiscovered complexity"] == [[9, 9], [3, 5],
+                                                                [1, 1]]
+    assert index["columnRanges"]["Func lines hit %"] == [[10.0, 30.0],
+                                                         [0.0, 40.0],
+                                                         [20.0, 20.0]]
+
+    # The rows are paged by undiscovered complexity.
+    names = []
+    for page_idx in range(3):
+        with open(constants.ALL_FUNCTION_PAGE_JS % page_idx) as f:
+            page_js = f.read()
+        prefix = f"allFunctionsPageLoaded({page_idx}, "
+        assert page_js.startswith(prefix)
+        names += [row["Func name"] for row in json.loads(page_js[len(prefix):-3])]
+    assert names == ["f1", "f3", "f4", "f0", "f2"]
+
+
+def test_create_all_function_table_parallel(monkeypatch):
+    """Tests the all functions table is the same when created in chunks by
+    a pool of workers"""
+    merged_profile = create_merged_profile(10, 1)
+    tables = ["table_0"]
+    serial_table = html_report.create_all_function_table(
+        tables, merged_profile, "https://cov/", "/", parallelise=False)
+    assert [row["Func name"] for row in serial_table[2]
+            ] == [f"f_{idx}" for idx in range(10)]
+    assert serial_table[1][4]["collapsible_id"] == "table_0-4"
+    assert "id='table_0-5-args'" in serial_table[1][5]["Args"]
+
+    monkeypatch.setattr(constants, "ALL_FUNCTION_TABLE_CHUNK_SIZE", 3)
+    monkeypatch.setattr(utils, "get_worker_count", lambda *args: 2)
+    parallel_table = html_report.create_all_function_table(
+        tables, merged_profile, "https://cov/", "/")
+    assert parallel_table == serial_table
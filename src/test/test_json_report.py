@@ -0,0 +1,76 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test json_report.py"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import constants, json_report  # noqa: E402
+
+
+def _add_report_keys():
+    json_report.add_project_key_value_to_report("stats", {"count": 1})
+    json_report.add_fuzzer_key_value_to_report("fuzzer1", "stats", 2)
+    json_report.add_fuzzer_key_value_to_report("fuzzer1", "coverage", 3)
+    json_report.add_analysis_json_str_as_dict_to_report(
+        "analysis", '{"result": [1, 2]}')
+    json_report.add_branch_blocker_key_value_to_report(
+        "fuzzer1", "branch_blockers", [{"function_name": "abc"}])
+
+
+def _read_json(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def test_buffered_report_matches_direct_writes(tmpdir, monkeypatch):
+    """Test buffering gives the same report as updating it on disk"""
+    monkeypatch.chdir(tmpdir)
+    _add_report_keys()
+    expected_summary = _read_json(constants.SUMMARY_FILE)
+    expected_blockers = _read_json(constants.BRANCH_BLOCKERS_FILE)
+    os.remove(constants.SUMMARY_FILE)
+    os.remove(constants.BRANCH_BLOCKERS_FILE)
+
+    with json_report.buffered_report():
+        _add_report_keys()
+        assert not os.path.isfile(constants.SUMMARY_FILE)
+        assert not os.path.isfile(constants.BRANCH_BLOCKERS_FILE)
+
+    assert _read_json(constants.SUMMARY_FILE) == expected_summary
+    assert _read_json(constants.BRANCH_BLOCKERS_FILE) == expected_blockers
+    assert sorted(os.listdir(tmpdir)) == sorted(
+        [constants.SUMMARY_FILE, constants.BRANCH_BLOCKERS_FILE])
+
+
+def test_buffered_report_keeps_existing_content(tmpdir, monkeypatch):
+    """Test the builder starts from the report already on disk"""
+    monkeypatch.chdir(tmpdir)
+    json_report.add_fuzzer_key_value_to_report("fuzzer0", "stats", 1)
+
+    with json_report.buffered_report():
+        json_report.add_fuzzer_key_value_to_report("fuzzer1", "stats", 2)
+
+    assert _read_json(constants.SUMMARY_FILE) == {
+        "fuzzer0": {
+            "stats": 1
+        },
+        "fuzzer1": {
+            "stats": 2
+        }
+    }
+    assert not os.path.isfile(constants.BRANCH_BLOCKERS_FILE)
@@ -0,0 +1,88 @@
+# Copyright 2024 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test analyses/optimal_targets.py"""
+
+import copy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector.analyses import optimal_targets  # noqa: E402
+
+from profile_helpers import create_merged_profile  # noqa: E402
+
+
+def _add_func_and_recompute(merged_profile, func_name):
+    """Reference implementation, recomputing all data from scratch"""
+    merged_profile = copy.deepcopy(merged_profile)
+    all_functions = merged_profile.all_functions
+    func_to_add = all_functions[func_name]
+    func_to_add.hitcount = 1
+    for reached_name in func_to_add.functions_reached:
+        if reached_name in all_functions:
+            all_functions[reached_name].hitcount += 1
+            all_functions[reached_name].reached_by_fuzzers.append(func_name)
+    for fd in all_functions.values():
+        reached = [
+            all_functions[name] for name in fd.functions_reached
+            if name in all_functions
+        ]
+        fd.new_unreached_complexity = sum(f.cyclomatic_complexity
+                                          for f in reached if f.hitcount == 0)
+        if fd.hitcount == 0:
+            fd.new_unreached_complexity += fd.cyclomatic_complexity
+        fd.total_cyclomatic_complexity = fd.cyclomatic_complexity + sum(
+            f.cyclomatic_complexity for f in reached)
+    return merged_profile
+
+
+def _function_state(merged_profile):
+    return [(fd.function_name, fd.hitcount, fd.reached_by_fuzzers,
+             fd.new_unreached_complexity, fd.total_cyclomatic_complexity)
+            for fd in merged_profile.all_functions.values()]
+
+
+def test_reachability_state_matches_recomputation():
+    merged_profile = create_merged_profile(200, 1)
+    original_state = _function_state(merged_profile)
+
+    reachability_state = optimal_targets.ReachabilityState(merged_profile)
+    expected_profile = merged_profile
+    for func_name in ["f_3", "f_50", "f_3", "f_199", "f_120"]:
+        reachability_state.add_function(
+            reachability_state.merged_profile.all_functions[func_name])
+        expected_profile = _add_func_and_recompute(expected_profile,
+                                                   func_name)
+        assert _function_state(
+            reachability_state.merged_profile) == _function_state(
+                expected_profile)
+
+    # The original profile is not modified.
+    assert _function_state(merged_profile) == original_state
+
+
+def test_optimal_targets_driver_count():
+    merged_profile = create_merged_profile(300, 2)
+    analysis = optimal_targets.OptimalTargets()
+
+    analysis.drivers_to_create = 3
+    _, targets = analysis.iteratively_get_optimal_targets(merged_profile)
+    assert len(targets) == 3
+
+    _, more_targets = analysis.iteratively_get_optimal_targets(
+        merged_profile, drivers_to_create=6)
+    assert len(more_targets) > 3
+    assert [fd.function_name for fd in more_targets[:len(targets)]
+            ] == [fd.function_name for fd in targets]
@@ -242,3 +242,43 @@ def test_resolve_coverage_link(
     if (temp_file is not None):
         # Remove temp html_status.json file
         os.remove('temp_html_status.json')
+
+
+def test_data_file_read_yaml_stream(tmpdir):
+    yaml_file = os.path.join(tmpdir, "fuzzerLogFile-test.data.yaml")
+    with open(yaml_file, 'w') as f:
+        f.write("---\n"
+                "Fuzzer filename: /src/fuzzer.c\n"
+                "All functions:\n"
+                "  Elements:\n"
+                "  - functionName: abc\n"
+                "    functionLinenumber: 12\n"
+                "    argTypes: &types ['char *', size_t]\n"
+                "  - functionName: def\n"
+                "    argTypes: *types\n"
+                "---\n"
+                "Fuzzer filename: /src/other.c\n"
+                "All functions:\n"
+                "  Elements:\n"
+                "  - functionName: ghi\n")
+
+    content = utils.data_file_read_yaml_stream(yaml_file)
+    elements = list(content['All functions']['Elements'])
+    assert elements == utils.data_file_read_yaml(
+        yaml_file)['All functions']['Elements']
+    assert [elem['functionName'] for elem in elements] == ['abc', 'def', 'ghi']
+    assert elements[0]['functionLinenumber'] == 12
+    assert elements[1]['argTypes'] == ['char *', 'size_t']
+    assert content['Fuzzer filename'] == '/src/fuzzer.c'
+
+    assert utils.data_file_read_yaml_stream(yaml_file + ".missing") is None
+
+
+def test_get_worker_count(monkeypatch):
+    monkeypatch.delenv("FI_MAX_WORKERS", raising=False)
+    assert utils.get_worker_count(1, 1) == 1
+    assert utils.get_worker_count(100, 1 << 60) == 1
+    assert 1 <= utils.get_worker_count(100, 1) <= os.cpu_count()
+
+    monkeypatch.setenv("FI_MAX_WORKERS", "1")
+    assert utils.get_worker_count(100, 1) == 1